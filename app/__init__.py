@@ -6,17 +6,25 @@ from app.models import db, User
 import logging
 from flask_jwt_extended import exceptions as jwt_exceptions
 from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 from app.celery_worker import make_celery
+from app.utils.token_blocklist import TokenBlocklist
 
 jwt = JWTManager()
-# Store revoked tokens in memory
-jwt_blocklist = set()
+# Revoked tokens, shared between workers through Redis
+jwt_blocklist = TokenBlocklist()
 
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    if app.config['PROXY_HOPS']:
+        # Trust only the hops we deploy behind, so clients get their own
+        # rate limit buckets instead of sharing the proxy's address
+        app.wsgi_app = ProxyFix(app.wsgi_app,
+                                x_for=app.config['PROXY_HOPS'],
+                                x_proto=app.config['PROXY_HOPS'])
     celery = make_celery(app)
     # Set up logging
     logging.basicConfig(level=logging.DEBUG)
@@ -108,7 +116,8 @@ def create_app(config_class=Config):
         @jwt.token_in_blocklist_loader
         def check_if_token_in_blocklist(jwt_header, jwt_payload):
             jti = jwt_payload["jti"]
-            return jti in jwt_blocklist
+            return jti in jwt_blocklist or jwt_blocklist.is_user_revoked(
+                jwt_payload.get("sub"))
 
         # Create database tables
         with app.app_context():
@@ -15,6 +15,8 @@ def init_admin(app):
     """Initialize admin module in the app"""
     # Register CLI commands
     app.cli.add_command(create_admin_command)
+    app.cli.add_command(backfill_leaderboard_command)
+    app.cli.add_command(update_analytics_command)
 
     # Ensure backup directory exists
     from pathlib import Path
@@ -67,6 +69,30 @@ def create_admin_command(username, password, admin_password):
     click.echo(f"Admin user {username} created successfully.")
 
 
+@click.command('backfill-leaderboard')
+@click.option('--chunk-days',
+              default=30,
+              show_default=True,
+              help='Days of games to aggregate per transaction.')
+@with_appcontext
+def backfill_leaderboard_command(chunk_days):
+    """Rebuild leaderboard rollups from the full game history."""
+    from app.utils.leaderboard import backfill_rollups
+
+    days = backfill_rollups(chunk_days=chunk_days)
+    click.echo(f"Leaderboard rollups rebuilt for {days} days.")
+
+
+@click.command('update-analytics')
+@with_appcontext
+def update_analytics_command():
+    """Process days since the last run into the analytics fact tables."""
+    from app.utils.analytics import update_daily_facts
+
+    days = update_daily_facts()
+    click.echo(f"Analytics facts updated for {days} days.")
+
+
 def init_celery_with_app(app, celery):
     """Initialize Celery with Flask context"""
 
@@ -17,6 +17,7 @@ from app.models import (
 )
 from datetime import datetime, timedelta
 from app.utils.stats import initialize_or_update_user_stats
+from app.utils.leaderboard import record_game_results, refresh_recent_rollups
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -90,6 +91,36 @@ def setup_periodic_tasks(sender, **kwargs):
                              cleanup_old_backups.s(),
                              name='cleanup-backups')
 
+    # Reconcile leaderboard rollups for recent days every 10 minutes
+    sender.add_periodic_task(crontab(minute='*/10'),
+                             refresh_leaderboard_rollups.s(),
+                             name='refresh-leaderboard-rollups')
+
+    # Keep the daily quote schedule filled a year ahead, daily at 1:00 AM UTC
+    sender.add_periodic_task(crontab(hour=1, minute=0),
+                             extend_daily_schedule_task.s(),
+                             name='extend-daily-schedule')
+
+    # Remove expired user data export files daily at 4:30 AM UTC
+    sender.add_periodic_task(crontab(hour=4, minute=30),
+                             cleanup_user_exports_task.s(),
+                             name='cleanup-user-exports')
+
+    # Re-queue account deletions whose job was lost, every 15 minutes
+    sender.add_periodic_task(crontab(minute='*/15'),
+                             resume_account_deletions_task.s(),
+                             name='resume-account-deletions')
+
+    # Refresh the admin dashboard metrics snapshot every minute
+    sender.add_periodic_task(crontab(),
+                             refresh_dashboard_metrics_task.s(),
+                             name='refresh-dashboard-metrics')
+
+    # Roll completed days into the analytics fact tables at 0:30 AM UTC
+    sender.add_periodic_task(crontab(hour=0, minute=30),
+                             update_analytics_facts_task.s(),
+                             name='update-analytics-facts')
+
 
 @celery.task(bind=True, max_retries=3)
 def backup_database(self, backup_type='manual'):
@@ -251,6 +282,219 @@ def cleanup_old_backups():
         logger.error(f"Backup cleanup failed: {str(e)}")
         return {"status": "error", "message": str(e)}
 
+@celery.task
+def refresh_leaderboard_rollups(days=2):
+    """Rebuild recent leaderboard rollups from GameScore"""
+    from app import create_app
+    app = create_app()
+
+    with app.app_context():
+        try:
+            refresh_recent_rollups(days=days)
+            return {"status": "success", "days": days}
+        except Exception as e:
+            logger.error(f"Leaderboard rollup refresh failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task
+def extend_daily_schedule_task(horizon_days=None):
+    """Assign daily quotes to any unscheduled dates within the horizon"""
+    from app import create_app
+    from app.services.daily_scheduler import extend_daily_schedule, DEFAULT_HORIZON_DAYS
+    app = create_app()
+
+    with app.app_context():
+        try:
+            result = extend_daily_schedule(
+                horizon_days=horizon_days or DEFAULT_HORIZON_DAYS)
+            return {"status": "success", **result}
+        except Exception as e:
+            logger.error(f"Extending daily schedule failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task(bind=True)
+def cleanup_duplicate_games_task(self, dry_run=False, batch_size=None):
+    """Remove (or with dry_run, report) duplicate games in bounded batches"""
+    from app import create_app
+    from app.services.duplicate_cleanup import cleanup_duplicate_games, DEFAULT_BATCH_SIZE
+    app = create_app()
+
+    with app.app_context():
+        try:
+            result = cleanup_duplicate_games(
+                dry_run=dry_run,
+                batch_size=batch_size or DEFAULT_BATCH_SIZE,
+                progress=lambda report: self.update_state(
+                    state='PROGRESS', meta=dict(report, sample=[])))
+            return {"status": "success", **result}
+        except Exception as e:
+            logger.error(f"Duplicate game cleanup failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task(bind=True)
+def export_user_data_task(self, user_id):
+    """Write a user's data export to a gzip file for later download"""
+    from app import create_app
+    from app.services.user_export import write_user_export
+    app = create_app()
+
+    with app.app_context():
+        try:
+            path = write_user_export(user_id, self.request.id)
+            return {
+                "status": "success",
+                "user_id": user_id,
+                "filename": path.name
+            }
+        except Exception as e:
+            logger.error(f"Data export for user {user_id} failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "user_id": user_id, "message": str(e)}
+
+@celery.task
+def cleanup_user_exports_task():
+    """Delete user data export files past their retention period"""
+    from app import create_app
+    from app.services.user_export import cleanup_user_exports
+    app = create_app()
+
+    with app.app_context():
+        try:
+            removed = cleanup_user_exports()
+            logger.info(f"Removed {removed} expired user data exports")
+            return {"status": "success", "removed": removed}
+        except Exception as e:
+            logger.error(f"User export cleanup failed: {str(e)}",
+                         exc_info=True)
+            return {"status": "error", "message": str(e)}
+
+@celery.task(bind=True)
+def delete_account_task(self, user_id):
+    """Delete a pending account's data in bounded batches"""
+    from app import create_app
+    from app.services.account_deletion import delete_account_data
+    app = create_app()
+
+    with app.app_context():
+        try:
+            result = delete_account_data(
+                user_id,
+                progress=lambda report: self.update_state(state='PROGRESS',
+                                                          meta=report))
+            return {"status": "success", **result}
+        except Exception as e:
+            logger.error(f"Account deletion for user {user_id} failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "user_id": user_id, "message": str(e)}
+
+@celery.task
+def resume_account_deletions_task():
+    """Queue deletion jobs again for accounts left pending too long"""
+    from app import create_app
+    from app.services.account_deletion import resume_account_deletions
+    app = create_app()
+
+    with app.app_context():
+        try:
+            queued = resume_account_deletions()
+            if queued:
+                logger.info(f"Re-queued {queued} pending account deletions")
+            return {"status": "success", "queued": queued}
+        except Exception as e:
+            logger.error(f"Resuming account deletions failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task
+def refresh_dashboard_metrics_task():
+    """Recompute the cached admin dashboard metrics"""
+    from app import create_app
+    from app.services.admin_metrics import refresh_dashboard_metrics
+    app = create_app()
+
+    with app.app_context():
+        try:
+            metrics = refresh_dashboard_metrics()
+            return {"status": "success", "generated_at": metrics['generated_at']}
+        except Exception as e:
+            logger.error(f"Dashboard metrics refresh failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task
+def update_analytics_facts_task():
+    """Process days since the last run into the analytics fact tables"""
+    from app import create_app
+    from app.utils.analytics import update_daily_facts
+    app = create_app()
+
+    with app.app_context():
+        try:
+            days = update_daily_facts()
+            return {"status": "success", "days": days}
+        except Exception as e:
+            logger.error(f"Analytics fact update failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task(bind=True)
+def import_quotes_task(self, filename, is_backdoor=False,
+                       replace_existing=False):
+    """Import an uploaded quote CSV in batches, reporting progress"""
+    from app import create_app
+    from app.services.quote_import import import_queued_file
+    app = create_app()
+
+    with app.app_context():
+        try:
+            report = import_queued_file(
+                filename,
+                is_backdoor,
+                replace_existing,
+                progress=lambda report: self.update_state(state='PROGRESS',
+                                                          meta=report))
+            return {"status": "success", **report}
+        except Exception as e:
+            logger.error(f"Quote import {filename} failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            return {"status": "error", "message": str(e)}
+
+@celery.task(bind=True)
+def send_email_campaign_task(self, campaign_id):
+    """Send an email campaign's pending deliveries in batches"""
+    from app import create_app
+    from app.models import EmailCampaign
+    from app.services.email_delivery import deliver_campaign, campaign_summary
+    app = create_app()
+
+    with app.app_context():
+        try:
+            summary = deliver_campaign(
+                campaign_id,
+                progress=lambda campaign: self.update_state(
+                    state='PROGRESS', meta=campaign_summary(campaign)))
+            return {"status": "success", **summary}
+        except Exception as e:
+            logger.error(f"Email campaign {campaign_id} failed: {str(e)}",
+                         exc_info=True)
+            db.session.rollback()
+            EmailCampaign.query.filter_by(id=campaign_id).update(
+                {'status': 'failed'})
+            db.session.commit()
+            return {"status": "error", "message": str(e)}
+
 @celery.task
 def process_game_completion(user_id, anon_id, game_id, is_daily, won, score, mistakes, time_taken):
     from app import create_app
@@ -319,6 +563,9 @@ def process_game_completion(user_id, anon_id, game_id, is_daily, won, score, mis
                 else:
                     logger.warning(f"No active game state found for user {user_id}, game {game_id}")
 
+                # Add to the leaderboard rollups in the same transaction
+                record_game_results(user_id, [(game_score.created_at, score)])
+
                 # Commit these changes
                 logger.info(f"Committing database changes")
                 db.session.commit()
@@ -342,7 +589,6 @@ def process_game_completion(user_id, anon_id, game_id, is_daily, won, score, mis
                     mistakes=mistakes,
                     time_taken=time_taken,
                     game_type='daily' if is_daily else 'regular',
-                    difficulty=game_id.split('-')[0] if '-' in game_id else 'medium',
                     completed=True,
                     won=won,
                     created_at=datetime.utcnow()
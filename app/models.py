@@ -3,8 +3,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.dialects import postgresql
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash, check_password_hash
 import uuid
+import secrets
+from app.utils.game_ids import extract_uuid_from_constructed_id, parse_game_id, sync_bucket_for
+from app.utils.quote_text import text_hash
 
 db = SQLAlchemy()
 
@@ -33,6 +37,16 @@ class User(UserMixin, db.Model):
     reset_token = db.Column(db.String(100), unique=True, nullable=True)
     reset_token_expires = db.Column(db.DateTime, nullable=True)
     unsubscribe_token = db.Column(db.String(100), unique=True, nullable=True)
+    # First 6 token characters, uppercased; set by set_legacy_code below
+    legacy_code = db.Column(db.String(6), index=True)
+    # Set when deletion is requested; the rows are removed by a background job
+    pending_deletion = db.Column(db.Boolean, default=False, nullable=False)
+    deletion_requested_at = db.Column(db.DateTime, nullable=True)
+
+    # Keyset order of the admin user list. Substring search uses pg_trgm
+    # indexes created in migration c8d2e4f6a0b1 (Postgres only)
+    __table_args__ = (db.Index('idx_user_created', 'created_at',
+                               'user_id'), )
 
     def __init__(self, email, username, password, email_consent=False):
         self.email = email
@@ -63,6 +77,23 @@ class User(UserMixin, db.Model):
         db.session.commit()
         return self.unsubscribe_token
 
+    @staticmethod
+    def legacy_code_for(token):
+        """Promo code form of an unsubscribe token used for legacy stat imports"""
+        return token[:6].upper() if token else None
+
+    @classmethod
+    def find_by_legacy_code(cls, code):
+        """Find the user whose unsubscribe token starts with a legacy import code"""
+        if not code:
+            return None
+        return cls.query.filter_by(legacy_code=code.upper()).first()
+
+
+@event.listens_for(User.unsubscribe_token, 'set')
+def set_legacy_code(target, value, oldvalue, initiator):
+    target.legacy_code = User.legacy_code_for(value)
+
 
 class UserStats(db.Model):
     user_id = db.Column(db.String,
@@ -98,6 +129,33 @@ class GameScore(db.Model):
     challenge_date = db.Column(db.String)
     completed = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Normalized UUID from game_id, set by set_game_uuid below
+    game_uuid = db.Column(db.String(36))
+    # Game kind parsed from game_id, set by set_game_kind below
+    difficulty = db.Column(db.String(10))
+    is_daily = db.Column(db.Boolean, default=False, nullable=False)
+    is_hardcore = db.Column(db.Boolean, default=False, nullable=False)
+    # Digest sync bucket of game_id, set by set_sync_bucket below
+    sync_bucket = db.Column(db.SmallInteger)
+    # Server-assigned per-user change sequence, set by set_change_seq below
+    change_seq = db.Column(db.BigInteger)
+
+    __table_args__ = (db.Index('idx_game_score_user_uuid',
+                               'user_id',
+                               'game_uuid',
+                               unique=True),
+                      db.Index('idx_game_score_daily_user',
+                               'user_id',
+                               'challenge_date',
+                               postgresql_where=db.text('is_daily'),
+                               sqlite_where=db.text('is_daily')),
+                      db.Index('idx_game_score_difficulty_created',
+                               'difficulty', 'created_at'),
+                      db.Index('idx_game_score_user_sync_bucket', 'user_id',
+                               'sync_bucket'),
+                      db.Index('idx_game_score_user_change_seq', 'user_id',
+                               'change_seq'),
+                      db.Index('idx_game_score_uuid', 'game_uuid'))
 
 
 class ActiveGameState(db.Model):
@@ -121,7 +179,160 @@ class ActiveGameState(db.Model):
     last_updated = db.Column(db.DateTime,
                              default=datetime.utcnow,
                              onupdate=datetime.utcnow)
-    __table_args__ = (db.Index('idx_active_game_userid', 'user_id'), )
+    # Normalized UUID from game_id, set by set_game_uuid below
+    game_uuid = db.Column(db.String(36))
+    # Game kind parsed from game_id, set by set_game_kind below
+    difficulty = db.Column(db.String(10))
+    is_daily = db.Column(db.Boolean, default=False, nullable=False)
+    is_hardcore = db.Column(db.Boolean, default=False, nullable=False)
+    challenge_date = db.Column(db.Date)
+    # Server-assigned per-user change sequence, set by set_change_seq below
+    change_seq = db.Column(db.BigInteger)
+    __table_args__ = (db.Index('idx_active_game_userid', 'user_id'),
+                      db.Index('idx_active_game_user_uuid',
+                               'user_id',
+                               'game_uuid',
+                               unique=True),
+                      db.Index('idx_active_game_user_daily', 'user_id',
+                               'is_daily'),
+                      db.Index('idx_active_game_user_change_seq', 'user_id',
+                               'change_seq'))
+
+
+@event.listens_for(GameScore, 'before_insert')
+@event.listens_for(GameScore, 'before_update')
+@event.listens_for(ActiveGameState, 'before_insert')
+@event.listens_for(ActiveGameState, 'before_update')
+def set_game_uuid(mapper, connection, target):
+    target.game_uuid = extract_uuid_from_constructed_id(target.game_id)
+
+
+class UserSyncState(db.Model):
+    """Last change sequence number handed out for a user's synced rows"""
+    user_id = db.Column(db.String,
+                        db.ForeignKey('user.user_id'),
+                        primary_key=True)
+    last_seq = db.Column(db.BigInteger, default=0, nullable=False)
+
+
+class GameTombstone(db.Model):
+    """Record of a deleted game or active game so deletions reach other devices"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.String,
+                        db.ForeignKey('user.user_id'),
+                        nullable=False)
+    game_id = db.Column(db.String, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (db.Index('idx_game_tombstone_user_change_seq',
+                               'user_id', 'change_seq'), )
+
+
+def allocate_change_seqs(connection, user_id, count=1):
+    """
+    Reserve count consecutive change sequence numbers for a user.
+    The counter row stays locked until the transaction commits, so a user's
+    changes commit in sequence order and a cursor never skips one.
+
+    Returns:
+        int: The last reserved number; the block ends here
+    """
+    table = UserSyncState.__table__
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(user_id=user_id, last_seq=count)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['user_id'],
+                set_={'last_seq': table.c.last_seq + count}))
+    elif not connection.execute(table.update().where(
+            table.c.user_id == user_id).values(
+                last_seq=table.c.last_seq + count)).rowcount:
+        connection.execute(table.insert().values(user_id=user_id,
+                                                 last_seq=count))
+
+    return connection.execute(
+        db.select(table.c.last_seq).where(
+            table.c.user_id == user_id)).scalar()
+
+
+@event.listens_for(GameScore, 'before_insert')
+@event.listens_for(GameScore, 'before_update')
+@event.listens_for(ActiveGameState, 'before_insert')
+@event.listens_for(ActiveGameState, 'before_update')
+def set_change_seq(mapper, connection, target):
+    # before_update also fires for rows with no net change; skip those
+    session = db.inspect(target).session
+    if not target.user_id or (session is not None
+                              and not session.is_modified(target)):
+        return
+    target.change_seq = allocate_change_seqs(connection, target.user_id)
+
+
+@event.listens_for(GameScore, 'after_delete')
+@event.listens_for(ActiveGameState, 'after_delete')
+def record_game_tombstone(mapper, connection, target):
+    if not target.user_id or not target.game_id:
+        return
+    connection.execute(GameTombstone.__table__.insert().values(
+        user_id=target.user_id,
+        game_id=target.game_id,
+        change_seq=allocate_change_seqs(connection, target.user_id),
+        deleted_at=datetime.utcnow()))
+
+
+class GameSyncBucket(db.Model):
+    """Cached digest of one sync bucket of a user's games; a missing row means stale"""
+    user_id = db.Column(db.String,
+                        db.ForeignKey('user.user_id'),
+                        primary_key=True)
+    bucket = db.Column(db.SmallInteger, primary_key=True)
+    digest = db.Column(db.String(16), nullable=False)  # XOR of game hashes
+    game_count = db.Column(db.Integer, default=0, nullable=False)
+    # User's change sequence when the digest was computed; a later change
+    # in the bucket makes the row stale even if its invalidation missed it
+    built_seq = db.Column(db.BigInteger, default=0, nullable=False)
+
+
+@event.listens_for(GameScore, 'before_insert')
+@event.listens_for(GameScore, 'before_update')
+def set_sync_bucket(mapper, connection, target):
+    target.sync_bucket = sync_bucket_for(
+        target.game_id) if target.game_id else None
+
+
+def _invalidate_sync_buckets(connection, user_ids, game_ids):
+    buckets = {sync_bucket_for(game_id) for game_id in game_ids if game_id}
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if buckets and user_ids:
+        table = GameSyncBucket.__table__
+        connection.execute(table.delete().where(
+            table.c.user_id.in_(user_ids), table.c.bucket.in_(buckets)))
+
+
+@event.listens_for(GameScore, 'after_insert')
+@event.listens_for(GameScore, 'after_update')
+def invalidate_changed_sync_bucket(mapper, connection, target):
+    """Drop the cached digests a write touched; the next sync rebuilds them"""
+    attrs = db.inspect(target).attrs
+    if not any(
+            attrs[name].history.has_changes()
+            for name in ('user_id', 'game_id', 'score', 'completed',
+                         'created_at')):
+        return
+    _invalidate_sync_buckets(
+        connection, {target.user_id, *(attrs.user_id.history.deleted or ())},
+        {target.game_id, *(attrs.game_id.history.deleted or ())})
+
+
+@event.listens_for(GameScore, 'after_delete')
+def invalidate_deleted_sync_bucket(mapper, connection, target):
+    _invalidate_sync_buckets(connection, {target.user_id}, {target.game_id})
 
 
 class AnonymousGameState(db.Model):
@@ -237,6 +448,14 @@ class Quote(db.Model):
     updated_at = db.Column(db.DateTime,
                            default=datetime.utcnow,
                            onupdate=datetime.utcnow)
+    # Full-text document with a GIN index on Postgres. SQLite indexes
+    # quotes in the quote_fts FTS5 table instead and leaves this empty
+    search_vector = db.deferred(
+        db.Column(db.Text().with_variant(postgresql.TSVECTOR(), 'postgresql')))
+    # Hash of the normalized text, for skipping duplicates on import
+    text_hash = db.Column(db.String(64), index=True)
+
+    __table_args__ = (db.Index('idx_quote_author', 'author'), )
 
     @staticmethod
     def _count_unique_letters(text):
@@ -244,12 +463,77 @@ class Quote(db.Model):
 
     def _update_unique_letters(self):
         self.unique_letters = self._count_unique_letters(self.text)
+        self.text_hash = text_hash(self.text)
+
+    # Text search configuration for the search vector and its queries;
+    # 'simple' keeps stop words, so searches for short words such as
+    # "to be" match, as they do with the FTS5 index
+    SEARCH_CONFIG = 'simple'
+
+    @staticmethod
+    def search_document(text, author):
+        """tsvector expression weighting the author above the quote text"""
+        return db.func.setweight(
+            db.func.to_tsvector(Quote.SEARCH_CONFIG,
+                                db.func.coalesce(author, '')),
+            'A').op('||')(db.func.setweight(
+                db.func.to_tsvector(Quote.SEARCH_CONFIG,
+                                    db.func.coalesce(text, '')), 'B'))
+
+
+def _search_fields_changed(target):
+    attrs = db.inspect(target).attrs
+    return attrs.text.history.has_changes() or attrs.author.history.has_changes()
 
 
 @event.listens_for(Quote, 'before_insert')
 @event.listens_for(Quote, 'before_update')
 def set_unique_letters(mapper, connection, target):
     target._update_unique_letters()
+    if connection.dialect.name == 'postgresql' and _search_fields_changed(
+            target):
+        target.search_vector = Quote.search_document(target.text, target.author)
+
+
+# SQLite full-text index for quotes, keyed by quote id
+event.listen(
+    Quote.__table__, 'after_create',
+    db.DDL('CREATE VIRTUAL TABLE IF NOT EXISTS quote_fts '
+           'USING fts5(text, author)').execute_if(dialect='sqlite'))
+
+
+def _mark_authors_changed(target):
+    session = db.object_session(target)
+    if session is not None:
+        session.info['quote_authors_changed'] = True
+
+
+@event.listens_for(Quote, 'after_insert')
+@event.listens_for(Quote, 'after_update')
+def sync_quote_search(mapper, connection, target):
+    """Keep quote_fts and the cached author list in step with the quote"""
+    if not _search_fields_changed(target):
+        return
+    if db.inspect(target).attrs.author.history.has_changes():
+        _mark_authors_changed(target)
+    if connection.dialect.name == 'sqlite':
+        connection.execute(db.text('DELETE FROM quote_fts WHERE rowid = :id'),
+                           {'id': target.id})
+        connection.execute(
+            db.text('INSERT INTO quote_fts (rowid, text, author) '
+                    'VALUES (:id, :text, :author)'), {
+                        'id': target.id,
+                        'text': target.text,
+                        'author': target.author
+                    })
+
+
+@event.listens_for(Quote, 'after_delete')
+def remove_quote_search(mapper, connection, target):
+    _mark_authors_changed(target)
+    if connection.dialect.name == 'sqlite':
+        connection.execute(db.text('DELETE FROM quote_fts WHERE rowid = :id'),
+                           {'id': target.id})
 
 
 class Backdoor(db.Model):
@@ -264,6 +548,7 @@ class Backdoor(db.Model):
                            nullable=True)
     times_used = db.Column(db.Integer, default=0)
     unique_letters = db.Column(db.Integer)
+    text_hash = db.Column(db.String(64), index=True)
     active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime,
@@ -276,6 +561,7 @@ class Backdoor(db.Model):
 
     def _update_unique_letters(self):
         self.unique_letters = self._count_unique_letters(self.text)
+        self.text_hash = text_hash(self.text)
 
 
 @event.listens_for(Backdoor, 'before_insert')
@@ -314,7 +600,8 @@ class LeaderboardEntry(db.Model):
                         db.ForeignKey('user.user_id'),
                         nullable=False)
     username = db.Column(db.String)  # Denormalized for historical accuracy
-    period_type = db.Column(db.String, nullable=False)  # 'weekly' or 'yearly'
+    period_type = db.Column(db.String,
+                            nullable=False)  # 'weekly', 'monthly' or 'yearly'
     period_start = db.Column(db.DateTime, nullable=False)
     period_end = db.Column(db.DateTime, nullable=False)
     rank = db.Column(db.Integer, nullable=False)
@@ -330,6 +617,67 @@ class LeaderboardEntry(db.Model):
                                           name='unique_user_period'), )
 
 
+class DailyScoreRollup(db.Model):
+    """Per-user score totals for a single UTC day of completed games"""
+    user_id = db.Column(db.String,
+                        db.ForeignKey('user.user_id'),
+                        primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    score = db.Column(db.Integer, default=0, nullable=False)
+    games_played = db.Column(db.Integer, default=0, nullable=False)
+    games_won = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (db.Index('idx_daily_score_rollup_day', 'day'), )
+
+
+class PeriodScoreRollup(db.Model):
+    """Per-user score totals for a week, month or year, derived from DailyScoreRollup"""
+    period_type = db.Column(db.String(10),
+                            primary_key=True)  # 'weekly', 'monthly', 'yearly'
+    period_start = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.String,
+                        db.ForeignKey('user.user_id'),
+                        primary_key=True)
+    score = db.Column(db.Integer, default=0, nullable=False)
+    games_played = db.Column(db.Integer, default=0, nullable=False)
+    games_won = db.Column(db.Integer, default=0, nullable=False)
+
+    # Serves both the ranked page query and the "users above me" count
+    __table_args__ = (db.Index('idx_period_score_rollup_rank', 'period_type',
+                               'period_start', 'score'), )
+
+
+class DailySignupFact(db.Model):
+    """Accounts created per UTC day, for the analytics page"""
+    day = db.Column(db.Date, primary_key=True)
+    signups = db.Column(db.Integer, default=0, nullable=False)
+
+
+class DailyGameFact(db.Model):
+    """Games started per UTC day by difficulty and game type"""
+    day = db.Column(db.Date, primary_key=True)
+    difficulty = db.Column(db.String(20), primary_key=True)
+    game_type = db.Column(db.String(20), primary_key=True)
+    games_played = db.Column(db.Integer, default=0, nullable=False)
+    games_completed = db.Column(db.Integer, default=0, nullable=False)
+    # Seconds across completed games, for the average session time
+    completed_time = db.Column(db.BigInteger, default=0, nullable=False)
+
+
+class DailyQuoteFact(db.Model):
+    """Daily challenge completions per quote per UTC day"""
+    day = db.Column(db.Date, primary_key=True)
+    # Not an FK, so deleting a quote does not have to touch its history
+    quote_id = db.Column(db.Integer, primary_key=True)
+    completions = db.Column(db.Integer, default=0, nullable=False)
+
+
+class AnalyticsWatermark(db.Model):
+    """Last UTC day each analytics pipeline has processed"""
+    name = db.Column(db.String(50), primary_key=True)
+    last_day = db.Column(db.Date, nullable=False)
+
+
 class AnonymousGameScore(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     anon_id = db.Column(db.String)  # Identifier for anonymous user
@@ -342,6 +690,36 @@ class AnonymousGameScore(db.Model):
     completed = db.Column(db.Boolean, default=True)
     won = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Game kind parsed from game_id, set by set_game_kind
+    is_daily = db.Column(db.Boolean, default=False, nullable=False)
+    is_hardcore = db.Column(db.Boolean, default=False, nullable=False)
+    challenge_date = db.Column(db.Date)
+
+    __table_args__ = (db.Index('idx_anon_game_score_daily',
+                               'challenge_date',
+                               postgresql_where=db.text('is_daily'),
+                               sqlite_where=db.text('is_daily')),
+                      db.Index('idx_anon_game_score_difficulty_created',
+                               'difficulty', 'created_at'))
+
+
+@event.listens_for(GameScore, 'before_insert')
+@event.listens_for(GameScore, 'before_update')
+@event.listens_for(ActiveGameState, 'before_insert')
+@event.listens_for(ActiveGameState, 'before_update')
+@event.listens_for(AnonymousGameScore, 'before_insert')
+@event.listens_for(AnonymousGameScore, 'before_update')
+def set_game_kind(mapper, connection, target):
+    kind = parse_game_id(target.game_id)
+    target.difficulty = kind['difficulty']
+    target.is_daily = kind['is_daily'] or getattr(target, 'game_type',
+                                                  None) == 'daily'
+    target.is_hardcore = kind['is_hardcore']
+    if kind['challenge_date']:
+        # GameScore keeps its original string column for the challenge date
+        target.challenge_date = (kind['challenge_date'].isoformat()
+                                 if isinstance(target, GameScore) else
+                                 kind['challenge_date'])
 
 
 class Promo(db.Model):
@@ -378,3 +756,42 @@ class PromoRedemption(db.Model):
     value = db.Column(db.Float)
 
     user = db.relationship('User', backref='promo_redemptions')
+
+
+class EmailCampaign(db.Model):
+    """An admin email send; templates are stored rendered for batch sending"""
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    text_body = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='queued',
+                       nullable=False)  # queued, sending, sent, failed
+    total_recipients = db.Column(db.Integer, default=0, nullable=False)
+    sent_count = db.Column(db.Integer, default=0, nullable=False)
+    failed_count = db.Column(db.Integer, default=0, nullable=False)
+    created_by = db.Column(db.String,
+                           db.ForeignKey('user.user_id'),
+                           nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+
+class EmailDelivery(db.Model):
+    """Delivery state of one campaign recipient"""
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer,
+                            db.ForeignKey('email_campaign.id'),
+                            nullable=False)
+    email = db.Column(db.String, nullable=False)
+    unique_token = db.Column(db.String(100))
+    status = db.Column(db.String(20), default='pending',
+                       nullable=False)  # pending, sent, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    message_id = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime,
+                           default=datetime.utcnow,
+                           onupdate=datetime.utcnow)
+
+    __table_args__ = (db.Index('idx_email_delivery_campaign_status',
+                               'campaign_id', 'status', 'id'), )
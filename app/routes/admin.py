@@ -2,19 +2,34 @@
 from flask import Blueprint, request, jsonify, redirect, url_for, render_template, current_app, send_file, session
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from werkzeug.security import check_password_hash
-from app.models import db, User, GameScore, UserStats, ActiveGameState, BackupRecord, BackupSettings, Quote, Backdoor
+from app.models import db, User, GameScore, UserStats, ActiveGameState, BackupRecord, BackupSettings, Quote, Backdoor, EmailCampaign
 import logging
 import os
 import subprocess
 from pathlib import Path
-import csv
-import io
 import tempfile
 from urllib.parse import urlparse
 from functools import wraps
 from datetime import datetime, timedelta
 import json
-import requests
+from app.utils.daily import invalidate_first_daily_date
+from app.utils.user_cache import get_cached_user, invalidate_user
+from app.utils.streaming import (iter_csv, iter_json_array, stream_download,
+                                 wants_gzip)
+from app.services.admin_metrics import get_dashboard_metrics
+from app.services.retention import get_retention
+from app.services.user_search import list_users
+from app.services.quote_search import search_quotes, get_author_facet
+from app.services.admin_exports import (QUOTE_EXPORT_HEADER,
+                                        CONSENTED_USER_FIELDS, iter_quote_rows,
+                                        ensure_unsubscribe_tokens,
+                                        iter_consented_users)
+from app.services.email_delivery import create_campaign, campaign_summary
+from app.services.quote_import import (BACKGROUND_IMPORT_BYTES, describe_import,
+                                       import_quotes_csv, queue_quote_import)
+from app.utils.analytics import (get_signup_total, get_game_totals,
+                                 get_user_growth, get_difficulty_distribution,
+                                 get_popular_quotes)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 logger = logging.getLogger(__name__)
@@ -35,7 +50,7 @@ def admin_required(f):
                         error="Please log in to access the admin area"))
 
         # Get the user
-        user = User.query.get(admin_id)
+        user = get_cached_user(admin_id)
 
         if not user or not user.is_admin:
             # Clear session and redirect
@@ -90,7 +105,7 @@ def admin_login_page():
     # Check if already logged in
     admin_id = session.get('admin_id')
     if admin_id:
-        user = User.query.get(admin_id)
+        user = get_cached_user(admin_id)
         if user and user.is_admin:
             return redirect(url_for('admin.dashboard'))
 
@@ -155,56 +170,20 @@ def dashboard(current_admin):
     """Admin dashboard home page"""
     # Get basic statistics
     try:
-        # User stats
-        total_users = User.query.count()
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_users = User.query.filter(User.created_at >= week_ago).count()
-        new_users_percentage = round(
-            (new_users / total_users) * 100) if total_users > 0 else 0
-
-        # Game stats
-        total_games = GameScore.query.count()
-        new_games = GameScore.query.filter(
-            GameScore.created_at >= week_ago).count()
-        new_games_percentage = round(
-            (new_games / total_games) * 100) if total_games > 0 else 0
-
-        # Active users (with games in the last 24 hours)
-        day_ago = datetime.utcnow() - timedelta(days=1)
-        active_users = db.session.query(GameScore.user_id).distinct().filter(
-            GameScore.created_at >= day_ago).count()
-
-        # Completion rate
-        completed_games = GameScore.query.filter_by(completed=True).count()
-        completion_rate = round(
-            (completed_games / total_games) * 100) if total_games > 0 else 0
-
-        # Last week's completion rate for comparison
-        two_weeks_ago = datetime.utcnow() - timedelta(days=14)
-        old_completed = GameScore.query.filter(
-            GameScore.created_at >= two_weeks_ago, GameScore.created_at
-            < week_ago, GameScore.completed == True).count()
-        old_total = GameScore.query.filter(
-            GameScore.created_at >= two_weeks_ago, GameScore.created_at
-            < week_ago).count()
-        old_completion_rate = round(
-            (old_completed / old_total) * 100) if old_total > 0 else 0
-        completion_rate_change = completion_rate - old_completion_rate
+        # Numbers come from the snapshot refreshed by Celery beat
+        metrics = get_dashboard_metrics()
 
         # Recent activities
         recent_activities = []
-        recent_games = GameScore.query.order_by(
-            GameScore.created_at.desc()).limit(5).all()
-        for game in recent_games:
-            user = User.query.get(game.user_id)
-            username = user.username if user else "Unknown"
-            time_ago = get_time_ago(game.created_at)
-            action = "Game Completed" if game.completed else "Game Started"
-            details = f"Score: {game.score}" if game.completed else f"Difficulty: {game.game_id.split('-')[0].capitalize()}"
+        for game in metrics['recent_games']:
+            action = "Game Completed" if game['completed'] else "Game Started"
+            details = f"Score: {game['score']}" if game['completed'] else f"Difficulty: {(game['difficulty'] or 'medium').capitalize()}"
 
             recent_activities.append({
-                "time_ago": time_ago,
-                "username": username,
+                "time_ago":
+                get_time_ago(datetime.fromisoformat(game['created_at']))
+                if game['created_at'] else "Unknown",
+                "username": game['username'],
                 "action": action,
                 "details": details
             })
@@ -221,14 +200,15 @@ def dashboard(current_admin):
 
         # Prepare stats dictionary
         stats = {
-            "total_users": total_users,
-            "new_users_percentage": new_users_percentage,
-            "total_games": total_games,
-            "new_games_percentage": new_games_percentage,
-            "active_users": active_users,
-            "completion_rate": completion_rate,
-            "completion_rate_change": completion_rate_change,
-            "last_updated": "Just now"
+            "total_users": metrics['total_users'],
+            "new_users_percentage": metrics['new_users_percentage'],
+            "total_games": metrics['total_games'],
+            "new_games_percentage": metrics['new_games_percentage'],
+            "active_users": metrics['active_users'],
+            "completion_rate": metrics['completion_rate'],
+            "completion_rate_change": metrics['completion_rate_change'],
+            "last_updated":
+            get_time_ago(datetime.fromisoformat(metrics['generated_at']))
         }
 
         return render_template('admin/dashboard_home.html',
@@ -264,38 +244,30 @@ def dashboard(current_admin):
 @admin_required
 def users(current_admin):
     """User management page"""
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     per_page = 10
 
     search_query = request.args.get('search', '')
     status_filter = request.args.get('status', '')
 
-    # Base query
-    query = User.query
-
-    # Apply search filter
-    if search_query:
-        query = query.filter((User.username.ilike(f'%{search_query}%'))
-                             | (User.email.ilike(f'%{search_query}%')))
-
     # Apply status filter (would need to add status column or logic)
     # For now, we'll leave this as a placeholder
 
-    # Execute query with pagination
-    pagination = query.paginate(page=page, per_page=per_page)
-    users_list = pagination.items
+    # Keyset pagination with game counts fetched in the same query
+    rows, next_cursor = list_users(search_query.strip(), cursor, per_page)
 
-    # Enhance user data with game count
-    for user in users_list:
-        user.games_count = GameScore.query.filter_by(
-            user_id=user.user_id).count()
+    users_list = []
+    for user, games_count in rows:
+        user.games_count = games_count
         # Add a placeholder for suspension status
         user.is_suspended = False  # This would need actual implementation
+        users_list.append(user)
 
     return render_template('admin/users.html',
                            active_tab='users',
                            users=users_list,
-                           pagination=pagination,
+                           cursor=cursor,
+                           next_cursor=next_cursor,
                            search_query=search_query,
                            status_filter=status_filter)
 
@@ -348,6 +320,7 @@ def reset_password(current_admin, user_id):
     # Update user's password
     user.set_password(new_password)
     db.session.commit()
+    invalidate_user(user_id)
 
     # Log the action
     logger.info(
@@ -389,21 +362,11 @@ def quotes(current_admin):
     author_filter = request.args.get('author', '')
 
     try:
-        # Base query
-        query = Quote.query
-
-        # Apply search filter
-        if search_query:
-            query = query.filter((Quote.text.ilike(f'%{search_query}%'))
-                                 | (Quote.author.ilike(f'%{search_query}%')))
-
-        # Apply author filter
-        if author_filter:
-            query = query.filter(Quote.author == author_filter)
+        # Ranked full-text search, optionally within one author
+        query = search_quotes(search_query, author_filter)
 
-        # Get distinct authors for filter dropdown
-        authors = db.session.query(Quote.author).distinct().all()
-        authors = [author[0] for author in authors]
+        # Cached distinct authors for the filter dropdown
+        authors = get_author_facet()
 
         # Execute query with pagination
         pagination = query.paginate(page=page, per_page=per_page)
@@ -412,7 +375,7 @@ def quotes(current_admin):
         return render_template('admin/quotes.html',
                                active_tab='quotes',
                                quotes=quotes_list,
-                               authors=sorted(authors),
+                               authors=authors,
                                pagination=pagination,
                                search_query=search_query,
                                author_filter=author_filter)
@@ -690,40 +653,34 @@ def analytics(current_admin):
     # Get date range
     date_range = request.args.get('date_range', 'last_30_days')
 
-    if date_range == 'last_7_days':
-        start_date = datetime.utcnow() - datetime.timedelta(days=7)
-    elif date_range == 'last_90_days':
-        start_date = datetime.utcnow() - datetime.timedelta(days=90)
-    elif date_range == 'last_year':
-        start_date = datetime.utcnow() - datetime.timedelta(days=365)
-    elif date_range == 'all_time':
-        start_date = datetime(2000, 1, 1)  # A date far in the past
-    else:  # default to 30 days
-        start_date = datetime.utcnow() - timedelta(days=30)
-
-    # Basic statistics for cards
+    # Facts are complete up to yesterday, so ranges end at the start of today
+    end_day = datetime.utcnow().date()
+    range_days = {
+        'last_7_days': 7,
+        'last_90_days': 90,
+        'last_year': 365,
+        'all_time': None
+    }.get(date_range, 30)
+    start_day = end_day - timedelta(days=range_days) if range_days else None
+
+    # Basic statistics for cards, read from the nightly fact tables
     try:
         # New Users
-        new_users = User.query.filter(User.created_at >= start_date).count()
-        total_users = User.query.count()
+        new_users = get_signup_total(start_day, end_day)
+        total_users = get_signup_total(None, end_day)
         new_users_percentage = round(
             (new_users / total_users) * 100) if total_users > 0 else 0
 
         # Games Played
-        games_played = GameScore.query.filter(
-            GameScore.created_at >= start_date).count()
-        total_games = GameScore.query.count()
+        games_played, completed_games, completed_time = get_game_totals(
+            start_day, end_day)
+        total_games = get_game_totals(None, end_day)[0]
         games_percentage = round(
             (games_played / total_games) * 100) if total_games > 0 else 0
 
         # Average Session Time
-        game_times = db.session.query(GameScore.time_taken).filter(
-            GameScore.created_at >= start_date,
-            GameScore.completed == True).all()
-
-        avg_session = 0
-        if game_times:
-            avg_seconds = sum(t[0] for t in game_times) / len(game_times)
+        if completed_games:
+            avg_seconds = completed_time / completed_games
             minutes = int(avg_seconds // 60)
             seconds = int(avg_seconds % 60)
             avg_session_display = f"{minutes}:{seconds:02d}"
@@ -731,44 +688,30 @@ def analytics(current_admin):
             avg_session_display = "0:00"
 
         # Completion Rate
-        completed_games = GameScore.query.filter(
-            GameScore.created_at >= start_date,
-            GameScore.completed == True).count()
-
-        period_games = GameScore.query.filter(
-            GameScore.created_at >= start_date).count()
-
         completion_rate = round(
-            (completed_games / period_games) * 100) if period_games > 0 else 0
+            (completed_games / games_played) * 100) if games_played > 0 else 0
 
         # Previous period for comparison
-        period_length = (datetime.utcnow() - start_date).days
-        prev_start_date = start_date - timedelta(days=period_length)
-
-        prev_completed = GameScore.query.filter(
-            GameScore.created_at >= prev_start_date, GameScore.created_at
-            < start_date, GameScore.completed == True).count()
-
-        prev_total = GameScore.query.filter(
-            GameScore.created_at >= prev_start_date, GameScore.created_at
-            < start_date).count()
-
-        prev_completion_rate = round(
-            (prev_completed / prev_total) * 100) if prev_total > 0 else 0
-        completion_rate_change = completion_rate - prev_completion_rate
+        completion_rate_change = 0
+        if start_day:
+            prev_total, prev_completed, _ = get_game_totals(
+                start_day - timedelta(days=range_days), start_day)
+            prev_completion_rate = round(
+                (prev_completed / prev_total) * 100) if prev_total > 0 else 0
+            completion_rate_change = completion_rate - prev_completion_rate
 
         # Data for charts
         # User Growth
-        user_growth_data = get_user_growth_data(start_date)
+        user_growth_data = get_user_growth(start_day, end_day)
 
         # Difficulty Distribution
-        difficulty_data = get_difficulty_distribution(start_date)
+        difficulty_data = get_difficulty_distribution(start_day, end_day)
 
-        # User Retention
-        retention_data = get_user_retention_data(start_date)
+        # User Retention, weekly cohorts
+        retention_data = get_retention(start_day, end_day)
 
         # Popular Quotes
-        quotes_data = get_popular_quotes_data(start_date)
+        quotes_data = get_popular_quotes(start_day, end_day)
 
         return render_template('admin/analytics.html',
                                active_tab='analytics',
@@ -797,113 +740,6 @@ def analytics(current_admin):
                                error=f"Error loading analytics: {str(e)}")
 
 
-# Helper functions for analytics
-def get_user_growth_data(start_date):
-    """Get user growth data for chart"""
-    # This is a placeholder - in a real implementation,
-    # you would query the database for actual user registration counts
-    # grouped by day/week/month depending on the date range
-    return [{
-        "date": "2023-05-01",
-        "count": 10
-    }, {
-        "date": "2023-05-08",
-        "count": 15
-    }, {
-        "date": "2023-05-15",
-        "count": 12
-    }, {
-        "date": "2023-05-22",
-        "count": 20
-    }, {
-        "date": "2023-05-29",
-        "count": 25
-    }, {
-        "date": "2023-06-05",
-        "count": 30
-    }, {
-        "date": "2023-06-12",
-        "count": 28
-    }, {
-        "date": "2023-06-19",
-        "count": 35
-    }, {
-        "date": "2023-06-26",
-        "count": 42
-    }]
-
-
-def get_difficulty_distribution(start_date):
-    """Get game difficulty distribution data for chart"""
-    # Placeholder data
-    return [{
-        "difficulty": "Easy",
-        "count": 250
-    }, {
-        "difficulty": "Medium",
-        "count": 450
-    }, {
-        "difficulty": "Hard",
-        "count": 150
-    }]
-
-
-def get_user_retention_data(start_date):
-    """Get user retention data for chart"""
-    # Placeholder data
-    return [{
-        "cohort": "Week 1",
-        "week1": 100,
-        "week2": 80,
-        "week3": 65,
-        "week4": 55
-    }, {
-        "cohort": "Week 2",
-        "week1": 100,
-        "week2": 85,
-        "week3": 70,
-        "week4": 60
-    }, {
-        "cohort": "Week 3",
-        "week1": 100,
-        "week2": 75,
-        "week3": 60,
-        "week4": 50
-    }, {
-        "cohort": "Week 4",
-        "week1": 100,
-        "week2": 82,
-        "week3": 68,
-        "week4": 58
-    }]
-
-
-def get_popular_quotes_data(start_date):
-    """Get popular quotes data for chart"""
-    # Placeholder data
-    return [{
-        "quote": "Knowledge is power",
-        "author": "Francis Bacon",
-        "count": 45
-    }, {
-        "quote": "Time is money",
-        "author": "Benjamin Franklin",
-        "count": 38
-    }, {
-        "quote": "To be or not to be",
-        "author": "William Shakespeare",
-        "count": 32
-    }, {
-        "quote": "I think, therefore I am",
-        "author": "René Descartes",
-        "count": 29
-    }, {
-        "quote": "Science is organized knowledge",
-        "author": "Herbert Spencer",
-        "count": 26
-    }]
-
-
 # Edit quote
 @admin_bp.route('/quotes/edit', methods=['POST'])
 @admin_required
@@ -941,6 +777,7 @@ def edit_quote(current_admin):
 
         quote.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_first_daily_date()
 
         logger.info(f"Admin {current_admin.username} edited quote #{quote_id}")
         return redirect(
@@ -954,32 +791,13 @@ def edit_quote(current_admin):
 @admin_bp.route('/quotes/export', methods=['GET'])
 @admin_required
 def export_quotes(current_admin):
-    """Export quotes as CSV"""
+    """Export quotes as CSV, streamed; add ?gzip=1 for a compressed file"""
     try:
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow([
-            'text', 'author', 'minor_attribution', 'daily_date', 'times_used'
-        ])
-
-        # Write quotes
-        quotes = Quote.query.all()
-        for quote in quotes:
-            writer.writerow([
-                quote.text, quote.author, quote.minor_attribution,
-                quote.daily_date.isoformat() if quote.daily_date else '',
-                quote.times_used
-            ])
-
-        # Prepare response
-        output.seek(0)
-        return send_file(io.BytesIO(output.getvalue().encode('utf-8')),
-                         mimetype='text/csv',
-                         as_attachment=True,
-                         download_name='quotes.csv')
+        return stream_download(iter_csv(QUOTE_EXPORT_HEADER,
+                                        iter_quote_rows()),
+                               'text/csv',
+                               'quotes.csv',
+                               compress=wants_gzip())
 
     except Exception as e:
         logger.error(f"Error exporting quotes: {str(e)}")
@@ -999,64 +817,36 @@ def import_quotes(current_admin, is_backdoor=False):
         return redirect(url_for('admin.quotes', error="No file selected"))
 
     replace_existing = request.form.get('replace_existing', 'off') == 'on'
-    is_backdoor = request.form.get('is_backdoor', 'false') == 'true'
-    QuoteModel = Backdoor if is_backdoor else Quote
+    is_backdoor = is_backdoor or request.form.get('is_backdoor',
+                                                  'false') == 'true'
     try:
-        # Read CSV file
-        file_content = file.stream.read().decode(
-            "UTF-8-sig")  # Use UTF-8-sig to handle BOM
-        stream = io.StringIO(file_content, newline=None)
-        reader = csv.DictReader(stream)
-
-        # Store all rows in memory
-        rows = list(reader)
-
-        # Validate CSV structure
-        if not rows:
-            return redirect(url_for('admin.quotes', error="CSV file is empty"))
-
-        # Check if required fields exist (handle BOM in field names)
-        fieldnames = reader.fieldnames
-        has_text = any(field.endswith('text') for field in fieldnames)
-        has_author = 'author' in fieldnames
-
-        if not has_text or not has_author:
-            missing = []
-            if not has_text:
-                missing.append("text")
-            if not has_author:
-                missing.append("author")
+        if (request.content_length or 0) > BACKGROUND_IMPORT_BYTES:
+            task_id = queue_quote_import(file, is_backdoor, replace_existing)
+            logger.info(
+                f"Admin {current_admin.username} queued quote import "
+                f"(task {task_id}, backdoor: {is_backdoor})")
+            status_url = url_for('admin_process.import_quotes_status',
+                                 task_id=task_id)
             return redirect(
                 url_for(
                     'admin.quotes',
-                    error=f"Missing required fields: {', '.join(missing)}"))
-
-        if replace_existing:
-            # Delete existing quotes
-            QuoteModel.query.delete()
-
-        # Import quotes
-        text_field = next(field for field in fieldnames
-                          if field.endswith('text'))
-        count = 0
-
-        for row in rows:
-            quote = QuoteModel(
-                text=row[text_field],  # Use the detected text field name
-                author=row['author'],
-                minor_attribution=row.get('minor_attribution', ''),
-                active=True)
-            db.session.add(quote)
-            count += 1
+                    success=
+                    f"Large import queued. Progress and report: {status_url}"))
+
+        report = import_quotes_csv(file.stream,
+                                   Backdoor if is_backdoor else Quote,
+                                   replace_existing)
+        if not report['rows']:
+            return redirect(url_for('admin.quotes', error="CSV file is empty"))
 
-        db.session.commit()
         logger.info(
-            f"Admin {current_admin.username} imported {count} quotes from CSV - isbackdoor: {is_backdoor}"
-        )
-        return redirect(
-            url_for('admin.quotes',
-                    success=f"Successfully imported {count} quotes"))
+            f"Admin {current_admin.username} imported {report['imported']} "
+            f"quotes from CSV - isbackdoor: {is_backdoor}")
+        return redirect(url_for('admin.quotes', success=describe_import(report)))
 
+    except ValueError as e:
+        db.session.rollback()
+        return redirect(url_for('admin.quotes', error=str(e)))
     except Exception as e:
         logger.error(f"Error importing quotes: {str(e)}")
         db.session.rollback()  # Ensure we rollback on error
@@ -1288,32 +1078,38 @@ def create_backup(current_admin):
 @admin_bp.route('/export-consented-users', methods=['GET'])
 @admin_required
 def export_consented_users(current_admin):
-    """Export consented users data as JSON"""
+    """
+    Export consented users as a streamed JSON array, or as CSV with
+    ?format=csv; add ?gzip=1 for a compressed file
+    """
     try:
-        users = User.query.filter_by(email_consent=True).all()
-        users_data = []
-
-        for user in users:
-            if not user.unsubscribe_token:
-                user.generate_unsubscribe_token()
-
-            users_data.append({
-                "email": user.email,
-                "firstname": user.username,  # Using username as firstname
-                "unique_token": user.unsubscribe_token
-            })
-
-        return jsonify(users_data)
+        # Tokens are filled in first so the stream itself only reads
+        ensure_unsubscribe_tokens()
+
+        users = iter_consented_users()
+        if request.args.get('format') == 'csv':
+            rows = (tuple(user[field] for field in CONSENTED_USER_FIELDS)
+                    for user in users)
+            return stream_download(iter_csv(CONSENTED_USER_FIELDS, rows),
+                                   'text/csv',
+                                   'consented-users.csv',
+                                   compress=wants_gzip())
+
+        return stream_download(iter_json_array(users),
+                               'application/json',
+                               'consented-users.json',
+                               compress=wants_gzip())
 
     except Exception as e:
         logger.error(f"Error exporting consented users: {str(e)}")
+        db.session.rollback()
         return jsonify({"error": f"Error exporting users: {str(e)}"}), 500
 
 
 @admin_bp.route('/send_email', methods=['POST'])
 @admin_required
 def send_email(current_admin):
-    """Send email using templates and variables"""
+    """Queue an email campaign from the templates and recipient list"""
     try:
         # Load templates and variables
         with open('emailupdates/plaintext.txt', 'r') as f:
@@ -1325,47 +1121,38 @@ def send_email(current_admin):
         with open('emailupdates/recipients.json', 'r') as f:
             recipients = json.load(f)
 
-        # Get Mailgun configuration
-        MAILGUN_API_KEY = current_app.config['MAILGUN_API_KEY']
-        MAILGUN_DOMAIN = current_app.config['MAILGUN_DOMAIN']
-
-        # Send to each recipient
-        success_count = 0
-        for recipient in recipients:
-            # Format templates with recipient variables
-            plain_content = plain_template.replace("{{unique_token}}",
-                                                   recipient['unique_token'])
-            html_content = html_template.replace("{{unique_token}}",
-                                                 recipient['unique_token'])
-
-            # Prepare email data
-            data = {
-                "from": f"Admin <noreply@{MAILGUN_DOMAIN}>",
-                "to": recipient['email'],
-                "subject": request.form.get('subject'),
-                "text": plain_content,
-                "html": html_content
-            }
-
-            # Send via Mailgun
-            response = requests.post(
-                f"https://api.mailgun.net/v3/{MAILGUN_DOMAIN}/messages",
-                auth=("api", MAILGUN_API_KEY),
-                data=data)
+        campaign = create_campaign(request.form.get('subject'),
+                                   plain_template,
+                                   html_template,
+                                   recipients,
+                                   created_by=current_admin.user_id)
 
-            if response.status_code != 200:
-                logger.error(
-                    f"Failed to send email to {recipient['email']}: {response.text}"
-                )
-            else:
-                success_count += 1
+        # Sent in batches by a worker, not in this request
+        from app.celery_worker import send_email_campaign_task
+        send_email_campaign_task.delay(campaign.id)
 
         logger.info(
-            f"Admin {current_admin.username} sent emails to {success_count} recipients"
-        )
-        return jsonify(
-            {"message": f"Successfully sent {success_count} emails"}), 200
+            f"Admin {current_admin.username} queued campaign {campaign.id} "
+            f"to {campaign.total_recipients} recipients")
+        return jsonify({
+            "message":
+            f"Queued emails to {campaign.total_recipients} recipients",
+            "campaign_id": campaign.id,
+            "status_url": url_for('admin.email_campaign_status',
+                                  campaign_id=campaign.id)
+        }), 202
 
     except Exception as e:
         logger.error(f"Error sending email: {str(e)}")
+        db.session.rollback()
         return jsonify({"error": f"Error sending email: {str(e)}"}), 500
+
+
+@admin_bp.route('/email-campaigns/<int:campaign_id>', methods=['GET'])
+@admin_required
+def email_campaign_status(current_admin, campaign_id):
+    """Delivery progress of an email campaign"""
+    campaign = EmailCampaign.query.get(campaign_id)
+    if not campaign:
+        return jsonify({"error": "Campaign not found"}), 404
+    return jsonify(campaign_summary(campaign))
@@ -6,21 +6,21 @@ This file contains the route handlers for form submissions from the admin interf
 
 from flask import Blueprint, request, jsonify, redirect, url_for, render_template, flash, current_app, session
 from werkzeug.security import generate_password_hash, check_password_hash
-from app.models import db, User, GameScore, UserStats, ActiveGameState, BackupSettings, DailyCompletion, Quote, DailyCompletion, Backdoor  # Added Backdoor import
+from app.models import db, User, GameScore, UserStats, BackupSettings, DailyCompletion, Quote, Backdoor  # Added Backdoor import
 import logging
 import os
 import secrets
 import json
-import io  #Added io import for CSV handling
-import csv  #Added csv import for CSV handling
 from datetime import datetime, timedelta
 from pathlib import Path
 import smtplib
-import random
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from sqlalchemy import func, text
-import re
+from app.services.account_deletion import request_account_deletion
+from app.services.quote_import import (BACKGROUND_IMPORT_BYTES, describe_import,
+                                       import_quotes_csv, queue_quote_import)
+from app.utils.quote_text import fix_encoding
+from app.utils.user_cache import get_cached_user, user_cache_stats
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -47,7 +47,7 @@ def admin_required(f):
                         error="Please log in to access the admin area"))
 
         # Get the user
-        user = User.query.get(admin_id)
+        user = get_cached_user(admin_id)
 
         if not user or not user.is_admin:
             # Clear session and redirect
@@ -68,7 +68,6 @@ def recalculate_weekly_winners(current_admin):
     try:
         from datetime import datetime, timedelta
         from app.models import LeaderboardEntry, GameScore, User
-        from sqlalchemy import func
 
         # Get the date of the first game ever played
         first_game = GameScore.query.order_by(
@@ -938,170 +937,41 @@ def register_admin_process_routes(app):
 @admin_process_bp.route('/populate-daily-dates', methods=['GET'])
 @admin_required
 def populate_daily_dates(current_admin):
-    """Populate daily dates for quotes that meet criteria while preserving today's quote"""
+    """Fill unscheduled daily dates in the rolling horizon without touching existing ones"""
     try:
-        # Get today's date
-        today = datetime.utcnow().date()
+        from app.celery_worker import extend_daily_schedule_task
 
-        # Find and preserve today's quote using raw SQL
-        today_id = None
-        result = db.session.execute(
-            text("SELECT id FROM quote WHERE daily_date = :today"), {
-                "today": today
-            }).fetchone()
-
-        if result:
-            today_id = result[0]
-            logger.info(f"Found today's quote with ID: {today_id}")
-
-        # Clear all other daily dates using ORM
         try:
-            if today_id:
-                Quote.query.filter(Quote.id != today_id).update(
-                    {"daily_date": None}, synchronize_session=False)
-            else:
-                Quote.query.update({"daily_date": None},
-                                   synchronize_session=False)
-
-            db.session.commit()
-            logger.info("Successfully cleared existing daily dates")
-        except Exception as clear_error:
-            db.session.rollback()
-            logger.error(f"Error clearing daily dates: {str(clear_error)}")
+            task = extend_daily_schedule_task.delay()
+            logger.info(
+                f"Admin {current_admin.username} queued daily schedule extension (task {task.id})"
+            )
             return redirect(
                 url_for(
                     'admin.quotes',
-                    error=f"Error clearing daily dates: {str(clear_error)}"))
-
-        # Start from tomorrow
-        tomorrow = today + timedelta(days=1)
-        current_date = tomorrow
-
-        # Get eligible quotes but check for encoding issues
-        eligible_quotes = Quote.query.filter(Quote.active == True,
-                                             func.length(Quote.text) <= 65,
-                                             Quote.unique_letters <= 15,
-                                             Quote.daily_date.is_(None)).all()
-
-        # Identify quotes with encoding issues
-        good_quotes = []
-        problematic_quotes = []
-
-        for quote in eligible_quotes:
-            try:
-                # Test for encoding issues
-                quote_id = quote.id
-                quote_text = quote.text
-                quote_author = quote.author
-                encoded_text = quote_text.encode('utf-8')
-                encoded_author = quote_author.encode('utf-8')
-
-                # If we made it here without exception, add to good quotes
-                good_quotes.append(quote)
-            except UnicodeEncodeError as encode_error:
-                # Add to problematic quotes with details
-                problematic_quotes.append({
-                    'id': quote_id,
-                    'text': quote_text,
-                    'author': quote_author,
-                    'error': str(encode_error),
-                })
-                logger.warning(f"Encoding issue with quote ID {quote_id}:\n"
-                               f"Text: {quote_text}\n"
-                               f"Author: {quote_author}\n"
-                               f"Error: {str(encode_error)}")
-
-        # Log problematic quotes
-        if problematic_quotes:
+                    success=
+                    "Daily schedule extension queued. Open dates in the next year will be filled shortly."
+                ))
+        except Exception as queue_error:
+            # Broker unavailable - the incremental fill is cheap enough to run inline
             logger.warning(
-                f"Found {len(problematic_quotes)} quotes with encoding issues:"
+                f"Could not queue daily schedule extension, running inline: {str(queue_error)}"
             )
-            for q in problematic_quotes:
-                logger.warning(f"  Quote ID {q['id']}: {q['error']}")
-
-        # Group quotes by daily usage
-        daily_usage_counts = db.session.query(
-            DailyCompletion.quote_id,
-            func.count(func.distinct(DailyCompletion.challenge_date)).label(
-                'daily_usage_count')).group_by(DailyCompletion.quote_id).all()
-
-        # Convert to dict for easy lookup
-        daily_usage_dict = {q_id: count for q_id, count in daily_usage_counts}
-
-        # Sort quotes by usage
-        never_used = []
-        used_once = []
-        used_multiple = []
-
-        for quote in good_quotes:
-            daily_count = daily_usage_dict.get(quote.id, 0)
-
-            if daily_count == 0:
-                never_used.append(quote)
-            elif daily_count == 1:
-                used_once.append(quote)
-            else:
-                used_multiple.append(quote)
 
-        # Randomize each group
-        random.shuffle(never_used)
-        random.shuffle(used_once)
-        random.shuffle(used_multiple)
-
-        # Combine in priority order
-        prioritized_quotes = never_used + used_once + used_multiple
-
-        # Update all quotes in a single SQL transaction
-        update_values = []
-        for i, quote in enumerate(prioritized_quotes):
-            update_values.append(
-                f"({quote.id}, '{(current_date + timedelta(days=i)).isoformat()}')"
-            )
+        from app.services.daily_scheduler import extend_daily_schedule
+        result = extend_daily_schedule()
 
-        if update_values:
-            # Build and execute update SQL
-            sql = f"""
-                UPDATE quote SET daily_date = dates.daily_date::date
-                FROM (VALUES {','.join(update_values)}) 
-                AS dates(id, daily_date)
-                WHERE quote.id = dates.id::integer
-            """
-            db.session.execute(text(sql))
-            db.session.commit()
-            total_assigned = len(update_values)
-            logger.info(
-                f"Assigned {total_assigned} daily dates in single transaction")
-
-        # Prepare result message
-        preserved_msg = " (preserved today's quote)" if today_id else ""
-        problem_msg = ""
-
-        if problematic_quotes:
-            problem_ids = ", ".join(str(q['id']) for q in problematic_quotes)
-            problem_msg = f" Found {len(problematic_quotes)} quotes with encoding issues (IDs: {problem_ids})."
-            logger.info(
-                f"Populated {total_assigned} daily dates{preserved_msg}. {problem_msg}"
-            )
-
-            # Return with warning about problematic quotes
+        message = (f"Filled {result['assigned']} of {result['missing']} open "
+                   f"daily dates ({result['recycled']} recycled).")
+        if result['unfilled']:
             return redirect(
                 url_for(
                     'admin.quotes',
                     warning=
-                    f"Successfully populated {total_assigned} daily dates{preserved_msg}. {problem_msg}"
+                    f"{message} {result['unfilled']} dates still need eligible quotes."
                 ))
-        else:
-            logger.info(
-                f"Populated {total_assigned} daily dates{preserved_msg} with no encoding issues."
-            )
 
-            # Return success message
-            return redirect(
-                url_for(
-                    'admin.quotes',
-                    success=
-                    f"Successfully populated {total_assigned} daily dates{preserved_msg}"
-                ))
+        return redirect(url_for('admin.quotes', success=message))
 
     except Exception as e:
         logger.error(f"Error populating daily dates: {str(e)}", exc_info=True)
@@ -1123,20 +993,19 @@ def delete_user(current_admin, user_id):
             )
             return redirect(url_for('admin.users', error="User not found"))
 
-        # Delete user's related data
-        GameScore.query.filter_by(user_id=user_id).delete()
-        UserStats.query.filter_by(user_id=user_id).delete()
-        ActiveGameState.query.filter_by(user_id=user_id).delete()
-        DailyCompletion.query.filter_by(user_id=user_id).delete()
+        if user.pending_deletion:
+            return redirect(
+                url_for('admin.users',
+                        error="User deletion is already in progress"))
 
-        # Delete the user
-        db.session.delete(user)
-        db.session.commit()
+        # Revoke the user's tokens and delete their data in the background
+        request_account_deletion(user)
 
         logger.info(
-            f"Admin {current_admin.username} deleted user {user.username}")
+            f"Admin {current_admin.username} scheduled deletion of user {user.username}"
+        )
         return redirect(
-            url_for('admin.users', success="User deleted successfully"))
+            url_for('admin.users', success="User scheduled for deletion"))
 
     except Exception as e:
         logger.error(f"Error deleting user: {str(e)}")
@@ -1446,27 +1315,6 @@ def scheduled_recalculate_all_stats():
 def fix_quote_encoding(current_admin):
     """Fix mangled encoding in quotes"""
     try:
-        # Common encoding replacements
-        replacements = {
-            '’': "'",  # Right single quote'
-            '—': '-',  # Em dash'
-            '“': '"',  # Left double quote''
-            '”': '"',  # Right double quote''
-            'É': 'E',  # Capital E with acute accent
-            "é": 'e',  # lower case E with acute accent
-            '': "'",  # Unknown character
-            '‚Äô': "'",  # Smart single quote
-            '‚Äù': '"',  # Smart double quote open
-            '‚Äú': '"',  # Smart double quote close
-            '‚Äî': '—',  # Em dash
-            '‚Äì': '–',  # En dash
-            '‚Ä¢': '•',  # Bullet
-            '‚Ä¦': '…',  # Ellipsis
-            '‚Äï': '"',  # Another smart quote variant
-            '‚Äò': "'",  # Another single quote variant
-            '‚Äó': "'",  # Another single quote variant
-        }
-
         # Get all quotes
         quotes = Quote.query.all()
 
@@ -1475,28 +1323,16 @@ def fix_quote_encoding(current_admin):
 
         for quote in quotes:
             original_text = quote.text
-            original_author = quote.author
-            original_minor = quote.minor_attribution
-
-            # Check and fix text
-            needs_update = False
-            new_text = original_text
-            new_author = original_author
-            new_minor = original_minor
-
-            # Apply all replacements to each field
-            for bad, good in replacements.items():
-                if bad in new_text:
-                    new_text = new_text.replace(bad, good)
-                    needs_update = True
 
-                if bad in new_author:
-                    new_author = new_author.replace(bad, good)
-                    needs_update = True
-
-                if new_minor and bad in new_minor:
-                    new_minor = new_minor.replace(bad, good)
-                    needs_update = True
+            # Apply the shared replacement table to each field
+            new_text = fix_encoding(original_text)
+            new_author = fix_encoding(quote.author)
+            new_minor = fix_encoding(quote.minor_attribution
+                                     ) if quote.minor_attribution else (
+                                         quote.minor_attribution)
+            needs_update = (new_text, new_author,
+                            new_minor) != (original_text, quote.author,
+                                           quote.minor_attribution)
 
             # Update the quote if needed
             if needs_update:
@@ -1536,8 +1372,12 @@ def fix_quote_encoding(current_admin):
 
 @admin_process_bp.route('/quotes/import', methods=['POST'])
 @admin_required
-def import_quotes(current_admin, is_backdoor=False):
+def import_quotes(current_admin):
     """Import quotes from CSV"""
+    return _import_quotes_upload(current_admin)
+
+
+def _import_quotes_upload(current_admin, is_backdoor=False):
     if 'csv_file' not in request.files:
         return redirect(url_for('admin.quotes', error="No file provided"))
 
@@ -1546,59 +1386,39 @@ def import_quotes(current_admin, is_backdoor=False):
         return redirect(url_for('admin.quotes', error="No file selected"))
 
     replace_existing = request.form.get('replace_existing', 'off') == 'on'
-    is_backdoor = request.form.get('is_backdoor', 'false') == 'true'
-    QuoteModel = Backdoor if is_backdoor else Quote
-
+    is_backdoor = is_backdoor or request.form.get('is_backdoor',
+                                                  'false') == 'true'
     try:
-        # Read CSV file
-        file_content = file.stream.read().decode(
-            "UTF-8-sig")  # Use UTF-8-sig to handle
-        stream = io.StringIO(file_content, newline=None)
-        reader = csv.DictReader(stream)
-
-        # Store all rows in memory
-        rows = list(reader)
-
-        # Validate CSV structure
-        if not rows:
-            return redirect(url_for('admin.quotes', error="CSV file is empty"))
-
-        # Check if required fields exist (handle BOM in field names)
-        fieldnames = reader.fieldnames
-        has_text = any(field.endswith('text') for field in fieldnames)
-        has_author = 'author' in fieldnames
-
-        if not has_text or not has_author:
-            missing = []
-            if not has_text:
-                missing.append("text")
-            if not has_author:
-                missing.append("author")
+        if (request.content_length or 0) > BACKGROUND_IMPORT_BYTES:
+            task_id = queue_quote_import(file, is_backdoor, replace_existing)
+            logger.info(
+                f"Admin {current_admin.username} queued quote import "
+                f"(task {task_id}, backdoor: {is_backdoor})")
+            status_url = url_for('admin_process.import_quotes_status',
+                                 task_id=task_id)
             return redirect(
                 url_for(
                     'admin.quotes',
-                    error=f"Missing required fields: {', '.join(missing)}"))
-
-        if replace_existing:
-            # Delete existing quotes
-            QuoteModel.query.delete()
+                    success=
+                    f"Large import queued. Progress and report: {status_url}"))
 
-        # Process rows
-        for row in rows:
-            quote = QuoteModel(text=row['text'], author=row['author'])
-            db.session.add(quote)
+        report = import_quotes_csv(file.stream,
+                                   Backdoor if is_backdoor else Quote,
+                                   replace_existing)
+        if not report['rows']:
+            return redirect(url_for('admin.quotes', error="CSV file is empty"))
 
-        db.session.commit()
         logger.info(
-            f"Admin {current_admin.username} imported {len(rows)} quotes{' (backdoor)' if is_backdoor else ''}"
-        )
-        return redirect(
-            url_for('admin.quotes',
-                    success=f"Successfully imported {len(rows)} quotes"))
+            f"Admin {current_admin.username} imported {report['imported']} "
+            f"quotes from CSV - isbackdoor: {is_backdoor}")
+        return redirect(url_for('admin.quotes', success=describe_import(report)))
 
+    except ValueError as e:
+        db.session.rollback()
+        return redirect(url_for('admin.quotes', error=str(e)))
     except Exception as e:
         logger.error(f"Error importing quotes: {str(e)}")
-        db.session.rollback()
+        db.session.rollback()  # Ensure we rollback on error
         return redirect(
             url_for('admin.quotes', error=f"Error importing quotes: {str(e)}"))
 
@@ -1607,7 +1427,7 @@ def import_quotes(current_admin, is_backdoor=False):
 @admin_required
 def import_backdoor_quotes(current_admin):
     """Import backdoor quotes from CSV using a separate route"""
-    return import_quotes(current_admin, is_backdoor=True)
+    return _import_quotes_upload(current_admin, is_backdoor=True)
 
 
 def register_admin_process_routes(app):
@@ -1623,162 +1443,73 @@ def register_admin_process_routes(app):
 @admin_required
 def cleanup_duplicate_games(current_admin):
     """
-    Mass cleanup endpoint to fix existing duplicate games
-    Should be called sparingly and preferably by admin users
+    Queue the background cleanup of duplicate games.
+    Pass dry_run=1 to only report what would be deleted.
     """
     try:
-        # Get all games for all users
-        all_games = GameScore.query.all()
-        
-        # More comprehensive grouping approach
-        uuid_groups = {}
-        unmatched_games = []
-        
-        for game in all_games:
-            uuid_part = extract_uuid_from_constructed_id(game.game_id)
-            if uuid_part:
-                # Normalize to uppercase for consistent grouping
-                uuid_part = uuid_part.upper()
-                if uuid_part not in uuid_groups:
-                    uuid_groups[uuid_part] = []
-                uuid_groups[uuid_part].append(game)
-            else:
-                # Track games that don't match UUID pattern for manual review
-                unmatched_games.append(game)
-
-        # Also try alternative matching for games that didn't match
-        # Check if any unmatched games are actually just raw UUIDs
-        for game in unmatched_games[:]:  # Use slice to modify list while iterating
-            game_id_upper = game.game_id.upper()
-            # Check if it's a raw UUID format
-            if re.match(r'^[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}$', game_id_upper):
-                if game_id_upper not in uuid_groups:
-                    uuid_groups[game_id_upper] = []
-                uuid_groups[game_id_upper].append(game)
-                unmatched_games.remove(game)
-            # Check if any existing UUID groups contain this as a substring
-            else:
-                for existing_uuid in uuid_groups:
-                    if existing_uuid in game_id_upper or game_id_upper in existing_uuid:
-                        logger.info(f"Found potential match: {game.game_id} with existing UUID {existing_uuid}")
-                        uuid_groups[existing_uuid].append(game)
-                        unmatched_games.remove(game)
-                        break
-
-        cleaned_count = 0
-        reviewed_count = 0
-
-        # Process groups with duplicates
-        for uuid_part, games in uuid_groups.items():
-            if len(games) > 1:
-                reviewed_count += len(games)
-                
-                # Sort by database ID (first inserted record first)
-                games.sort(key=lambda g: g.id)
-
-                # Prefer properly constructed game IDs over raw UUIDs, but prioritize by ID
-                properly_constructed = [g for g in games if g.game_id != uuid_part]
-                raw_uuids = [g for g in games if g.game_id == uuid_part]
-                
-                if properly_constructed:
-                    # Sort both groups by ID and keep the earliest properly constructed game
-                    properly_constructed.sort(key=lambda g: g.id)
-                    raw_uuids.sort(key=lambda g: g.id)
-                    games_to_keep = properly_constructed[0]
-                    games_to_delete = properly_constructed[1:] + raw_uuids
-                else:
-                    # If no properly constructed games, keep the earliest raw UUID by ID
-                    games_to_keep = games[0]  # Already sorted by ID above
-                    games_to_delete = games[1:]
-
-                logger.info(
-                    f"UUID {uuid_part}: keeping {games_to_keep.game_id} (ID: {games_to_keep.id}, created: {games_to_keep.created_at}), deleting {len(games_to_delete)} duplicates"
-                )
-
-                for game_to_delete in games_to_delete:
-                    logger.info(f"  Deleting: {game_to_delete.game_id} (ID: {game_to_delete.id}, created: {game_to_delete.created_at})")
-                    
-                    # Clean up active game state
-                    ActiveGameState.query.filter_by(
-                        game_id=game_to_delete.game_id,
-                        user_id=game_to_delete.user_id).delete()
-
-                    db.session.delete(game_to_delete)
-                    cleaned_count += 1
-
-        db.session.commit()
+        from app.celery_worker import cleanup_duplicate_games_task
 
-        # Log summary
-        message_parts = [f'Successfully cleaned up {cleaned_count} duplicate games']
-        if reviewed_count > cleaned_count:
-            message_parts.append(f'Reviewed {reviewed_count} total duplicate candidates')
-        if unmatched_games:
-            message_parts.append(f'{len(unmatched_games)} games did not match UUID patterns')
-            logger.info(f"Unmatched games: {[g.game_id for g in unmatched_games[:10]]}...")  # Log first 10
-
-        success_message = '. '.join(message_parts)
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true',
+                                                              'yes')
+        task = cleanup_duplicate_games_task.delay(dry_run=dry_run)
 
         logger.info(
-            f"Admin {current_admin.username} cleaned up {cleaned_count} duplicate games, reviewed {reviewed_count} total"
-        )
-        
+            f"Admin {current_admin.username} queued duplicate game cleanup "
+            f"(task {task.id}, dry run: {dry_run})")
+
+        status_url = url_for('admin_process.cleanup_duplicate_games_status',
+                             task_id=task.id)
         return redirect(
-            url_for('admin.quotes', success=success_message)
-        )
+            url_for(
+                'admin.quotes',
+                success=
+                f"Duplicate game {'dry run' if dry_run else 'cleanup'} queued. Progress and report: {status_url}"
+            ))
 
     except Exception as e:
-        db.session.rollback()
-        logger.error(f"Error during cleanup: {str(e)}", exc_info=True)
+        logger.error(f"Error queuing duplicate cleanup: {str(e)}",
+                     exc_info=True)
         return redirect(
-            url_for('admin.quotes', error=f'Error during cleanup: {str(e)}')
-        )
+            url_for('admin.quotes', error=f'Error during cleanup: {str(e)}'))
 
 
-# helper function for game score clean
-def extract_uuid_from_constructed_id(game_id):
-    """
-    Extract the UUID part from a game ID - handles various formats
-    Handles formats like:
-    - easy-daily-2025-04-19-[UUID]
-    - medium-hardcore-[UUID] 
-    - hard-[UUID]
-    - [UUID] (raw UUID)
-    - Partial or malformed UUIDs
-    """
-    import re
-
-    if not game_id:
-        return None
-
-    # Pattern to match UUID anywhere in the string (not just at the end)
-    uuid_pattern = r'([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})'
-    match = re.search(uuid_pattern, game_id, re.IGNORECASE)
-
-    if match:
-        return match.group(1).upper()
-
-    # Check if the entire string is just a UUID (in case of different casing)
-    if re.match(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$', game_id, re.IGNORECASE):
-        return game_id.upper()
-
-    # Check for UUID without dashes (sometimes they get stripped)
-    no_dash_pattern = r'([0-9a-fA-F]{32})'
-    no_dash_match = re.search(no_dash_pattern, game_id, re.IGNORECASE)
-    if no_dash_match:
-        # Convert back to standard UUID format
-        uuid_str = no_dash_match.group(1).upper()
-        formatted_uuid = f"{uuid_str[:8]}-{uuid_str[8:12]}-{uuid_str[12:16]}-{uuid_str[16:20]}-{uuid_str[20:]}"
-        return formatted_uuid
-
-    # Check for partial UUIDs (at least 8 characters of hex)
-    partial_pattern = r'([0-9a-fA-F]{8,})'
-    partial_match = re.search(partial_pattern, game_id, re.IGNORECASE)
-    if partial_match and len(partial_match.group(1)) >= 8:
-        # For partial matches, we might want to be more careful
-        # Only return if it looks like it could be a UUID fragment
-        partial_uuid = partial_match.group(1).upper()
-        if len(partial_uuid) >= 32:  # Looks like a complete UUID without dashes
-            formatted_uuid = f"{partial_uuid[:8]}-{partial_uuid[8:12]}-{partial_uuid[12:16]}-{partial_uuid[16:20]}-{partial_uuid[20:32]}"
-            return formatted_uuid
-
-    return None
+@admin_process_bp.route('/cleanup-duplicates/status/<task_id>',
+                        methods=['GET'])
+@admin_required
+def cleanup_duplicate_games_status(current_admin, task_id):
+    """Get the progress or final report of a duplicate cleanup job"""
+    try:
+        from app.celery_worker import cleanup_duplicate_games_task
+
+        result = cleanup_duplicate_games_task.AsyncResult(task_id)
+        info = result.info if isinstance(result.info, dict) else (
+            {'message': str(result.info)} if result.info else {})
+        return jsonify({'task_id': task_id, 'state': result.state, **info})
+
+    except Exception as e:
+        logger.error(f"Error reading cleanup status: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_process_bp.route('/quotes/import/status/<task_id>', methods=['GET'])
+@admin_required
+def import_quotes_status(current_admin, task_id):
+    """Get the progress or final report of a background quote import"""
+    try:
+        from app.celery_worker import import_quotes_task
+
+        result = import_quotes_task.AsyncResult(task_id)
+        info = result.info if isinstance(result.info, dict) else (
+            {'message': str(result.info)} if result.info else {})
+        return jsonify({'task_id': task_id, 'state': result.state, **info})
+
+    except Exception as e:
+        logger.error(f"Error reading import status: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@admin_process_bp.route('/user-cache/stats', methods=['GET'])
+@admin_required
+def user_cache_status(current_admin):
+    """Hit ratio and size of the user lookup cache in this worker"""
+    return jsonify({'pid': os.getpid(), **user_cache_stats()})
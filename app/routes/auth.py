@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify, redirect, url_for, current_app, render_template
+from flask import (Blueprint, request, jsonify, redirect, url_for, current_app,
+                   render_template, Response, stream_with_context, send_file)
 from flask_jwt_extended import (create_access_token, create_refresh_token,
                                 get_jwt_identity, jwt_required, get_jwt)
 import requests
@@ -6,7 +7,11 @@ import secrets
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 from app import jwt_blocklist
-from app.models import db, User, ActiveGameState, UserStats, GameScore, DailyCompletion
+from app.utils.rate_limit import client_ip, rate_limited
+from app.services.user_export import iter_user_export, export_dir
+from app.services.account_deletion import request_account_deletion
+from app.utils.user_cache import get_cached_user, invalidate_user
+from app.models import db, User, ActiveGameState
 import logging
 
 bp = Blueprint('auth', __name__)
@@ -54,7 +59,26 @@ def register():
         return jsonify({"msg": "Error creating user"}), 500
 
 
+def login_identifier():
+    """
+    Limit login attempts per (account, IP), so guessing at one account is
+    slowed without letting anyone else lock its owner out
+    """
+    data = request.get_json(silent=True) or {}
+    identifier = data.get('username')
+    return f"user:{identifier.lower()}:{request.remote_addr}" if isinstance(
+        identifier, str) and identifier else None
+
+
 @bp.route('/login', methods=['POST'])
+@rate_limited('login_ip',
+              key=client_ip,
+              message='Too many login attempts, please try again later',
+              message_field='msg')
+@rate_limited('login',
+              key=login_identifier,
+              message='Too many login attempts, please try again later',
+              message_field='msg')
 def login():
     try:
         data = request.get_json()
@@ -73,6 +97,9 @@ def login():
         if not user or not user.check_password(password):
             return jsonify({"msg": "Invalid credentials"}), 401
 
+        if user.pending_deletion:
+            return jsonify({"msg": "This account is being deleted"}), 403
+
         access_token = create_access_token(identity=user.get_id(),
                                            fresh=True,
                                            additional_claims={
@@ -107,7 +134,7 @@ def login():
 def logout():
     token = get_jwt()
     jti = token["jti"]
-    jwt_blocklist.add(jti)
+    jwt_blocklist.add(jti, token.get("exp"))
     return jsonify({"msg": "Successfully logged out"}), 200
 
 
@@ -116,12 +143,12 @@ def logout():
 def refresh():
     """Refresh access token using refresh token"""
     current_user = get_jwt_identity()
-    user = User.query.get(current_user)
+    user = get_cached_user(current_user)
 
-    if not user:
+    if not user or user.pending_deletion:
         return jsonify({"msg": "User not found"}), 404
 
-    new_access_token = create_access_token(identity=user.get_id(),
+    new_access_token = create_access_token(identity=user.user_id,
                                            fresh=False,
                                            additional_claims={
                                                "username": user.username,
@@ -136,7 +163,7 @@ def refresh():
 def verify_token():
     """Endpoint to verify if a token is valid"""
     current_user = get_jwt_identity()
-    my_user = User.query.filter_by(user_id=current_user).first()
+    my_user = get_cached_user(current_user)
     claims = get_jwt()
     return jsonify({
         "valid": True,
@@ -178,6 +205,7 @@ def update_email_consent():
 
 
 @bp.route('/check-username', methods=['POST'])
+@rate_limited('check_username', message_field='message')
 def check_username():
     """Check if a username is available for registration"""
     try:
@@ -247,87 +275,91 @@ def get_user_data():
         if not user:
             return jsonify({"msg": "User not found"}), 404
 
-        # Get user data (excluding password hash)
-        user_data = {
-            "user_id":
-            user.user_id,
-            "username":
-            user.username,
-            "email":
-            user.email,
-            "created_at":
-            user.created_at.isoformat() if user.created_at else None,
-            "email_consent":
-            user.email_consent,
-            "consent_date":
-            user.consent_date.isoformat() if user.consent_date else None
-        }
-
-        # Get user stats
-        user_stats = UserStats.query.filter_by(user_id=user_id).first()
-        stats_data = {}
-
-        if user_stats:
-            stats_data = {
-                "current_streak":
-                user_stats.current_streak,
-                "max_streak":
-                user_stats.max_streak,
-                "current_noloss_streak":
-                user_stats.current_noloss_streak,
-                "max_noloss_streak":
-                user_stats.max_noloss_streak,
-                "total_games_played":
-                user_stats.total_games_played,
-                "games_won":
-                user_stats.games_won,
-                "cumulative_score":
-                user_stats.cumulative_score,
-                "highest_weekly_score":
-                user_stats.highest_weekly_score,
-                "last_played_date":
-                user_stats.last_played_date.isoformat()
-                if user_stats.last_played_date else None
-            }
-
-        # Get game history
-        game_scores = GameScore.query.filter_by(user_id=user_id).all()
-        games_data = []
-
-        for game in game_scores:
-            games_data.append({
-                "game_id":
-                game.game_id,
-                "score":
-                game.score,
-                "mistakes":
-                game.mistakes,
-                "time_taken":
-                game.time_taken,
-                "game_type":
-                game.game_type,
-                "challenge_date":
-                game.challenge_date,
-                "completed":
-                game.completed,
-                "created_at":
-                game.created_at.isoformat() if game.created_at else None
-            })
-
-        # Combine all data
-        all_data = {
-            "user_info": user_data,
-            "stats": stats_data,
-            "game_history": games_data
-        }
+        # Large histories can be exported in the background as a gzip file
+        if request.args.get('async', '').lower() in ('1', 'true'):
+            from celery.utils import uuid
+            from app.celery_worker import export_user_data_task
+            # Record the owner before queueing, so status polls can be
+            # checked before the worker stores its result
+            task_id = uuid()
+            export_user_data_task.backend.store_result(
+                task_id, {
+                    "status": "queued",
+                    "user_id": user_id
+                }, 'PENDING')
+            export_user_data_task.apply_async((user_id, ), task_id=task_id)
+            return jsonify({
+                "task_id":
+                task_id,
+                "status_url":
+                url_for('auth.get_user_data_export_status', task_id=task_id)
+            }), 202
 
-        return jsonify(all_data), 200
+        # Stream the export so memory does not grow with the user's history
+        return Response(stream_with_context(iter_user_export(user)),
+                        mimetype='application/json')
 
     except Exception as e:
         logging.error(f"Error retrieving user data: {str(e)}")
         return jsonify({"msg": "An error occurred retrieving your data"}), 500
 
 
+def _user_export_result(task_id):
+    """
+    Get a background export's task result if it belongs to the caller.
+    Unknown tasks and results without an owner count as not found.
+    """
+    from app.celery_worker import export_user_data_task
+    result = export_user_data_task.AsyncResult(task_id)
+    info = result.info if isinstance(result.info, dict) else {}
+    if info.get('user_id') != get_jwt_identity():
+        return None, {}
+    return result, info
+
+
+@bp.route('/api/user-data/export/<task_id>', methods=['GET'])
+@jwt_required()
+def get_user_data_export_status(task_id):
+    try:
+        result, info = _user_export_result(task_id)
+        if result is None:
+            return jsonify({"msg": "Export not found"}), 404
+
+        response = {"task_id": task_id, "state": result.state}
+        if info.get('status') == 'success':
+            response["download_url"] = url_for(
+                'auth.download_user_data_export', task_id=task_id)
+        elif info.get('status') == 'error':
+            response["msg"] = "An error occurred exporting your data"
+        return jsonify(response), 200
+
+    except Exception as e:
+        logging.error(f"Error reading user data export status: {str(e)}")
+        return jsonify({"msg": "An error occurred retrieving your data"}), 500
+
+
+@bp.route('/api/user-data/export/<task_id>/download', methods=['GET'])
+@jwt_required()
+def download_user_data_export(task_id):
+    try:
+        result, info = _user_export_result(task_id)
+        if result is None or info.get('status') != 'success':
+            return jsonify({"msg": "Export not found"}), 404
+
+        path = export_dir() / info['filename']
+        if not path.is_file():
+            return jsonify({"msg": "Export has expired"}), 410
+
+        return send_file(path,
+                         mimetype='application/gzip',
+                         as_attachment=True,
+                         download_name='user-data.json.gz')
+
+    except Exception as e:
+        logging.error(f"Error downloading user data export: {str(e)}")
+        return jsonify({"msg": "An error occurred retrieving your data"}), 500
+
+
 @bp.route('/api/delete-account', methods=['DELETE'])
 @jwt_required()
 def delete_account():
@@ -344,27 +376,17 @@ def delete_account():
         if not user:
             return jsonify({"msg": "User not found"}), 404
 
-        # Get the JWT token before deleting the user
-        token = get_jwt()
-        jti = token["jti"]
+        if user.pending_deletion:
+            return jsonify({"msg": "Account deletion already in progress"}), 202
 
-        # Delete ALL user related data in correct order to handle foreign key constraints
-        DailyCompletion.query.filter_by(user_id=user_id).delete()
-        GameScore.query.filter_by(user_id=user_id).delete()
-        UserStats.query.filter_by(user_id=user_id).delete()
-        ActiveGameState.query.filter_by(user_id=user_id).delete()
-
-        # Delete the user
-        db.session.delete(user)
-        db.session.commit()
-
-        # Add token to blocklist after successful deletion
-        jwt_blocklist.add(jti)
+        # Revoke tokens now; the data is removed by a background job so
+        # large accounts do not hold locks while the request waits
+        request_account_deletion(user, get_jwt())
 
         return jsonify({
-            "msg": "Account deleted successfully",
+            "msg": "Account scheduled for deletion",
             "token_revoked": True
-        }), 200
+        }), 202
 
     except Exception as e:
         db.session.rollback()
@@ -507,6 +529,7 @@ def reset_password():
         user.reset_token = None
         user.reset_token_expires = None
         db.session.commit()
+        invalidate_user(user.user_id)
 
         return jsonify({"message": "Password reset successfully"}), 200
 
@@ -528,6 +551,9 @@ def apple_signin():
         # Check if user exists with this Apple ID
         user = User.query.filter_by(apple_user_id=apple_user_id).first()
 
+        if user and user.pending_deletion:
+            return jsonify({'error': 'This account is being deleted'}), 403
+
         if not user:
             # Create new user
             username = email or f"apple_user_{apple_user_id[:8]}"
@@ -6,6 +6,7 @@ from datetime import datetime, date, timedelta
 from app.models import db, Quote, DailyCompletion, UserStats, ActiveGameState
 from app.services.game_logic import generate_mapping, encrypt_paragraph, get_letter_frequency, get_unique_letters, generate_display_blocks
 from app.services.game_state import get_max_mistakes_from_game_id, save_unified_game_state
+from app.utils.daily import get_first_daily_date, get_completion_summaries
 import logging
 import uuid
 
@@ -41,9 +42,8 @@ def get_daily_challenge(date_string=None):
         logger.debug(f"Looking for daily challenge on date: {requested_date}")
 
         # Find quote scheduled for exactly the requested date
-        from sqlalchemy import func
         daily_quote = Quote.query.filter(
-            func.date(Quote.daily_date) == requested_date).first()
+            Quote.daily_date == requested_date).first()
         logger.debug(f"Found daily quote: {daily_quote.text}")
 
         if not daily_quote:
@@ -113,7 +113,7 @@ def get_daily_challenge(date_string=None):
             # Check and delete any existing daily game for this user
             existing_daily = ActiveGameState.query.filter(
                 ActiveGameState.user_id == user_id,
-                ActiveGameState.game_id.like('%daily%')
+                ActiveGameState.is_daily == True
             ).first()
             if existing_daily:
                 db.session.delete(existing_daily)
@@ -162,75 +162,47 @@ def get_daily_stats():
     try:
         user_id = get_jwt_identity()
 
-        # Get user stats
+        # Read-only: users without stats get zeroed streak fields
         user_stats = UserStats.query.filter_by(user_id=user_id).first()
 
-        if not user_stats:
-            # Initialize stats if they don't exist
-            user_stats = UserStats(user_id=user_id)
-            db.session.add(user_stats)
-            db.session.commit()
+        # Count completions in SQL rather than loading the history
+        total_completions = db.session.query(
+            db.func.count(DailyCompletion.id)).filter(
+                DailyCompletion.user_id == user_id).scalar() or 0
 
-        # Get daily completion history
-        completions = DailyCompletion.query.filter_by(
-            user_id=user_id).order_by(
-                DailyCompletion.challenge_date.desc()).all()
-
-        # Calculate completion rate
+        # Calculate completion rate against the first daily we ever offered
         today = date.today()
-        # Get the first daily we ever offered
-        first_daily = Quote.query.filter(
-            Quote.daily_date.isnot(None)).order_by(Quote.daily_date).first()
+        first_date = get_first_daily_date()
 
         total_possible = 0
-        if first_daily and first_daily.daily_date:
+        if first_date:
             # Count days between first daily and today
-            first_date = first_daily.daily_date
             delta = today - first_date
             total_possible = delta.days + 1  # Include today
 
         completion_rate = 0
         if total_possible > 0:
-            completion_rate = (len(completions) / total_possible) * 100
-
-        # Get recent completions (last 30 days)
-        recent_completions = []
-        for completion in completions[:30]:  # Limit to most recent 30
-            recent_completions.append({
-                "date":
-                completion.challenge_date.isoformat(),
-                "score":
-                completion.score,
-                "mistakes":
-                completion.mistakes,
-                "time_taken":
-                completion.time_taken
-            })
+            completion_rate = (total_completions / total_possible) * 100
+
+        # Get recent completions (most recent 30)
+        recent_completions = get_completion_summaries(
+            user_id, DailyCompletion.challenge_date.desc(), 30)
 
         # Get top 5 highest scoring daily completions
-        top_scores = DailyCompletion.query.filter_by(user_id=user_id).order_by(
-            DailyCompletion.score.desc()).limit(5).all()
-
-        top_scores_data = []
-        for score in top_scores:
-            top_scores_data.append({
-                "date": score.challenge_date.isoformat(),
-                "score": score.score,
-                "mistakes": score.mistakes,
-                "time_taken": score.time_taken
-            })
+        top_scores_data = get_completion_summaries(
+            user_id, DailyCompletion.score.desc(), 5)
 
         # Format response data
         stats_data = {
             "current_streak":
-            user_stats.current_daily_streak,
+            user_stats.current_daily_streak if user_stats else 0,
             "max_streak":
-            user_stats.max_daily_streak,
+            user_stats.max_daily_streak if user_stats else 0,
             "total_completed":
-            user_stats.total_daily_completed,
+            user_stats.total_daily_completed if user_stats else 0,
             "last_completed_date":
             user_stats.last_daily_completed_date.isoformat()
-            if user_stats.last_daily_completed_date else None,
+            if user_stats and user_stats.last_daily_completed_date else None,
             "completion_rate":
             round(completion_rate, 1),
             "recent_completions":
@@ -306,3 +278,99 @@ def check_daily_completion():
                         "Failed to check daily challenge completion"}), 500
 
 
+
+
+# Longest range a single calendar request may cover
+MAX_CALENDAR_DAYS = 366
+
+
+@bp.route('/daily-calendar', methods=['GET', 'OPTIONS'])
+@jwt_required()
+def get_daily_calendar():
+    """
+    Get puzzle availability, completion and streak boundaries for a date range.
+    Accepts either ?month=YYYY-MM or ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive).
+    """
+    if request.method == 'OPTIONS':
+        return jsonify({}), 200  # Handle OPTIONS request for CORS
+
+    try:
+        user_id = get_jwt_identity()
+
+        # Parse the requested range
+        try:
+            month_string = request.args.get('month')
+            if month_string:
+                start_date = datetime.strptime(month_string, '%Y-%m').date()
+                next_month = (start_date.replace(day=28) + timedelta(days=4)).replace(day=1)
+                end_date = next_month - timedelta(days=1)
+            else:
+                start_string = request.args.get('start')
+                end_string = request.args.get('end')
+                if not start_string or not end_string:
+                    return jsonify({
+                        "error": "Provide month or both start and end parameters"
+                    }), 400
+                start_date = datetime.strptime(start_string, '%Y-%m-%d').date()
+                end_date = datetime.strptime(end_string, '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({
+                "error": "Invalid date format. Use YYYY-MM or YYYY-MM-DD"
+            }), 400
+
+        if end_date < start_date:
+            return jsonify({"error": "end must not be before start"}), 400
+
+        total_days = (end_date - start_date).days + 1
+        if total_days > MAX_CALENDAR_DAYS:
+            return jsonify({
+                "error": f"Range is limited to {MAX_CALENDAR_DAYS} days"
+            }), 400
+
+        # Query 1: which days have a puzzle scheduled
+        puzzle_dates = {
+            row.daily_date
+            for row in db.session.query(Quote.daily_date).filter(
+                Quote.daily_date >= start_date, Quote.daily_date <= end_date)
+        }
+
+        # Query 2: the user's completions, one day either side so streaks
+        # that cross the edges of the range get the right boundaries
+        completions = {
+            row.challenge_date: row
+            for row in db.session.query(
+                DailyCompletion.challenge_date, DailyCompletion.score,
+                DailyCompletion.mistakes, DailyCompletion.time_taken).filter(
+                    DailyCompletion.user_id == user_id,
+                    DailyCompletion.challenge_date >= start_date - timedelta(days=1),
+                    DailyCompletion.challenge_date <= end_date + timedelta(days=1))
+        }
+
+        days = []
+        for offset in range(total_days):
+            day = start_date + timedelta(days=offset)
+            completion = completions.get(day)
+            is_completed = completion is not None
+            days.append({
+                "date": day.isoformat(),
+                "has_puzzle": day in puzzle_dates,
+                "is_completed": is_completed,
+                "score": completion.score if is_completed else None,
+                "mistakes": completion.mistakes if is_completed else None,
+                "time_taken": completion.time_taken if is_completed else None,
+                "streak_start": is_completed
+                and (day - timedelta(days=1)) not in completions,
+                "streak_end": is_completed
+                and (day + timedelta(days=1)) not in completions
+            })
+
+        return jsonify({
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "total_completed": sum(1 for d in days if d["is_completed"]),
+            "days": days
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error getting daily calendar: {str(e)}", exc_info=True)
+        return jsonify({"error": "Failed to retrieve daily calendar"}), 500
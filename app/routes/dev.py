@@ -73,7 +73,7 @@ def clear_dummy_data_route():
 
     try:
         # Import required models
-        from app.models import db, User, UserStats, GameScore, ActiveGameState, AnonymousGameState
+        from app.models import db, User, UserStats, GameScore, ActiveGameState, AnonymousGameState, GameSyncBucket, GameTombstone, UserSyncState
 
         # Record counts before deletion
         users_count = User.query.count()
@@ -85,6 +85,9 @@ def clear_dummy_data_route():
         ActiveGameState.query.delete()
         AnonymousGameState.query.delete()
         GameScore.query.delete()
+        GameSyncBucket.query.delete()
+        GameTombstone.query.delete()
+        UserSyncState.query.delete()
         UserStats.query.delete()
         User.query.delete()
 
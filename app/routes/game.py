@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, decode_token
+from werkzeug.exceptions import HTTPException
 from app.services.game_logic import start_game
 from app.services.game_state import (get_unified_game_state,
                                      save_unified_game_state,
@@ -12,9 +13,16 @@ from datetime import datetime, date, timedelta
 import logging
 import uuid
 import json
-import time
-from sqlalchemy import and_, or_
+from sqlalchemy import and_
 from app.utils.stats import initialize_or_update_user_stats
+from app.utils.helpers import get_request_json
+from app.utils.game_ids import SYNC_BUCKET_COUNT, extract_uuid_from_constructed_id, parse_game_id
+from app.services.game_ingest import ingest_games
+from app.utils.game_sync import compare_bucket_digests, current_sync_cursor, get_changes_since, record_tombstones
+from app.utils.streaming import stream_records, wants_msgpack
+from app.utils.rate_limit import rate_limited
+from app.utils.user_cache import get_cached_user, invalidate_user
+from app.utils.leaderboard import record_game_results, remove_game_results
 from app.celery_worker import process_game_completion, verify_daily_streak
 
 # Set up logging
@@ -22,12 +30,11 @@ logger = logging.getLogger(__name__)
 
 bp = Blueprint('game', __name__)
 
-game_creation_timestamps = {}
-GAME_CREATION_COOLDOWN = 2  # 2 seconds cooldown
-
-
 @bp.route('/start', methods=['GET', 'OPTIONS'])
 @jwt_required(optional=True)
+@rate_limited('start',
+              message='Please wait a moment before starting a new game',
+              retry_field='cooldown_remaining')
 def start():
     """Start a new game"""
     if request.method == 'OPTIONS':
@@ -49,33 +56,11 @@ def start():
                      "Authentication required for backdoor mode"}), 403
 
             # Verify user is a subadmin
-            user = User.query.filter_by(user_id=user_id).first()
+            user = get_cached_user(user_id)
             if not user or not user.subadmin:
                 return jsonify(
                     {"error":
                      "Insufficient permissions for backdoor mode"}), 403
-        # For anonymous users, use IP address as identifier
-        identifier = user_id if not is_anonymous else request.remote_addr
-
-        # Check if we're creating games too quickly
-        current_time = time.time()
-        last_creation_time = game_creation_timestamps.get(identifier, 0)
-        time_since_last_creation = current_time - last_creation_time
-
-        if time_since_last_creation < GAME_CREATION_COOLDOWN:
-            logger.warning(
-                f"Game creation request rejected - cooldown period not elapsed for {'anonymous' if is_anonymous else user_id}"
-            )
-            return jsonify({
-                "error":
-                "Please wait a moment before starting a new game",
-                "cooldown_remaining":
-                round(GAME_CREATION_COOLDOWN - time_since_last_creation, 1)
-            }), 429  # 429 Too Many Requests
-
-        # Update the timestamp before proceeding
-        game_creation_timestamps[identifier] = current_time
-
         # Extract longText parameter
         long_text = request.args.get('longText', 'false').lower() == 'true'
 
@@ -85,8 +70,7 @@ def start():
                 # Only find and abandon regular (non-daily) games
                 active_game = ActiveGameState.query.filter(
                     ActiveGameState.user_id == user_id,
-                    ~ActiveGameState.game_id.like(
-                        '%daily%')  # Only regular games
+                    ActiveGameState.is_daily == False  # Only regular games
                 ).first()
 
                 if active_game:
@@ -318,18 +302,9 @@ def extract_challenge_date(game_id, is_daily):
     if not is_daily:
         return datetime.utcnow().date()
 
-    try:
-        # Format in game_id is typically: "difficulty-daily-YYYY-MM-DD-uuid"
-        parts = game_id.split('-')
-        if len(parts) >= 5:
-            challenge_date_str = f"{parts[2]}-{parts[3]}-{parts[4]}"
-            return datetime.strptime(challenge_date_str, '%Y-%m-%d').date()
-        else:
-            # Fallback to today's date
-            return datetime.utcnow().date()
-    except (ValueError, IndexError) as e:
-        logger.error(f"Error parsing date from game_id: {str(e)}")
-        return datetime.utcnow().date()
+    # Format in game_id is typically: "difficulty-daily-YYYY-MM-DD-uuid"
+    # Fallback to today's date
+    return parse_game_id(game_id)['challenge_date'] or datetime.utcnow().date()
 
 
 @bp.route('/hint', methods=['POST', 'OPTIONS'])
@@ -419,7 +394,7 @@ def check_active_game():
         # Check for regular game (excluding daily games)
         regular_game = ActiveGameState.query.filter(
             ActiveGameState.user_id == user_id,
-            ~ActiveGameState.game_id.like('%daily%')).first()
+            ActiveGameState.is_daily == False).first()
 
         game_state = get_unified_game_state(
             f"{user_id}_{regular_game.game_id}",
@@ -450,10 +425,10 @@ def check_active_game():
                 }
             })
 
-        # Check for daily game - use game_id with daily in the query
+        # Check for daily game
         daily_game = ActiveGameState.query.filter(
             ActiveGameState.user_id == user_id,
-            ActiveGameState.game_id.like('%daily%')).first()
+            ActiveGameState.is_daily == True).first()
 
         if daily_game:
             # Calculate daily game stats
@@ -505,7 +480,7 @@ def continue_game():
             # Find daily game ID first
             daily_game = ActiveGameState.query.filter(
                 ActiveGameState.user_id == user_id,
-                ActiveGameState.game_id.like('%daily%')).first()
+                ActiveGameState.is_daily == True).first()
 
             if daily_game:
                 game_state = get_unified_game_state(
@@ -516,7 +491,7 @@ def continue_game():
             # Get non-daily game
             regular_game = ActiveGameState.query.filter(
                 ActiveGameState.user_id == user_id,
-                ~ActiveGameState.game_id.like('%daily%')).first()
+                ActiveGameState.is_daily == False).first()
             game_state = get_unified_game_state(
                 f"{user_id}_{regular_game.game_id}", is_anonymous=False)
 
@@ -1200,7 +1175,7 @@ def get_all_quotes():
 @jwt_required()
 def reconcile_games():
     """
-    Smart game reconciliation endpoint that handles both full and incremental sync
+    Smart game reconciliation endpoint that handles full, digest and incremental sync
     """
     try:
         data = request.get_json()
@@ -1208,11 +1183,18 @@ def reconcile_games():
         user_id = get_jwt_identity()
         sync_type = data.get('type', 'incremental')
         since_timestamp = data.get('sinceTimestamp')
+        since_cursor = data.get('sinceCursor')
         local_summary = data.get('localSummary')
         local_changes = data.get('localChanges')
 
         if sync_type == 'full':
             return handle_full_reconciliation(user_id, local_summary)
+        elif sync_type == 'digest':
+            return handle_digest_reconciliation(user_id, data.get('buckets'),
+                                                data.get('rootDigest'))
+        elif since_cursor is not None:
+            return handle_cursor_reconciliation(user_id, since_cursor,
+                                                local_changes)
         else:
             return handle_incremental_reconciliation(user_id, since_timestamp,
                                                      local_changes)
@@ -1228,6 +1210,9 @@ def handle_full_reconciliation(user_id, local_summary):
     """
     Handle full reconciliation - compare all games
     """
+    # Read the cursor first so changes made during this sync are sent again
+    cursor = current_sync_cursor(user_id)
+
     # Get all server games for this user
     server_games = GameScore.query.filter_by(user_id=user_id).all()
 
@@ -1244,7 +1229,8 @@ def handle_full_reconciliation(user_id, local_summary):
         'downloadFromServer': [],
         'uploadToServer': [],
         'conflicts': [],
-        'deleteFromLocal': []
+        'deleteFromLocal': [],
+        'cursor': cursor
     }
 
     # Find games that exist on server but not locally
@@ -1282,6 +1268,60 @@ def handle_full_reconciliation(user_id, local_summary):
     return jsonify(plan)
 
 
+def handle_digest_reconciliation(user_id, buckets, client_root):
+    """
+    Handle digest reconciliation - the client sends per-bucket digests of its
+    games (see game_sync_hash in app/utils/game_ids.py) and only the buckets
+    that differ come back as game lists for the client to merge.
+    """
+    if buckets is not None and not isinstance(buckets, dict):
+        return jsonify({
+            'success': False,
+            'error': 'buckets must map bucket numbers to digests'
+        }), 400
+    if buckets is None and client_root is None:
+        return jsonify({
+            'success': False,
+            'error': 'buckets or rootDigest required for digest sync'
+        }), 400
+    if client_root is not None and not isinstance(client_root, str):
+        return jsonify({
+            'success': False,
+            'error': 'rootDigest must be a hex string'
+        }), 400
+    if buckets is not None:
+        try:
+            bucket_numbers = [int(bucket) for bucket in buckets]
+        except (TypeError, ValueError):
+            bucket_numbers = None
+        if bucket_numbers is None or not all(
+                0 <= bucket < SYNC_BUCKET_COUNT for bucket in bucket_numbers):
+            return jsonify({
+                'success': False,
+                'error':
+                f'bucket numbers must be integers from 0 to {SYNC_BUCKET_COUNT - 1}'
+            }), 400
+
+    result = compare_bucket_digests(user_id, buckets, client_root)
+
+    # A root-only request that does not match needs the bucket digests next
+    if result['mismatchedBuckets'] is None:
+        return jsonify({
+            'success': True,
+            'inSync': False,
+            'rootDigest': result['rootDigest'],
+            'needBuckets': True
+        })
+
+    return jsonify({
+        'success': True,
+        'inSync': not result['mismatchedBuckets'],
+        'summary':
+        f"Digest sync: {len(result['mismatchedBuckets'])} buckets differ, {len(result['serverGames'])} server games in them",
+        **result
+    })
+
+
 def handle_incremental_reconciliation(user_id, since_timestamp, local_changes):
     """
     Handle incremental reconciliation - only process changes since last sync
@@ -1294,6 +1334,9 @@ def handle_incremental_reconciliation(user_id, since_timestamp, local_changes):
 
     since_date = datetime.fromtimestamp(since_timestamp)
 
+    # Returned so clients can move over to cursor sync
+    cursor = current_sync_cursor(user_id)
+
     # Get server games modified since the timestamp
     server_games = GameScore.query.filter(
         and_(GameScore.user_id == user_id, GameScore.created_at
@@ -1305,22 +1348,67 @@ def handle_incremental_reconciliation(user_id, since_timestamp, local_changes):
         'downloadFromServer': [],
         'uploadToServer': [],
         'conflicts': [],
-        'deleteFromLocal': []
+        'deleteFromLocal': [],
+        'cursor': cursor
     }
 
     # Process server changes
-    server_game_ids = set()
+    server_changes = {}
     for game in server_games:
         plan['downloadFromServer'].append(game.game_id)
-        server_game_ids.add(game.game_id)
+        server_changes[game.game_id] = game.created_at
+
+    add_local_changes_to_plan(plan, server_changes, local_changes)
+
+    return jsonify(plan)
+
+
+def handle_cursor_reconciliation(user_id, since_cursor, local_changes):
+    """
+    Handle cursor reconciliation - return exactly the server changes after the
+    client's cursor, including deletions, and the cursor to send next time
+    """
+    try:
+        since_cursor = int(since_cursor)
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'error': 'sinceCursor must be an integer'
+        }), 400
 
-    # Process local changes
+    changes = get_changes_since(user_id, since_cursor)
+
+    plan = {
+        'summary':
+        f"Cursor sync since {since_cursor}: {len(changes['changed'])} server changes, {len(changes['deleted'])} deletions, {len(local_changes or [])} local changes",
+        'downloadFromServer': list(changes['changed']),
+        'uploadToServer': [],
+        'conflicts': [],
+        'deleteFromLocal': changes['deleted'],
+        'cursor': changes['cursor'],
+        'hasMore': changes['has_more']
+    }
+
+    add_local_changes_to_plan(plan, changes['changed'], local_changes)
+
+    return jsonify(plan)
+
+
+def add_local_changes_to_plan(plan, server_changes, local_changes):
+    """
+    Add the client's local changes to a sync plan: conflicts where the server
+    changed the same game, uploads for completed games otherwise
+
+    Args:
+        server_changes (dict): game_id -> server modification datetime
+    """
     for change in (local_changes or []):
         game_id = change['gameId']
         change_type = change['changeType']
 
-        if game_id in server_game_ids:
+        if game_id in server_changes:
             # Conflict - both server and local have changes
+            server_timestamp = server_changes[game_id]
             plan['conflicts'].append({
                 'gameId':
                 game_id,
@@ -1329,8 +1417,7 @@ def handle_incremental_reconciliation(user_id, since_timestamp, local_changes):
                 'localTimestamp':
                 change['lastModified'],
                 'serverTimestamp':
-                next(g.created_at.isoformat() for g in server_games
-                     if g.game_id == game_id)
+                server_timestamp.isoformat() if server_timestamp else None
             })
         else:
             # Only local change
@@ -1340,8 +1427,6 @@ def handle_incremental_reconciliation(user_id, since_timestamp, local_changes):
                         'hasLost'):
                     plan['uploadToServer'].append(game_id)
 
-    return jsonify(plan)
-
 
 @bp.route('/games/<game_id>', methods=['GET'])
 @jwt_required()
@@ -1363,100 +1448,173 @@ def get_game(game_id):
         active_game = ActiveGameState.query.filter_by(game_id=game_id,
                                                       user_id=user_id).first()
 
-        # Create the exact format expected by Swift ServerGameData
-        game_data = {
-            'gameId': game_score.game_id,
-            'userId': game_score.user_id,
-            'encrypted': '',  # Will be filled from active_game if available
-            'solution': '',  # Will be filled from active_game if available
+        return jsonify(build_server_game_data(game_score, active_game))
+
+    except Exception as e:
+        logging.error(f"Error getting game {game_id}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+# Field names and coercions Swift ServerGameData expects, resolved once
+# so each serialized game is a single dict comprehension
+_COERCE_FIELD = {
+    str: lambda value: str(value or ''),
+    int: lambda value: int(value or 0),
+    bool: bool,
+    dict: lambda value: dict(value or {})
+}
+SERVER_GAME_FIELDS = tuple(
+    (field, _COERCE_FIELD[expected_type]) for field, expected_type in (
+        ('gameId', str),
+        ('userId', str),
+        ('encrypted', str),
+        ('solution', str),
+        ('currentDisplay', str),
+        ('mistakes', int),
+        ('maxMistakes', int),
+        ('hasWon', bool),
+        ('hasLost', bool),
+        ('difficulty', str),
+        ('isDaily', bool),
+        ('score', int),
+        ('timeTaken', int),
+        ('startTime', str),
+        ('lastUpdateTime', str),
+        ('mapping', dict),
+        ('correctMappings', dict),
+        ('guessedMappings', dict)))
+
+
+def build_server_game_data(game_score, active_game=None):
+    """
+    Build the Swift ServerGameData dict for a game and its active state
+    """
+    # Create the exact format expected by Swift ServerGameData
+    game_data = {
+        'gameId': game_score.game_id,
+        'userId': game_score.user_id,
+        'encrypted': '',  # Will be filled from active_game if available
+        'solution': '',  # Will be filled from active_game if available
+        'currentDisplay':
+        '',  # Will be filled from active_game if available
+        'mistakes': game_score.mistakes,
+        'maxMistakes': 5,  # Default value
+        'hasWon': game_score.completed and game_score.score > 0,
+        'hasLost': game_score.completed and game_score.score == 0,
+        'difficulty': 'medium',  # Default, could be derived from game_type
+        'isDaily': game_score.game_type == 'daily',
+        'score': game_score.score,
+        'timeTaken': game_score.time_taken,
+        'startTime':
+        game_score.created_at.isoformat() + 'Z',  # Add Z for ISO format
+        'lastUpdateTime':
+        game_score.created_at.isoformat() + 'Z',  # Add Z for ISO format
+        'mapping': {},
+        'correctMappings': {},
+        'guessedMappings': {}
+    }
+
+    # Add active game data if available
+    if active_game:
+        game_data.update({
+            'encrypted':
+            active_game.encrypted_paragraph or '',
+            'solution':
+            active_game.original_paragraph or '',
             'currentDisplay':
-            '',  # Will be filled from active_game if available
-            'mistakes': game_score.mistakes,
-            'maxMistakes': 5,  # Default value
-            'hasWon': game_score.completed and game_score.score > 0,
-            'hasLost': game_score.completed and game_score.score == 0,
-            'difficulty': 'medium',  # Default, could be derived from game_type
-            'isDaily': game_score.game_type == 'daily',
-            'score': game_score.score,
-            'timeTaken': game_score.time_taken,
-            'startTime':
-            game_score.created_at.isoformat() + 'Z',  # Add Z for ISO format
+            generate_current_display(active_game),
+            'mapping':
+            active_game.mapping or {},
+            'correctMappings':
+            active_game.reverse_mapping or {},
+            'guessedMappings':
+            get_guessed_mappings(active_game),
             'lastUpdateTime':
-            game_score.created_at.isoformat() + 'Z',  # Add Z for ISO format
-            'mapping': {},
-            'correctMappings': {},
-            'guessedMappings': {}
-        }
+            active_game.last_updated.isoformat() + 'Z'
+            if active_game.last_updated else game_data['lastUpdateTime']
+        })
 
-        # Add active game data if available
-        if active_game:
-            game_data.update({
-                'encrypted':
-                active_game.encrypted_paragraph or '',
-                'solution':
-                active_game.original_paragraph or '',
-                'currentDisplay':
-                generate_current_display(active_game),
-                'mapping':
-                active_game.mapping or {},
-                'correctMappings':
-                active_game.reverse_mapping or {},
-                'guessedMappings':
-                get_guessed_mappings(active_game),
-                'lastUpdateTime':
-                active_game.last_updated.isoformat() + 'Z'
-                if active_game.last_updated else game_data['lastUpdateTime']
-            })
+    # Ensure all required fields are present and correct type
+    return {
+        field: coerce(game_data.get(field))
+        for field, coerce in SERVER_GAME_FIELDS
+    }
 
-        # Ensure all required fields are present and correct type
-        # Swift expects these exact field names and types
-        required_fields = {
-            'gameId': str,
-            'userId': str,
-            'encrypted': str,
-            'solution': str,
-            'currentDisplay': str,
-            'mistakes': int,
-            'maxMistakes': int,
-            'hasWon': bool,
-            'hasLost': bool,
-            'difficulty': str,
-            'isDaily': bool,
-            'score': int,
-            'timeTaken': int,
-            'startTime': str,
-            'lastUpdateTime': str,
-            'mapping': dict,
-            'correctMappings': dict,
-            'guessedMappings': dict
-        }
 
-        # Validate and convert types
-        for field, expected_type in required_fields.items():
-            if field not in game_data:
-                if expected_type == str:
-                    game_data[field] = ''
-                elif expected_type == int:
-                    game_data[field] = 0
-                elif expected_type == bool:
-                    game_data[field] = False
-                elif expected_type == dict:
-                    game_data[field] = {}
-            else:
-                # Ensure correct type
-                if expected_type == int:
-                    game_data[field] = int(game_data[field] or 0)
-                elif expected_type == bool:
-                    game_data[field] = bool(game_data[field])
-                elif expected_type == str:
-                    game_data[field] = str(game_data[field] or '')
-                elif expected_type == dict:
-                    game_data[field] = dict(game_data[field] or {})
-
-        return jsonify(game_data)
+# Most game IDs accepted by one bulk download request
+MAX_BULK_GAME_IDS = 1000
+
+# Rows fetched per round trip while streaming a bulk download
+BULK_YIELD_PER = 500
+
+
+def _iter_bulk_games(query):
+    """
+    Run a bulk download query and build each game as it is read. The query
+    runs only once the response body is iterated, so the rows belong to the
+    session that is current while streaming.
+    """
+    rows = db.session.execute(
+        query.execution_options(yield_per=BULK_YIELD_PER))
+    for game_score, active_game in rows:
+        yield build_server_game_data(game_score, active_game)
+
+
+@bp.route('/games/bulk', methods=['POST'])
+@jwt_required()
+def bulk_download_games():
+    """
+    Stream many games in the GET /games/<game_id> format, selected by
+    gameIds or by sinceCursor (changes after a reconcile cursor).
+    Responds with NDJSON, or MessagePack when the Accept header prefers it.
+    """
+    try:
+        data = get_request_json() or {}
+        user_id = get_jwt_identity()
+
+        game_ids = data.get('gameIds')
+        since_cursor = data.get('sinceCursor')
+
+        query = db.select(GameScore, ActiveGameState).outerjoin(
+            ActiveGameState,
+            and_(ActiveGameState.user_id == GameScore.user_id,
+                 ActiveGameState.game_id == GameScore.game_id)).where(
+                     GameScore.user_id == user_id)
+
+        if game_ids is not None:
+            if not isinstance(game_ids, list) or len(
+                    game_ids) > MAX_BULK_GAME_IDS:
+                return jsonify({
+                    'success':
+                    False,
+                    'error':
+                    f'gameIds must be a list of at most {MAX_BULK_GAME_IDS} IDs'
+                }), 400
+            query = query.where(GameScore.game_id.in_(game_ids)).order_by(
+                GameScore.id)
+        elif since_cursor is not None:
+            try:
+                since_cursor = int(since_cursor)
+            except (TypeError, ValueError):
+                return jsonify({
+                    'success': False,
+                    'error': 'sinceCursor must be an integer'
+                }), 400
+            query = query.where(GameScore.change_seq > since_cursor).order_by(
+                GameScore.change_seq)
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'gameIds or sinceCursor required'
+            }), 400
+
+        return stream_records(_iter_bulk_games(query),
+                              use_msgpack=wants_msgpack())
 
+    except HTTPException as e:
+        return jsonify({'success': False, 'error': e.description}), e.code
     except Exception as e:
-        logging.error(f"Error getting game {game_id}: {str(e)}")
+        logging.error(f"Error in bulk game download: {str(e)}", exc_info=True)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -1490,21 +1648,19 @@ def save_game():
                 'error': 'Invalid game ID format'
             }), 400
 
-        # Check for existing game with proper constructed ID
-        existing_game = GameScore.query.filter_by(game_id=game_id,
-                                                  user_id=user_id).first()
-
-        # Check for duplicates with just the raw UUID (improper format)
-        duplicate_games = GameScore.query.filter_by(game_id=uuid_part,
-                                                    user_id=user_id).all()
+        # Every stored form of this game shares its UUID, so one lookup on
+        # the (user_id, game_uuid) index finds the game and any duplicates
+        matching_games = GameScore.query.filter_by(user_id=user_id,
+                                                   game_uuid=uuid_part).all()
 
-        # Also check for other potential duplicates with different constructed formats
-        other_duplicates = GameScore.query.filter(
-            GameScore.user_id == user_id,
-            GameScore.game_id.like(f'%{uuid_part}')).filter(
-                GameScore.game_id != game_id).all()
+        existing_game = next(
+            (g for g in matching_games if g.game_id == game_id), None)
+        all_duplicates = [g for g in matching_games if g.game_id != game_id]
 
-        all_duplicates = duplicate_games + other_duplicates
+        # Leaderboard contributions of every stored form of this game,
+        # replaced below by the saved game's once the changes are made
+        previous_results = [(g.created_at, g.score) for g in matching_games
+                            if g.completed]
 
         if all_duplicates:
             logging.info(
@@ -1534,12 +1690,12 @@ def save_game():
                     f"Deleting duplicate game: {duplicate.game_id} (created: {duplicate.created_at})"
                 )
 
-                # Also clean up any related active game state
-                ActiveGameState.query.filter_by(game_id=duplicate.game_id,
-                                                user_id=user_id).delete()
-
                 db.session.delete(duplicate)
 
+            # Flush the renames and deletes before any insert that could
+            # collide with them on the unique (user_id, game_uuid) index
+            db.session.flush()
+
         # Parse timestamps - handle both formats (with and without Z)
         start_time = game_data.get('startTime', datetime.utcnow().isoformat())
         last_update_time = game_data.get('lastUpdateTime',
@@ -1596,19 +1752,29 @@ def save_game():
                                      or game_data.get('hasLost', False)),
                                  created_at=start_datetime)
             db.session.add(new_game)
+            existing_game = new_game
+
+        # Rollups by the game's own (possibly late) day, in this transaction
+        remove_game_results(user_id, previous_results)
+        if existing_game.completed:
+            record_game_results(
+                user_id, [(existing_game.created_at, existing_game.score)])
 
         # Handle active game state for incomplete games
         is_completed = game_data.get('hasWon', False) or game_data.get(
             'hasLost', False)
 
         if not is_completed:
-            # Save/update active game state
+            # Save/update active game state, adopting any row stored under
+            # another form of the same game ID
             active_game = ActiveGameState.query.filter_by(
-                game_id=game_id, user_id=user_id).first()
+                user_id=user_id, game_uuid=uuid_part).first()
 
             if not active_game:
                 active_game = ActiveGameState(user_id=user_id, game_id=game_id)
                 db.session.add(active_game)
+            else:
+                active_game.game_id = game_id
 
             # Update active game state with data from ServerGameData
             active_game.original_paragraph = game_data.get('solution', '')
@@ -1620,13 +1786,16 @@ def save_game():
             active_game.mistakes = int(game_data.get('mistakes', 0))
             active_game.last_updated = update_datetime
         else:
-            # Game is completed, remove from active games (clean up any duplicates too)
-            ActiveGameState.query.filter(
-                ActiveGameState.user_id == user_id,
-                or_(ActiveGameState.game_id == game_id,
-                    ActiveGameState.game_id == uuid_part,
-                    ActiveGameState.game_id.like(f'%{uuid_part}'))).delete(
-                        synchronize_session=False)
+            # Game is completed, remove from active games (any ID form).
+            # The query-level delete skips the tombstone listener, so the
+            # removed states are recorded for sync explicitly
+            finished = ActiveGameState.query.filter_by(user_id=user_id,
+                                                       game_uuid=uuid_part)
+            finished_ids = [row.game_id for row in finished.with_entities(
+                ActiveGameState.game_id)]
+            if finished_ids:
+                finished.delete(synchronize_session=False)
+                record_tombstones(user_id, finished_ids)
 
         db.session.commit()
 
@@ -1643,34 +1812,6 @@ def save_game():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-def extract_uuid_from_constructed_id(game_id):
-    """
-    Extract the UUID part from a properly constructed game ID
-    Handles formats like:
-    - easy-daily-2025-04-19-[UUID]
-    - medium-hardcore-[UUID] 
-    - hard-[UUID]
-    - [UUID] (fallback)
-    """
-    import re
-
-    # Pattern to match UUID at the end of the string
-    uuid_pattern = r'([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$'
-    match = re.search(uuid_pattern, game_id, re.IGNORECASE)
-
-    if match:
-        return match.group(1).upper(
-        )  # Return uppercase for consistency with existing bad data
-
-    # If the entire string is just a UUID, return it
-    if re.match(
-            r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$',
-            game_id, re.IGNORECASE):
-        return game_id.upper()
-
-    return None
-
-
 def is_properly_constructed_game_id(game_id):
     """
     Check if a game ID follows the proper construction format
@@ -1751,52 +1892,23 @@ def batch_upload_games():
     Upload multiple games in a single request for efficiency
     """
     try:
-        games_data = request.get_json()
+        games_data = get_request_json() or {}
         user_id = get_jwt_identity()
 
-        success_count = 0
-        error_count = 0
-        errors = []
-
-        for game_data in games_data.get('games', []):
-            try:
-                game_id = game_data['gameId']
-
-                # Check if game already exists
-                existing_game = GameScore.query.filter_by(
-                    game_id=game_id, user_id=user_id).first()
-
-                if not existing_game:
-                    new_game = GameScore(
-                        user_id=user_id,
-                        game_id=game_id,
-                        score=game_data.get('score', 0),
-                        mistakes=game_data.get('mistakes', 0),
-                        time_taken=game_data.get('timeTaken', 0),
-                        game_type='daily'
-                        if game_data.get('isDaily', False) else 'regular',
-                        completed=game_data.get('hasWon', False)
-                        or game_data.get('hasLost', False),
-                        created_at=datetime.fromisoformat(
-                            game_data.get('lastUpdateTime',
-                                          datetime.utcnow().isoformat())))
-                    db.session.add(new_game)
-                    success_count += 1
-
-            except Exception as e:
-                error_count += 1
-                errors.append(
-                    f"Game {game_data.get('gameId', 'unknown')}: {str(e)}")
-
+        result = ingest_games(user_id, games_data.get('games', []))
         db.session.commit()
 
         return jsonify({
             'success': True,
-            'uploaded': success_count,
-            'errors': error_count,
-            'errorDetails': errors
+            'uploaded': result['inserted'],
+            'errors': len(result['errors']),
+            'errorDetails': result['errors']
         })
 
+    except HTTPException as e:
+        # Malformed or oversized request bodies are the client's error
+        db.session.rollback()
+        return jsonify({'success': False, 'error': e.description}), e.code
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1849,7 +1961,7 @@ def redeem_promo():
     """
 
     current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
+    current_user = get_cached_user(current_user_id)
 
     if not current_user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
@@ -1886,15 +1998,8 @@ def redeem_promo():
 def check_legacy_import(code, current_user):
     """Check if code matches any unsubscribe token for legacy import"""
 
-    # Only check first 6 chars of unsubscribe tokens
-    all_users = User.query.filter(User.unsubscribe_token.isnot(None),
-                                  User.unsubscribe_token != '').all()
-
-    legacy_user = None
-    for user in all_users:
-        if user.unsubscribe_token and user.unsubscribe_token[:6].upper() == code:
-            legacy_user = user
-            break
+    # Codes are the first 6 chars of unsubscribe tokens, stored as legacy_code
+    legacy_user = User.find_by_legacy_code(code)
 
     if not legacy_user:
         return None  # Not a legacy code
@@ -2002,8 +2107,9 @@ def check_promo_code(code, current_user):
             'error': 'You have already redeemed this code'
         }), 409
 
-    # Apply the promo based on type
-    result = apply_promo(promo, current_user)
+    # Apply the promo based on type; the snapshot is read-only, so load the
+    # row being changed
+    result = apply_promo(promo, User.query.get(current_user.user_id))
 
     if result['success']:
         # Record redemption
@@ -2018,6 +2124,7 @@ def check_promo_code(code, current_user):
         promo.current_uses += 1
 
         db.session.commit()
+        invalidate_user(current_user.user_id)
 
         logging.info(
             f"User {current_user.username} redeemed promo {code} ({promo.type})"
@@ -2066,7 +2173,7 @@ def get_active_boosts():
     """Get user's active boosts and their expiry"""
 
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_cached_user(user_id)
 
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -2089,9 +2196,14 @@ def get_active_boosts():
             })
         else:
             # Expired, clean up
-            user.xp_boost_multiplier = 1.0
-            user.xp_boost_expires = None
+            User.query.filter_by(user_id=user_id).update(
+                {
+                    User.xp_boost_multiplier: 1.0,
+                    User.xp_boost_expires: None
+                },
+                synchronize_session=False)
             db.session.commit()
+            invalidate_user(user_id)
 
     return jsonify({'boosts': boosts, 'has_active_boosts': len(boosts) > 0})
 
@@ -2102,7 +2214,7 @@ def get_active_boosts():
 def create_promo():
     """Create a new promo code"""
 
-    current_user = User.query.get(get_jwt_identity())
+    current_user = get_cached_user(get_jwt_identity())
     if not current_user or not current_user.subadmin:
         return jsonify({'error': 'Unauthorized'}), 403
 
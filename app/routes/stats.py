@@ -1,11 +1,16 @@
 from flask import Blueprint, jsonify, request, session
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.exceptions import HTTPException
 from datetime import datetime, timedelta
 import logging
 from sqlalchemy import text
-from app.models import db, UserStats, GameScore, User
+from app.models import db, UserStats, GameScore, User, PeriodScoreRollup
 from app.utils.db import get_user_stats
 from app.utils.stats import initialize_or_update_user_stats
+from app.utils.leaderboard import PERIOD_TYPES, period_start_for
+from app.utils.helpers import get_request_json
+from app.services.game_ingest import ingest_games
+from app.utils.user_cache import get_cached_user
 
 bp = Blueprint('stats', __name__)
 
@@ -41,34 +46,31 @@ def get_leaderboard():
         user_id = get_jwt_identity()
 
         # Calculate total users BEFORE the main query
-        if period == 'weekly':
-            today = datetime.utcnow()
-            today_start = datetime(today.year, today.month, today.day)
-            start_of_week = today_start - timedelta(days=today.weekday())
+        if period in PERIOD_TYPES:
+            # Period scores are read from the pre-aggregated rollups
+            period_start = period_start_for(period, datetime.utcnow().date())
+            period_filter = (PeriodScoreRollup.period_type == period,
+                             PeriodScoreRollup.period_start == period_start)
 
-            # Get total unique users who have played this week
             total_users = db.session.query(
-                db.func.count(db.distinct(GameScore.user_id))).filter(
-                    GameScore.completed == True, GameScore.created_at
-                    >= start_of_week).scalar() or 0
+                db.func.count(PeriodScoreRollup.user_id)).filter(
+                    *period_filter).scalar() or 0
         else:
             # All-time total users
             total_users = UserStats.query.count()
 
         # Query for top entries
-        if period == 'weekly':
-            # Weekly scores from game_scores
+        if period in PERIOD_TYPES:
             top_entries = db.session.query(
                 User.username,
                 User.user_id,
-                db.func.sum(GameScore.score).label('total_score'),
-                db.func.count(GameScore.id).label('games_played'),
-                db.func.avg(GameScore.score).label('avg_score')
-            ).join(User).filter(
-                GameScore.completed == True,
-                GameScore.created_at >= start_of_week
-            ).group_by(User.username, User.user_id)\
-             .order_by(db.desc('total_score'))\
+                PeriodScoreRollup.score.label('total_score'),
+                PeriodScoreRollup.games_played.label('games_played'),
+                (db.func.cast(PeriodScoreRollup.score, db.Float) /
+                 db.func.nullif(PeriodScoreRollup.games_played, 0)).label('avg_score')
+            ).join(User, User.user_id == PeriodScoreRollup.user_id)\
+             .filter(*period_filter)\
+             .order_by(db.desc(PeriodScoreRollup.score))\
              .offset(offset).limit(per_page).all()
         else:
             # All-time stats from user_stats
@@ -106,37 +108,19 @@ def get_leaderboard():
         # Get current user entry if not in top entries
         current_user_entry = None
         if not any(entry["is_current_user"] for entry in formatted_entries):
-            user = User.query.get(user_id)
+            user = get_cached_user(user_id)
             if user:
-                if period == 'weekly':
-                    # For weekly, check if user has any games this week
-                    user_weekly_stats = db.session.query(
-                        db.func.sum(GameScore.score).label('total_score'),
-                        db.func.count(GameScore.id).label('games_played'),
-                        db.func.avg(
-                            GameScore.score).label('avg_score')).filter(
-                                GameScore.user_id == user_id,
-                                GameScore.completed == True,
-                                GameScore.created_at >= start_of_week).first()
-
-                    if user_weekly_stats and user_weekly_stats.games_played and user_weekly_stats.games_played > 0:
-                        # User has played this week, calculate their rank
-                        user_score = user_weekly_stats.total_score or 0
-
-                        # Count how many users have higher scores
-                        rank_subquery = db.session.query(
-                            GameScore.user_id,
-                            db.func.sum(
-                                GameScore.score).label('user_total')).filter(
-                                    GameScore.completed == True,
-                                    GameScore.created_at
-                                    >= start_of_week).group_by(
-                                        GameScore.user_id).subquery()
+                if period in PERIOD_TYPES:
+                    user_rollup = PeriodScoreRollup.query.filter(
+                        *period_filter,
+                        PeriodScoreRollup.user_id == user_id).first()
 
+                    if user_rollup and user_rollup.games_played > 0:
+                        # User has played this period, calculate their rank
                         rank_query = db.session.query(
-                            db.func.count()).select_from(rank_subquery).filter(
-                                rank_subquery.c.user_total >
-                                user_score).scalar()
+                            db.func.count(PeriodScoreRollup.user_id)).filter(
+                                *period_filter, PeriodScoreRollup.score >
+                                user_rollup.score).scalar()
 
                         user_rank = (rank_query or 0) + 1
 
@@ -146,19 +130,20 @@ def get_leaderboard():
                             "user_id":
                             user_id,
                             "score":
-                            int(user_score),
+                            user_rollup.score,
                             "games_played":
-                            user_weekly_stats.games_played,
+                            user_rollup.games_played,
                             "avg_score":
-                            round(float(user_weekly_stats.avg_score), 1)
-                            if user_weekly_stats.avg_score else 0,
+                            round(
+                                user_rollup.score /
+                                user_rollup.games_played, 1),
                             "is_current_user":
                             True,
                             "rank":
                             user_rank
                         }
                     else:
-                        # User hasn't played this week - they're unranked
+                        # User hasn't played this period - they're unranked
                         current_user_entry = {
                             "username": user.username,
                             "user_id": user_id,
@@ -285,7 +270,7 @@ def get_streak_leaderboard():
         if not any(entry["is_current_user"] for entry in formatted_entries):
             user_stats = UserStats.query.filter_by(user_id=user_id).first()
             if user_stats:
-                user = User.query.get(user_id)
+                user = get_cached_user(user_id)
 
                 # Get the correct streak field
                 streak_field_name = 'current_streak' if period == 'current' and streak_type == 'win' else \
@@ -435,74 +420,24 @@ def record_games():
     """Record completed games from mobile app"""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        data = get_request_json() or {}
         games = data.get('games', [])
 
-        # Process each game
-        processed = 0
-        for game_data in games[:20]:  # Cap at 20 per request
-            # Check for duplicate
-            existing = GameScore.query.filter_by(
-                user_id=user_id,
-                game_id=game_data['gameId']
-            ).first()
-
-            if not existing:
-                game = GameScore(
-                    user_id=user_id,
-                    game_id=game_data['gameId'],
-                    score=game_data['score'],
-                    mistakes=game_data['mistakes'],
-                    time_taken=game_data['timeSeconds'],
-                    game_type='daily' if game_data['isDaily'] else 'regular',
-                    completed=True,
-                    created_at=datetime.fromisoformat(game_data['completedAt'].replace('Z', '+00:00'))
-                )
-                db.session.add(game)
-                processed += 1
-
-                # Update user stats
-                update_user_stats_for_game(user_id, game_data)
-
+        result = ingest_games(user_id, games, completed=True)
         db.session.commit()
+        processed = result['inserted']
 
         return jsonify({
             "success": True,
             "processed": processed,
-            "message": f"Recorded {processed} new games"
+            "message": f"Recorded {processed} new games",
+            "errors": result['errors']
         }), 200
 
+    except HTTPException as e:
+        # Malformed or oversized request bodies are the client's error
+        db.session.rollback()
+        return jsonify({"error": e.description}), e.code
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
-
-def update_user_stats_for_game(user_id, game_data):
-    """Update aggregated stats after game recording"""
-    stats = UserStats.query.filter_by(user_id=user_id).first()
-    if not stats:
-        stats = UserStats(user_id=user_id)
-        db.session.add(stats)
-
-    # Update totals
-    stats.total_games_played += 1
-    stats.total_score += game_data['score']
-
-    if game_data['won']:
-        stats.games_won += 1
-
-    # Handle daily streak
-    if game_data['isDaily']:
-        game_date = datetime.fromisoformat(game_data['completedAt'].replace('Z', '+00:00')).date()
-
-        if stats.last_daily_completed:
-            days_diff = (game_date - stats.last_daily_completed).days
-
-            if days_diff == 1:  # Consecutive day
-                stats.current_daily_streak += 1
-            elif days_diff > 1:  # Streak broken
-                stats.current_daily_streak = 1
-            # days_diff == 0 means same day, don't update
-        else:
-            stats.current_daily_streak = 1
-
-        stats.last_daily_completed = game_date
-        stats.best_daily_streak = max(stats.best_daily_streak, stats.current_daily_streak)
\ No newline at end of file
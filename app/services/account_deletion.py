@@ -0,0 +1,166 @@
+import logging
+from datetime import datetime, timedelta
+from app import jwt_blocklist
+from app.utils.user_cache import invalidate_user
+from app.models import (db, User, UserStats, GameScore, ActiveGameState,
+                        UserSyncState, GameTombstone, GameSyncBucket,
+                        DailyCompletion, LeaderboardEntry, DailyScoreRollup,
+                        PeriodScoreRollup, PromoRedemption, BackupRecord,
+                        BackupSettings, EmailCampaign)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rows deleted per statement / transaction
+DELETE_BATCH_SIZE = 1000
+
+# Pending deletions older than this are queued again by the sweep, in case
+# the original job was lost
+RESUME_AFTER_MINUTES = 15
+
+# (model, user column) deleted in this order, children before parents
+DELETION_STEPS = (
+    (ActiveGameState, ActiveGameState.user_id),
+    (GameScore, GameScore.user_id),
+    (GameTombstone, GameTombstone.user_id),
+    (GameSyncBucket, GameSyncBucket.user_id),
+    (UserSyncState, UserSyncState.user_id),
+    (DailyCompletion, DailyCompletion.user_id),
+    (DailyScoreRollup, DailyScoreRollup.user_id),
+    (PeriodScoreRollup, PeriodScoreRollup.user_id),
+    (LeaderboardEntry, LeaderboardEntry.user_id),
+    (PromoRedemption, PromoRedemption.user_id),
+    (UserStats, UserStats.user_id),
+)
+
+# (model, user column) kept for auditing with the reference cleared
+NULLIFY_STEPS = (
+    (BackupRecord, BackupRecord.created_by),
+    (BackupSettings, BackupSettings.updated_by),
+    (EmailCampaign, EmailCampaign.created_by),
+)
+
+
+def request_account_deletion(user, token=None):
+    """
+    Revoke the user's tokens, mark the account pending deletion and queue
+    the background job that removes its data.
+
+    Args:
+        user (User): Account to delete
+        token (dict, optional): Decoded JWT of the current request
+    """
+    jwt_blocklist.revoke_user(user.user_id)
+    if token:
+        jwt_blocklist.add(token["jti"], token.get("exp"))
+
+    user.pending_deletion = True
+    user.deletion_requested_at = datetime.utcnow()
+    db.session.commit()
+    invalidate_user(user.user_id)
+
+    queue_account_deletion(user.user_id)
+
+
+def queue_account_deletion(user_id):
+    """Queue the deletion job; the sweep retries if the broker is down"""
+    try:
+        from app.celery_worker import delete_account_task
+        return delete_account_task.delay(user_id).id
+    except Exception as e:
+        logger.error(
+            f"Could not queue deletion for user {user_id}, "
+            f"leaving it for the sweep: {str(e)}")
+        return None
+
+
+def _delete_in_batches(model, column, user_id, batch_size):
+    """
+    Delete a user's rows from one table in primary key batches, committing
+    each batch so no transaction holds locks for the whole account.
+    """
+    primary_key = db.inspect(model).primary_key
+    if len(primary_key) != 1:
+        # Composite keys are per-user summary tables with bounded row counts
+        deleted = model.query.filter(column == user_id).delete(
+            synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    key = primary_key[0]
+    deleted = 0
+    while True:
+        ids = [
+            row[0] for row in db.session.query(key).filter(
+                column == user_id).order_by(key).limit(batch_size)
+        ]
+        if not ids:
+            return deleted
+        deleted += model.query.filter(key.in_(ids)).delete(
+            synchronize_session=False)
+        db.session.commit()
+
+
+def delete_account_data(user_id, batch_size=DELETE_BATCH_SIZE, progress=None):
+    """
+    Remove a pending account and every row that references it.
+
+    Args:
+        user_id (str): Account to delete
+        batch_size (int): Rows deleted per transaction
+        progress (callable, optional): Called with the running report
+            after each table
+
+    Returns:
+        dict: Rows deleted or cleared per table
+    """
+    user = User.query.get(user_id)
+    if not user:
+        return {'user_id': user_id, 'deleted': {}, 'already_deleted': True}
+    if not user.pending_deletion:
+        raise ValueError(f"User {user_id} is not pending deletion")
+
+    report = {'user_id': user_id, 'deleted': {}, 'cleared': {}}
+    try:
+        for model, column in DELETION_STEPS:
+            report['deleted'][model.__tablename__] = _delete_in_batches(
+                model, column, user_id, batch_size)
+            if progress:
+                progress(report)
+
+        for model, column in NULLIFY_STEPS:
+            report['cleared'][model.__tablename__] = model.query.filter(
+                column == user_id).update({column: None},
+                                          synchronize_session=False)
+
+        User.query.filter_by(user_id=user_id).delete(
+            synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    invalidate_user(user_id)
+
+    logger.info(f"Deleted account {user_id}: {report['deleted']}")
+    return report
+
+
+def resume_account_deletions(older_than_minutes=RESUME_AFTER_MINUTES):
+    """Queue deletion jobs again for accounts left pending too long"""
+    cutoff = datetime.utcnow() - timedelta(minutes=older_than_minutes)
+    user_ids = [
+        row.user_id for row in db.session.query(User.user_id).filter(
+            User.pending_deletion.is_(True),
+            User.deletion_requested_at < cutoff)
+    ]
+    if user_ids:
+        # Restart the clock so a job that is still running is not queued
+        # again on every sweep
+        User.query.filter(User.user_id.in_(user_ids)).update(
+            {User.deletion_requested_at: datetime.utcnow()},
+            synchronize_session=False)
+        db.session.commit()
+
+    for user_id in user_ids:
+        queue_account_deletion(user_id)
+    return len(user_ids)
@@ -0,0 +1,86 @@
+import logging
+import secrets
+from app.models import db, User, Quote
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while streaming an export
+EXPORT_YIELD_PER = 1000
+
+# Users given a token per UPDATE batch and commit
+TOKEN_BATCH_SIZE = 1000
+
+QUOTE_EXPORT_HEADER = [
+    'text', 'author', 'minor_attribution', 'daily_date', 'times_used'
+]
+
+CONSENTED_USER_FIELDS = ['email', 'firstname', 'unique_token']
+
+
+def iter_quote_rows():
+    """Quote export rows in ID order, read through a yield_per cursor"""
+    rows = db.session.execute(
+        db.select(Quote.text, Quote.author, Quote.minor_attribution,
+                  Quote.daily_date, Quote.times_used).order_by(
+                      Quote.id).execution_options(yield_per=EXPORT_YIELD_PER))
+    for text, author, minor_attribution, daily_date, times_used in rows:
+        yield (text, author, minor_attribution,
+               daily_date.isoformat() if daily_date else '', times_used)
+
+
+def ensure_unsubscribe_tokens(batch_size=TOKEN_BATCH_SIZE):
+    """
+    Give every consenting user without an unsubscribe token a new one.
+    Tokens are generated in Python, since they must be unguessable, and
+    written with one executemany UPDATE per batch.
+
+    Returns:
+        int: Number of tokens created
+    """
+    table = User.__table__
+    update = table.update().where(
+        table.c.user_id == db.bindparam('uid'),
+        table.c.unsubscribe_token.is_(None)).values(
+            unsubscribe_token=db.bindparam('token'),
+            legacy_code=db.bindparam('code'))
+
+    created = 0
+    while True:
+        user_ids = db.session.execute(
+            db.select(table.c.user_id).where(
+                table.c.email_consent == True,
+                table.c.unsubscribe_token.is_(None)).order_by(
+                    table.c.user_id).limit(batch_size)).scalars().all()
+        if not user_ids:
+            break
+
+        params = []
+        for user_id in user_ids:
+            token = secrets.token_urlsafe(32)
+            params.append({
+                'uid': user_id,
+                'token': token,
+                'code': User.legacy_code_for(token)
+            })
+        db.session.execute(update, params)
+        db.session.commit()
+        created += len(params)
+
+    if created:
+        logger.info(f"Created {created} missing unsubscribe tokens")
+    return created
+
+
+def iter_consented_users():
+    """Mailing list records for consenting users, via a yield_per cursor"""
+    rows = db.session.execute(
+        db.select(User.email, User.username, User.unsubscribe_token).where(
+            User.email_consent == True).order_by(
+                User.user_id).execution_options(yield_per=EXPORT_YIELD_PER))
+    for email, username, token in rows:
+        yield {
+            "email": email,
+            "firstname": username,  # Using username as firstname
+            "unique_token": token
+        }
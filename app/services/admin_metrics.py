@@ -0,0 +1,115 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from redis.exceptions import RedisError
+from sqlalchemy import case, func, true
+from app.models import db, User, GameScore
+from app.utils.redis_client import get_redis
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'admin:dashboard_metrics'
+
+# Refreshed every minute by Celery beat; kept a little longer so a slow or
+# missed run still leaves a snapshot to show
+CACHE_TTL_SECONDS = 300
+
+RECENT_ACTIVITY_LIMIT = 5
+
+
+def _count_where(condition):
+    """COUNT(*) FILTER (WHERE ...) on Postgres, SUM(CASE ...) elsewhere"""
+    if db.engine.dialect.name == 'postgresql':
+        return func.count().filter(condition)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _percentage(part, whole):
+    return round((part / whole) * 100) if whole > 0 else 0
+
+
+def compute_dashboard_metrics():
+    """
+    Compute the dashboard numbers: one aggregate query for the counts and
+    one join for recent games with their usernames.
+
+    Returns:
+        dict: JSON-serializable metrics snapshot
+    """
+    now = datetime.utcnow()
+    day_ago = now - timedelta(days=1)
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = now - timedelta(days=14)
+
+    user_counts = db.session.query(
+        func.count().label('total_users'),
+        _count_where(User.created_at >= week_ago).label('new_users')).subquery()
+
+    previous_week = ((GameScore.created_at >= two_weeks_ago) &
+                     (GameScore.created_at < week_ago))
+    game_counts = db.session.query(
+        func.count().label('total_games'),
+        _count_where(GameScore.created_at >= week_ago).label('new_games'),
+        _count_where(GameScore.completed == True).label('completed_games'),
+        _count_where(previous_week).label('old_total'),
+        _count_where(previous_week
+                     & (GameScore.completed == True)).label('old_completed'),
+        func.count(
+            func.distinct(
+                case((GameScore.created_at >= day_ago, GameScore.user_id)))
+        ).label('active_users')).subquery()
+
+    # Both subqueries are single rows; join them explicitly on true
+    counts = db.session.query(user_counts, game_counts).select_from(
+        user_counts).join(game_counts, true()).one()
+
+    recent_games = db.session.query(
+        GameScore.created_at, GameScore.completed, GameScore.score,
+        GameScore.difficulty, User.username).outerjoin(
+            User, User.user_id == GameScore.user_id).order_by(
+                GameScore.created_at.desc()).limit(RECENT_ACTIVITY_LIMIT)
+
+    completion_rate = _percentage(counts.completed_games, counts.total_games)
+    return {
+        'total_users': counts.total_users,
+        'new_users_percentage': _percentage(counts.new_users,
+                                            counts.total_users),
+        'total_games': counts.total_games,
+        'new_games_percentage': _percentage(counts.new_games,
+                                            counts.total_games),
+        'active_users': counts.active_users,
+        'completion_rate': completion_rate,
+        'completion_rate_change': completion_rate -
+        _percentage(counts.old_completed, counts.old_total),
+        'recent_games': [{
+            'created_at': game.created_at.isoformat() if game.created_at else None,
+            'completed': bool(game.completed),
+            'score': game.score,
+            'difficulty': game.difficulty,
+            'username': game.username or 'Unknown'
+        } for game in recent_games],
+        'generated_at': now.isoformat()
+    }
+
+
+def refresh_dashboard_metrics():
+    """Compute the snapshot and store it in Redis"""
+    metrics = compute_dashboard_metrics()
+    get_redis().setex(CACHE_KEY, CACHE_TTL_SECONDS, json.dumps(metrics))
+    return metrics
+
+
+def get_dashboard_metrics():
+    """
+    Get the cached snapshot. Computes it in the request only when there is
+    none yet, e.g. before the first beat run or while Redis is down.
+    """
+    try:
+        cached = get_redis().get(CACHE_KEY)
+        if cached:
+            return json.loads(cached)
+        return refresh_dashboard_metrics()
+    except RedisError as e:
+        logger.warning(f"Dashboard metrics cache unavailable: {str(e)}")
+        return compute_dashboard_metrics()
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+import logging
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.exc import IntegrityError
+from app.models import db, Quote
+from app.utils.daily import invalidate_first_daily_date
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# How far ahead the schedule is kept filled
+DEFAULT_HORIZON_DAYS = 365
+
+# Rows per UPDATE batch / transaction
+DEFAULT_CHUNK_SIZE = 500
+
+# Quotes already used as a daily this long ago may be scheduled again
+# once no unscheduled quote is left. A quote has a single daily_date, so
+# recycling moves it: its old date then has no quote, and looking that
+# date up (archive, calendar, daily completions) finds no puzzle
+RECYCLE_AFTER_DAYS = 730
+
+# Same eligibility rules the admin populate job has always used
+MAX_DAILY_TEXT_LENGTH = 65
+MAX_DAILY_UNIQUE_LETTERS = 15
+
+
+def find_missing_dates(start_date, end_date):
+    """
+    Get the dates in [start_date, end_date] that have no daily quote.
+
+    Returns:
+        list: Missing dates in ascending order
+    """
+    scheduled = {
+        row.daily_date
+        for row in db.session.query(Quote.daily_date).filter(
+            Quote.daily_date >= start_date, Quote.daily_date <= end_date)
+    }
+
+    total_days = (end_date - start_date).days + 1
+    return [
+        start_date + timedelta(days=offset) for offset in range(total_days)
+        if start_date + timedelta(days=offset) not in scheduled
+    ]
+
+
+def _eligible_quote_ids(limit, recycle_before=None):
+    """
+    Pick quote IDs for new daily dates, least used first then at random.
+
+    Args:
+        limit (int): Number of quotes needed
+        recycle_before (date, optional): Pick from quotes whose daily date is
+            older than this instead of unscheduled quotes
+    """
+    query = db.session.query(Quote.id).filter(
+        Quote.active == True,
+        func.length(Quote.text) <= MAX_DAILY_TEXT_LENGTH,
+        Quote.unique_letters <= MAX_DAILY_UNIQUE_LETTERS)
+
+    if recycle_before:
+        query = query.filter(Quote.daily_date < recycle_before).order_by(
+            Quote.daily_date)
+    else:
+        query = query.filter(Quote.daily_date.is_(None)).order_by(
+            func.coalesce(Quote.times_used, 0), func.random())
+
+    return [row.id for row in query.limit(limit)]
+
+
+def _assign_dates(assignments, chunk_size):
+    """Apply (quote_id, date) assignments with chunked executemany UPDATEs"""
+    stmt = update(Quote.__table__).where(
+        Quote.__table__.c.id == bindparam('quote_id')).values(
+            daily_date=bindparam('new_date'),
+            updated_at=bindparam('updated_at'))
+
+    assigned = 0
+    now = datetime.utcnow()
+    for start in range(0, len(assignments), chunk_size):
+        chunk = assignments[start:start + chunk_size]
+        try:
+            db.session.execute(stmt, [{
+                'quote_id': quote_id,
+                'new_date': new_date,
+                'updated_at': now
+            } for quote_id, new_date in chunk])
+            db.session.commit()
+            assigned += len(chunk)
+        except IntegrityError as e:
+            # Another run claimed one of these dates; the next run fills any gap
+            db.session.rollback()
+            logger.warning(
+                f"Daily date conflict in chunk at {start}, skipped: {str(e)}")
+
+    return assigned
+
+
+def extend_daily_schedule(horizon_days=DEFAULT_HORIZON_DAYS,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Fill only the unscheduled dates from today through the horizon.
+    Existing assignments are never cleared, so a run with nothing missing
+    costs a single range query. Once unscheduled quotes run out, quotes
+    older than RECYCLE_AFTER_DAYS are moved to the new dates, which clears
+    their old ones; the moved dates are logged.
+
+    Returns:
+        dict: Counts of missing, assigned, recycled and still unfilled dates
+    """
+    today = datetime.utcnow().date()
+    missing = find_missing_dates(today, today + timedelta(days=horizon_days))
+
+    result = {
+        "missing": len(missing),
+        "assigned": 0,
+        "recycled": 0,
+        "unfilled": 0
+    }
+    if not missing:
+        return result
+
+    quote_ids = _eligible_quote_ids(len(missing))
+    recycled_ids = []
+    if len(quote_ids) < len(missing):
+        recycled_ids = _eligible_quote_ids(
+            len(missing) - len(quote_ids),
+            recycle_before=today - timedelta(days=RECYCLE_AFTER_DAYS))
+
+    assignments = list(zip(quote_ids + recycled_ids, missing))
+    if recycled_ids:
+        old_dates = dict(
+            db.session.query(Quote.id, Quote.daily_date).filter(
+                Quote.id.in_(recycled_ids)))
+        logger.warning("Recycling daily quotes; these dates lose their puzzle: "
+                       + ", ".join(f"{old_dates[quote_id]} -> {new_date}"
+                                   for quote_id, new_date in assignments
+                                   if quote_id in old_dates))
+    result["assigned"] = _assign_dates(assignments, chunk_size)
+    result["recycled"] = min(len(recycled_ids), result["assigned"])
+    result["unfilled"] = len(missing) - result["assigned"]
+
+    if result["assigned"]:
+        invalidate_first_daily_date()
+
+    logger.info(f"Daily schedule extended: {result}")
+    return result
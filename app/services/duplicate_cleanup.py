@@ -0,0 +1,153 @@
+import logging
+from sqlalchemy import func
+from app.models import db, GameScore, ActiveGameState
+from app.utils.game_ids import sync_bucket_for
+from app.utils.game_sync import invalidate_sync_buckets, record_tombstones
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Duplicate UUID groups handled per batch / transaction
+DEFAULT_BATCH_SIZE = 500
+
+# Planned deletions kept in the returned report
+REPORT_SAMPLE_SIZE = 100
+
+
+def _next_duplicate_uuids(last_uuid, batch_size):
+    """
+    Get the next batch of UUIDs stored under more than one game, in UUID
+    order after last_uuid. Walks the game_uuid index, so each batch only
+    reads the rows it groups.
+    """
+    query = db.session.query(GameScore.game_uuid).filter(
+        GameScore.game_uuid.isnot(None))
+    if last_uuid is not None:
+        query = query.filter(GameScore.game_uuid > last_uuid)
+    return [
+        row.game_uuid for row in query.group_by(GameScore.game_uuid).having(
+            func.count(GameScore.id) > 1).order_by(
+                GameScore.game_uuid).limit(batch_size)
+    ]
+
+
+def _plan_deletions(uuids):
+    """
+    Pick the rows to delete for a batch of duplicate UUIDs. Keeps the
+    earliest properly constructed game ID, otherwise the earliest raw UUID.
+
+    Returns:
+        list: (id, user_id, game_id, kept game_id) for each row to delete
+    """
+    rows = db.session.query(GameScore.id, GameScore.user_id,
+                            GameScore.game_id, GameScore.game_uuid).filter(
+                                GameScore.game_uuid.in_(uuids)).order_by(
+                                    GameScore.game_uuid, GameScore.id)
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.game_uuid, []).append(row)
+
+    deletions = []
+    for uuid_part, games in groups.items():
+        constructed = [g for g in games if g.game_id.upper() != uuid_part]
+        keep = constructed[0] if constructed else games[0]
+        deletions.extend((g.id, g.user_id, g.game_id, keep.game_id)
+                         for g in games if g.id != keep.id)
+    return deletions
+
+
+def _delete_games(deletions):
+    """
+    Bulk delete planned rows with their active states, recording sync
+    tombstones and dropping cached sync digests. The caller commits.
+    """
+    # Only delete the active state belonging to the deleted game's owner
+    user_games = [(user_id, game_id) for _, user_id, game_id, _ in deletions
+                  if user_id]
+    if user_games:
+        ActiveGameState.query.filter(
+            db.tuple_(ActiveGameState.user_id,
+                      ActiveGameState.game_id).in_(user_games)).delete(
+                          synchronize_session=False)
+    GameScore.query.filter(
+        GameScore.id.in_([row_id for row_id, _, _, _ in deletions])).delete(
+            synchronize_session=False)
+
+    by_user = {}
+    for _, user_id, game_id, _ in deletions:
+        if user_id:
+            by_user.setdefault(user_id, []).append(game_id)
+    for user_id, user_game_ids in by_user.items():
+        record_tombstones(user_id, user_game_ids)
+        invalidate_sync_buckets(
+            user_id, {sync_bucket_for(game_id)
+                      for game_id in user_game_ids})
+
+
+def cleanup_duplicate_games(dry_run=False,
+                            batch_size=DEFAULT_BATCH_SIZE,
+                            progress=None):
+    """
+    Remove games stored under more than one form of the same UUID.
+    Duplicate groups are found in SQL and handled in bounded batches with
+    one commit per batch, so memory does not grow with the table.
+
+    Args:
+        dry_run (bool): Report what would be deleted without deleting
+        batch_size (int): Duplicate UUID groups per batch
+        progress (callable, optional): Called with the running report
+            after each batch
+
+    Returns:
+        dict: Groups and rows found, rows deleted, games without a UUID
+            and a sample of planned deletions
+    """
+    report = {
+        'dry_run': dry_run,
+        'groups': 0,
+        'duplicates': 0,
+        'deleted': 0,
+        'batches': 0,
+        'unmatched': GameScore.query.filter(
+            GameScore.game_uuid.is_(None)).count(),
+        'sample': []
+    }
+
+    last_uuid = None
+    while True:
+        uuids = _next_duplicate_uuids(last_uuid, batch_size)
+        if not uuids:
+            break
+        last_uuid = uuids[-1]
+
+        deletions = _plan_deletions(uuids)
+        report['groups'] += len(uuids)
+        report['duplicates'] += len(deletions)
+        report['batches'] += 1
+
+        room = REPORT_SAMPLE_SIZE - len(report['sample'])
+        report['sample'].extend({
+            'id': row_id,
+            'user_id': user_id,
+            'game_id': game_id,
+            'kept': kept
+        } for row_id, user_id, game_id, kept in deletions[:max(room, 0)])
+
+        if not dry_run and deletions:
+            try:
+                _delete_games(deletions)
+                db.session.commit()
+                report['deleted'] += len(deletions)
+            except Exception:
+                db.session.rollback()
+                raise
+
+        if progress:
+            progress(report)
+
+    logger.info(
+        f"Duplicate game cleanup {'dry run' if dry_run else 'run'}: "
+        f"{report['groups']} groups, {report['duplicates']} duplicates, "
+        f"{report['deleted']} deleted, {report['unmatched']} without a UUID")
+    return report
@@ -0,0 +1,282 @@
+import json
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from app.models import db, EmailCampaign, EmailDelivery
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Mailgun accepts at most 1000 recipients per batch message
+MAILGUN_BATCH_SIZE = 1000
+
+# Concurrent Mailgun requests, and pooled connections, per campaign
+DEFAULT_WORKERS = 4
+
+# Attempts per batch; 429s, 5xx and connection errors are retried with
+# exponential backoff, or after Retry-After when Mailgun sends it
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 2
+MAX_BACKOFF_SECONDS = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+REQUEST_TIMEOUT_SECONDS = 30
+
+# Recipient rows inserted per statement when a campaign is created
+INSERT_BATCH_SIZE = 1000
+
+# {{name}} placeholders in the templates, filled per recipient by Mailgun
+TEMPLATE_VARIABLES = ('unique_token', )
+
+
+def render_for_batch(template):
+    """Swap {{name}} placeholders for Mailgun's %recipient.name% variables"""
+    for name in TEMPLATE_VARIABLES:
+        template = template.replace('{{' + name + '}}', f'%recipient.{name}%')
+    return template
+
+
+def create_campaign(subject, text_template, html_template, recipients,
+                    created_by=None):
+    """
+    Store a campaign and one pending delivery per distinct recipient.
+
+    Args:
+        subject (str): Email subject
+        text_template (str): Plain text body with {{unique_token}}
+        html_template (str): HTML body with {{unique_token}}
+        recipients (iterable): Dicts with 'email' and 'unique_token'
+        created_by (str, optional): Admin user ID
+
+    Returns:
+        EmailCampaign: The committed campaign
+    """
+    campaign = EmailCampaign(subject=subject,
+                             text_body=render_for_batch(text_template),
+                             html_body=render_for_batch(html_template),
+                             created_by=created_by)
+    db.session.add(campaign)
+    db.session.flush()
+
+    seen = set()
+    rows = []
+    for recipient in recipients:
+        email = (recipient.get('email') or '').strip()
+        if not email or email.lower() in seen:
+            continue
+        seen.add(email.lower())
+        rows.append({
+            'campaign_id': campaign.id,
+            'email': email,
+            'unique_token': recipient.get('unique_token') or ''
+        })
+        if len(rows) >= INSERT_BATCH_SIZE:
+            db.session.execute(EmailDelivery.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(EmailDelivery.__table__.insert(), rows)
+
+    campaign.total_recipients = len(seen)
+    db.session.commit()
+    return campaign
+
+
+class MailgunClient:
+    """Sends batch messages over one pooled, thread-safe HTTP session"""
+
+    def __init__(self, api_key, domain, api_base, pool_size=DEFAULT_WORKERS):
+        self.domain = domain
+        self.url = f"{api_base.rstrip('/')}/{domain}/messages"
+        self.session = requests.Session()
+        self.session.auth = ("api", api_key)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, pool_size=DEFAULT_WORKERS):
+        config = current_app.config
+        return cls(config['MAILGUN_API_KEY'], config['MAILGUN_DOMAIN'],
+                   config['MAILGUN_API_BASE'], pool_size)
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = BACKOFF_SECONDS * 2**(attempt - 1) * random.uniform(
+                0.5, 1.5)
+        return min(delay, MAX_BACKOFF_SECONDS)
+
+    def send_batch(self, message, recipients):
+        """
+        Send one message to up to MAILGUN_BATCH_SIZE recipients.
+
+        Args:
+            message (dict): from, subject, text and html fields
+            recipients (list): Dicts with 'email' and 'unique_token'
+
+        Returns:
+            tuple: (Mailgun message ID or None, error or None, attempts)
+        """
+        data = dict(message)
+        data['to'] = [recipient['email'] for recipient in recipients]
+        data['recipient-variables'] = json.dumps({
+            recipient['email']: {
+                name: recipient[name]
+                for name in TEMPLATE_VARIABLES
+            }
+            for recipient in recipients
+        })
+
+        error = None
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            retry_after = None
+            try:
+                response = self.session.post(self.url,
+                                             data=data,
+                                             timeout=REQUEST_TIMEOUT_SECONDS)
+            except requests.RequestException as e:
+                error = f"Request failed: {str(e)}"
+            else:
+                if response.status_code == 200:
+                    try:
+                        return response.json().get('id'), None, attempt
+                    except ValueError:
+                        return None, None, attempt
+                error = f"HTTP {response.status_code}: {response.text[:500]}"
+                if response.status_code not in RETRY_STATUSES:
+                    return None, error, attempt
+                retry_after = response.headers.get('Retry-After')
+
+            if attempt < MAX_ATTEMPTS:
+                time.sleep(self._backoff(attempt, retry_after))
+
+        return None, error, MAX_ATTEMPTS
+
+
+def _pending_batches(campaign_id, batch_size):
+    last_id = 0
+    while True:
+        rows = db.session.query(
+            EmailDelivery.id, EmailDelivery.email,
+            EmailDelivery.unique_token).filter(
+                EmailDelivery.campaign_id == campaign_id,
+                EmailDelivery.status == 'pending',
+                EmailDelivery.id > last_id).order_by(
+                    EmailDelivery.id).limit(batch_size).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        yield rows
+
+
+def _record_batch(campaign, delivery_ids, result):
+    message_id, error, attempts = result
+    status = 'failed' if error else 'sent'
+    EmailDelivery.query.filter(EmailDelivery.id.in_(delivery_ids)).update(
+        {
+            'status': status,
+            'attempts': EmailDelivery.attempts + attempts,
+            'message_id': message_id,
+            'error': error
+        },
+        synchronize_session=False)
+    if error:
+        campaign.failed_count += len(delivery_ids)
+        logger.error(f"Campaign {campaign.id}: batch of {len(delivery_ids)} "
+                     f"failed after {attempts} attempts: {error}")
+    else:
+        campaign.sent_count += len(delivery_ids)
+    db.session.commit()
+
+
+def deliver_campaign(campaign_id,
+                     client=None,
+                     workers=DEFAULT_WORKERS,
+                     batch_size=MAILGUN_BATCH_SIZE,
+                     progress=None):
+    """
+    Send a campaign's pending deliveries as batch messages over a bounded
+    thread pool. Worker threads only make HTTP requests; statuses are
+    written from this thread as batches finish, so a rerun after a crash
+    resumes with the recipients still pending.
+
+    Args:
+        campaign_id (int): Campaign to send
+        client (MailgunClient, optional): Defaults to the app's Mailgun config
+        workers (int): Concurrent requests
+        batch_size (int): Recipients per message
+        progress (callable, optional): Called with the campaign after
+            each batch
+
+    Returns:
+        dict: Campaign totals
+    """
+    campaign = EmailCampaign.query.get(campaign_id)
+    if not campaign:
+        raise ValueError(f"Campaign {campaign_id} not found")
+
+    client = client or MailgunClient.from_config(workers)
+    message = {
+        "from": f"Admin <noreply@{client.domain}>",
+        "subject": campaign.subject,
+        "text": campaign.text_body,
+        "html": campaign.html_body
+    }
+
+    campaign.status = 'sending'
+    db.session.commit()
+
+    def settle(futures):
+        for future in futures:
+            delivery_ids = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = (None, f"Unexpected error: {str(e)}", 1)
+            _record_batch(campaign, delivery_ids, result)
+            if progress:
+                progress(campaign)
+
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for rows in _pending_batches(campaign_id, batch_size):
+            recipients = [{
+                'email': row.email,
+                'unique_token': row.unique_token or ''
+            } for row in rows]
+            future = pool.submit(client.send_batch, message, recipients)
+            in_flight[future] = [row.id for row in rows]
+
+            # Keep a bounded number of batches queued behind the workers
+            if len(in_flight) >= workers * 2:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                settle(done)
+
+        settle(list(in_flight))
+
+    campaign.status = 'sent'
+    campaign.completed_at = datetime.utcnow()
+    db.session.commit()
+
+    logger.info(f"Campaign {campaign.id} finished: {campaign.sent_count} sent, "
+                f"{campaign.failed_count} failed")
+    return campaign_summary(campaign)
+
+
+def campaign_summary(campaign):
+    return {
+        "campaign_id": campaign.id,
+        "status": campaign.status,
+        "total": campaign.total_recipients,
+        "sent": campaign.sent_count,
+        "failed": campaign.failed_count,
+        "pending": campaign.total_recipients - campaign.sent_count -
+        campaign.failed_count
+    }
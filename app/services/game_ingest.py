@@ -0,0 +1,173 @@
+from datetime import datetime
+import logging
+from sqlalchemy import and_, or_
+from app.models import db, GameScore, allocate_change_seqs
+from app.utils.stats import apply_games_to_user_stats
+from app.utils.leaderboard import record_game_results
+from app.utils.game_sync import invalidate_sync_buckets
+from app.utils.game_ids import extract_uuid_from_constructed_id, parse_game_id, sync_bucket_for
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Most games accepted in one upload request
+MAX_INGEST_GAMES = 500
+
+
+def _parse_timestamp(value):
+    """Parse an ISO timestamp from the client into a naive UTC datetime"""
+    if not value:
+        return datetime.utcnow()
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+    return parsed
+
+
+def _game_row(user_id, game_data, completed):
+    """
+    Build a GameScore row from either client payload format.
+    /games/batch sends timeTaken/lastUpdateTime/hasWon/hasLost,
+    /games/record sends timeSeconds/completedAt.
+    """
+    game_id = game_data['gameId']
+    if not game_id:
+        raise ValueError("gameId is required")
+
+    created_at = _parse_timestamp(
+        game_data.get('completedAt') or game_data.get('lastUpdateTime'))
+
+    if completed is None:
+        completed = bool(game_data.get('hasWon', False)
+                         or game_data.get('hasLost', False))
+
+    # Core inserts skip the model listeners, so set the derived columns here
+    kind = parse_game_id(game_id)
+    is_daily = kind['is_daily'] or bool(game_data.get('isDaily', False))
+    challenge_date = kind['challenge_date'] or created_at.date()
+
+    return {
+        'user_id': user_id,
+        'game_id': game_id,
+        'game_uuid': extract_uuid_from_constructed_id(game_id),
+        'score': int(game_data.get('score') or 0),
+        'mistakes': int(game_data.get('mistakes') or 0),
+        'time_taken': int(
+            game_data.get('timeTaken', game_data.get('timeSeconds')) or 0),
+        'game_type': 'daily' if is_daily else 'regular',
+        'challenge_date': challenge_date.strftime('%Y-%m-%d'),
+        'difficulty': kind['difficulty'],
+        'is_daily': is_daily,
+        'is_hardcore': kind['is_hardcore'],
+        'sync_bucket': sync_bucket_for(game_id),
+        'completed': completed,
+        'created_at': created_at
+    }
+
+
+def _insert_new_games(rows):
+    """
+    Insert rows in one statement, skipping games that already exist under
+    the same game_id or, for this user, the same game_uuid.
+
+    Returns:
+        set: game_ids that were actually inserted
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(GameScore.__table__).values(rows)
+        stmt = stmt.on_conflict_do_nothing().returning(
+            GameScore.__table__.c.game_id)
+        return {row.game_id for row in db.session.execute(stmt)}
+
+    # Other databases: one IN-list existence check, then a multi-row insert
+    existing = set()
+    for row in db.session.query(GameScore.game_id, GameScore.game_uuid).filter(
+            or_(
+                GameScore.game_id.in_([row['game_id'] for row in rows]),
+                and_(GameScore.user_id == rows[0]['user_id'],
+                     GameScore.game_uuid.in_([
+                         row['game_uuid'] for row in rows if row['game_uuid']
+                     ])))):
+        existing.update((row.game_id, row.game_uuid))
+    new_rows = [
+        row for row in rows if row['game_id'] not in existing
+        and row['game_uuid'] not in existing
+    ]
+    if new_rows:
+        db.session.execute(GameScore.__table__.insert(), new_rows)
+    return {row['game_id'] for row in new_rows}
+
+
+def ingest_games(user_id, games_data, completed=None):
+    """
+    Store a batch of client games with a handful of statements:
+    one conflict-skipping multi-row insert, one stats update, the
+    leaderboard rollup upserts and one sync digest invalidation.
+    The caller commits.
+
+    Args:
+        user_id (str): User ID
+        games_data (list): Game dicts from the client
+        completed (bool, optional): Force the completed flag; derived
+            from hasWon/hasLost when None
+
+    Returns:
+        dict: inserted count, duplicate count and per-game error messages
+    """
+    errors = []
+
+    if len(games_data) > MAX_INGEST_GAMES:
+        errors.append(
+            f"{len(games_data) - MAX_INGEST_GAMES} games over the "
+            f"{MAX_INGEST_GAMES} per-request limit were not processed")
+        games_data = games_data[:MAX_INGEST_GAMES]
+
+    # Validate and de-duplicate within the request
+    rows = {}
+    seen_uuids = set()
+    for game_data in games_data:
+        try:
+            row = _game_row(user_id, game_data, completed)
+            if row['game_id'] in rows or row['game_uuid'] in seen_uuids:
+                continue
+            rows[row['game_id']] = row
+            if row['game_uuid']:
+                seen_uuids.add(row['game_uuid'])
+        except Exception as e:
+            errors.append(
+                f"Game {game_data.get('gameId', 'unknown') if isinstance(game_data, dict) else 'unknown'}: {str(e)}"
+            )
+
+    if not rows:
+        return {'inserted': 0, 'duplicates': 0, 'errors': errors}
+
+    # Core inserts skip set_change_seq, so reserve one sequence block
+    last_seq = allocate_change_seqs(db.session.connection(), user_id,
+                                    len(rows))
+    for offset, row in enumerate(rows.values()):
+        row['change_seq'] = last_seq - len(rows) + 1 + offset
+
+    inserted_ids = _insert_new_games(list(rows.values()))
+    inserted = [GameScore(**rows[game_id]) for game_id in inserted_ids]
+
+    if inserted:
+        invalidate_sync_buckets(user_id,
+                                {game.sync_bucket for game in inserted})
+        apply_games_to_user_stats(user_id, inserted)
+        record_game_results(user_id, [(game.created_at, game.score)
+                                      for game in inserted if game.completed])
+
+    logger.info(
+        f"Ingested {len(inserted)} of {len(rows)} games for user {user_id}")
+
+    return {
+        'inserted': len(inserted),
+        'duplicates': len(rows) - len(inserted),
+        'errors': errors
+    }
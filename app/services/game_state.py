@@ -1,6 +1,8 @@
 from datetime import datetime
 import logging
 from app.models import db, ActiveGameState, AnonymousGameState, GameScore, UserStats
+from app.utils.game_ids import MAX_MISTAKES, parse_game_id
+from app.utils.game_sync import record_tombstones
 import json
 
 # Set up logging
@@ -41,7 +43,7 @@ def get_unified_game_state(identifier, is_anonymous=False):
                 'major_attribution': game.major_attribution,
                 'minor_attribution': game.minor_attribution,
                 'start_time': game.created_at,
-                'difficulty': game.game_id.split('-')[0] if game.game_id else 'medium',
+                'difficulty': parse_game_id(game.game_id)['difficulty'],
             }
 
             # Check game status dynamically for anonymous users too
@@ -79,11 +81,12 @@ def get_unified_game_state(identifier, is_anonymous=False):
                 'correctly_guessed': game.correctly_guessed or [],  # Handle None case
                 'incorrect_guesses': game.incorrect_guesses or {},  # Add this line
                 'mistakes': game.mistakes,
-                'max_mistakes': get_max_mistakes_from_game_id(game.game_id),
+                'max_mistakes': MAX_MISTAKES.get(game.difficulty)
+                or get_max_mistakes_from_game_id(game.game_id),
                 'major_attribution': game.major_attribution,
                 'minor_attribution': game.minor_attribution,
                 'start_time': game.created_at,
-                'difficulty': game.game_id.split('-')[0] if game.game_id else 'medium'
+                'difficulty': game.difficulty or parse_game_id(game.game_id)['difficulty']
             }
 
             # Check game status dynamically (unchanged)
@@ -160,19 +163,16 @@ def save_unified_game_state(identifier, game_state, is_anonymous=False, is_daily
             print("game ids", user_id, game_id)
             # Determine if this is a daily challenge if not explicitly specified
             if is_daily is None and game_id:
-                is_daily = 'daily' in game_id
-
-            # Delete previous games based on type
-            if is_daily:
-                # Only delete previous daily games
-                ActiveGameState.query.filter(
-                    ActiveGameState.user_id == user_id,
-                    ActiveGameState.game_id.like('%daily%')).delete()
-            else:
-                # Delete previous non-daily games
-                ActiveGameState.query.filter(
-                    ActiveGameState.user_id == user_id,
-                    ~ActiveGameState.game_id.like('%daily%')).delete()
+                is_daily = parse_game_id(game_id)['is_daily']
+
+            # Delete previous games of the same type
+            previous_games = ActiveGameState.query.filter(
+                ActiveGameState.user_id == user_id,
+                ActiveGameState.is_daily == bool(is_daily))
+            record_tombstones(
+                user_id, [row.game_id for row in previous_games.with_entities(
+                    ActiveGameState.game_id)])
+            previous_games.delete()
 
             db.session.commit()
 
@@ -242,14 +242,9 @@ def abandon_game(user_id, is_daily=False):
     """
     try:
         # Get the active game based on type
-        if is_daily:
-            active_game = ActiveGameState.query.filter(
-                ActiveGameState.user_id == user_id,
-                ActiveGameState.game_id.like('%daily%')).first()
-        else:
-            active_game = ActiveGameState.query.filter(
-                ActiveGameState.user_id == user_id,
-                ~ActiveGameState.game_id.like('%daily%')).first()
+        active_game = ActiveGameState.query.filter(
+            ActiveGameState.user_id == user_id,
+            ActiveGameState.is_daily == bool(is_daily)).first()
 
         if not active_game:
             logger.warning(
@@ -296,19 +291,7 @@ def get_max_mistakes_from_game_id(game_id):
     Returns:
         int: Maximum number of mistakes allowed
     """
-    # Default to medium difficulty
-    difficulty = 'medium'
-
-    # Extract difficulty from game_id if possible
-    if game_id and '-' in game_id:
-        parts = game_id.split('-')
-        if parts[0] in ['easy', 'medium', 'hard']:
-            difficulty = parts[0]
-
-    # Difficulty settings
-    difficulty_settings = {'easy': 8, 'medium': 5, 'hard': 3}
-
-    return difficulty_settings.get(difficulty, 5)  # Default to medium (6)
+    return MAX_MISTAKES[parse_game_id(game_id)['difficulty']]
 
 
 def calculate_game_score(game_state, time_taken):
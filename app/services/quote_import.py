@@ -0,0 +1,214 @@
+import csv
+import io
+import logging
+import uuid
+from pathlib import Path
+from flask import current_app
+from sqlalchemy import func
+from app.models import db, Quote, Backdoor
+from app.services.daily_scheduler import MAX_DAILY_TEXT_LENGTH
+from app.services.quote_search import rebuild_search_index
+from app.utils.quote_text import fix_encoding, text_hash
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rows validated, deduplicated and inserted per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# Uploads larger than this are imported by a Celery task
+BACKGROUND_IMPORT_BYTES = 1024 * 1024
+
+# Row errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def _validate(text, author, minor_attribution):
+    if '\ufffd' in text or '\ufffd' in author:
+        return "Not valid UTF-8"
+    if not text:
+        return "Missing text"
+    if not author:
+        return "Missing author"
+    if len(author) > 255:
+        return "Author is longer than 255 characters"
+    if len(minor_attribution) > 255:
+        return "Minor attribution is longer than 255 characters"
+    if not any(char.isalpha() for char in text):
+        return "Text has no letters"
+    return None
+
+
+def _existing_hashes(model, hashes):
+    return {
+        value
+        for (value, ) in db.session.query(model.text_hash).filter(
+            model.text_hash.in_(hashes))
+    }
+
+
+def import_quotes_csv(stream,
+                      model=Quote,
+                      replace_existing=False,
+                      batch_size=IMPORT_BATCH_SIZE,
+                      progress=None):
+    """
+    Import quotes from a CSV byte stream without loading it into memory.
+
+    Rows need a column ending in 'text' and an 'author' column, with an
+    optional 'minor_attribution'. Text is repaired with ENCODING_REPLACEMENTS,
+    and rows whose normalized text is already stored or appears earlier in
+    the file are skipped. Inserts bypass the ORM and commit per batch.
+
+    Args:
+        stream: Binary file object with the CSV
+        model: Quote or Backdoor
+        replace_existing (bool): Delete all existing rows first
+        batch_size (int): Rows per insert and commit
+        progress (callable, optional): Called with the report after each batch
+
+    Returns:
+        dict: Counts of rows, imported, duplicates and invalid rows, plus
+            the first MAX_REPORTED_ERRORS row errors
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    reader = csv.DictReader(
+        io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace',
+                         newline=''))
+    fieldnames = reader.fieldnames or []
+    text_field = next(
+        (field for field in fieldnames if field.endswith('text')), None)
+    missing = [
+        name for name, present in (('text', text_field), ('author', 'author'
+                                                          in fieldnames))
+        if not present
+    ]
+    if fieldnames and missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    report = {
+        'rows': 0,
+        'imported': 0,
+        'duplicates': 0,
+        'invalid': 0,
+        'daily_eligible': 0,
+        'errors': []
+    }
+    if not fieldnames:
+        return report
+
+    # Only rows added by this import need indexing for search
+    last_id = None if replace_existing else db.session.query(
+        func.max(model.id)).scalar()
+    if replace_existing:
+        db.session.query(model).delete(synchronize_session=False)
+
+    seen = set()
+    batch = []
+
+    def flush():
+        existing = _existing_hashes(model, [row['text_hash'] for row in batch])
+        records = [row for row in batch if row['text_hash'] not in existing]
+        report['duplicates'] += len(batch) - len(records)
+        if records:
+            db.session.execute(model.__table__.insert(), records)
+        db.session.commit()
+        report['imported'] += len(records)
+        report['daily_eligible'] += sum(
+            1 for row in records if len(row['text']) <= MAX_DAILY_TEXT_LENGTH)
+        batch.clear()
+        if progress:
+            progress(report)
+
+    for row in reader:
+        report['rows'] += 1
+        text = fix_encoding((row.get(text_field) or '').strip())
+        author = fix_encoding((row.get('author') or '').strip())
+        minor_attribution = fix_encoding(
+            (row.get('minor_attribution') or '').strip())
+
+        error = _validate(text, author, minor_attribution)
+        if error:
+            report['invalid'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({
+                    'line': reader.line_num,
+                    'error': error
+                })
+            continue
+
+        digest = text_hash(text)
+        if digest in seen:
+            report['duplicates'] += 1
+            continue
+        seen.add(digest)
+
+        batch.append({
+            'text': text,
+            'author': author,
+            'minor_attribution': minor_attribution,
+            'unique_letters': model._count_unique_letters(text),
+            'text_hash': digest,
+            'active': True
+        })
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+
+    if model is Quote:
+        rebuild_search_index(after_id=last_id)
+
+    logger.info(
+        f"Imported {report['imported']} of {report['rows']} rows into "
+        f"{model.__tablename__} ({report['duplicates']} duplicates, "
+        f"{report['invalid']} invalid)")
+    return report
+
+
+def describe_import(report):
+    """One-line summary of an import report for the admin page"""
+    summary = (f"Imported {report['imported']} of {report['rows']} quotes; "
+               f"skipped {report['duplicates']} duplicates")
+    if report['invalid']:
+        shown = '; '.join(f"line {error['line']}: {error['error']}"
+                          for error in report['errors'][:3])
+        summary += f" and {report['invalid']} invalid rows ({shown})"
+    return summary
+
+
+def import_dir():
+    """Directory for uploads waiting for a background import"""
+    path = Path(current_app.root_path) / 'imports'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def queue_quote_import(file, is_backdoor, replace_existing):
+    """
+    Save an upload and queue its import.
+
+    Returns:
+        str: Celery task ID
+    """
+    from app.celery_worker import import_quotes_task
+
+    path = import_dir() / f"{uuid.uuid4()}.csv"
+    file.save(path)
+    task = import_quotes_task.delay(path.name, is_backdoor, replace_existing)
+    return task.id
+
+
+def import_queued_file(name, is_backdoor, replace_existing, progress=None):
+    """Import a file saved by queue_quote_import, then delete it"""
+    path = import_dir() / name
+    try:
+        with path.open('rb') as stream:
+            return import_quotes_csv(stream,
+                                     Backdoor if is_backdoor else Quote,
+                                     replace_existing,
+                                     progress=progress)
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,140 @@
+import json
+import logging
+import re
+from redis.exceptions import RedisError
+from sqlalchemy import column, event, literal_column, table
+from sqlalchemy.orm import Session
+from app.models import db, Quote
+from app.utils.redis_client import get_redis
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+AUTHORS_CACHE_KEY = 'quotes:authors'
+
+# Changes invalidate the list; the TTL only bounds a missed invalidation
+AUTHORS_CACHE_TTL_SECONDS = 3600
+
+# FTS5 table kept in sync by the Quote listeners in app/models.py
+quote_fts = table('quote_fts', column('rowid'))
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Words of a free-text query, lowercased; punctuation is dropped"""
+    return [term.lower() for term in _TERM.findall(query or '')]
+
+
+def _tsquery(terms):
+    # Every term must match, the last one as a prefix while it is typed
+    return ' & '.join(terms[:-1] + [terms[-1] + ':*'])
+
+
+def _fts5_query(terms):
+    return ' '.join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+
+
+def search_quotes(query, author=None):
+    """
+    Query for quotes matching a free-text search, best matches first.
+
+    Args:
+        query (str): Words to find in the text or author; the last word
+            also matches as a prefix
+        author (str, optional): Exact author to restrict results to
+
+    Returns:
+        Query: Quote query, ordered by rank when searching
+    """
+    quotes = Quote.query
+    if author:
+        quotes = quotes.filter(Quote.author == author)
+
+    terms = search_terms(query)
+    if not terms:
+        return quotes.order_by(Quote.id)
+
+    if db.engine.dialect.name == 'postgresql':
+        tsquery = db.func.to_tsquery(Quote.SEARCH_CONFIG, _tsquery(terms))
+        return quotes.filter(Quote.search_vector.op('@@')(tsquery)).order_by(
+            db.func.ts_rank(Quote.search_vector, tsquery).desc(), Quote.id)
+
+    # bm25 with author matches weighted as on Postgres; lower is better
+    fts = literal_column('quote_fts')
+    return quotes.join(quote_fts, quote_fts.c.rowid == Quote.id).filter(
+        fts.op('MATCH')(_fts5_query(terms))).order_by(
+            db.func.bm25(fts, 1.0, 2.0), Quote.id)
+
+
+def rebuild_search_index(after_id=None):
+    """
+    Reindex quotes written without the ORM, e.g. by bulk inserts or deletes.
+
+    Args:
+        after_id (int, optional): Only index quotes with a higher ID;
+            None reindexes every quote
+    """
+    if db.engine.dialect.name == 'postgresql':
+        update = Quote.__table__.update().values(
+            search_vector=Quote.search_document(Quote.text, Quote.author),
+            updated_at=Quote.updated_at)
+        if after_id is not None:
+            update = update.where(Quote.id > after_id)
+        db.session.execute(update)
+    else:
+        params = {'after_id': -1 if after_id is None else after_id}
+        db.session.execute(
+            db.text('DELETE FROM quote_fts WHERE rowid > :after_id'), params)
+        db.session.execute(
+            db.text('INSERT INTO quote_fts (rowid, text, author) '
+                    'SELECT id, text, author FROM quote WHERE id > :after_id'),
+            params)
+    db.session.commit()
+    invalidate_author_facet()
+
+
+def _load_authors():
+    return [
+        author for (author, ) in db.session.query(Quote.author).distinct().
+        order_by(Quote.author)
+    ]
+
+
+def get_author_facet():
+    """Sorted distinct authors for the filter dropdown, cached in Redis"""
+    try:
+        cached = get_redis().get(AUTHORS_CACHE_KEY)
+        if cached:
+            return json.loads(cached)
+    except RedisError as e:
+        logger.warning(f"Author list cache unavailable: {str(e)}")
+        return _load_authors()
+
+    authors = _load_authors()
+    try:
+        get_redis().setex(AUTHORS_CACHE_KEY, AUTHORS_CACHE_TTL_SECONDS,
+                          json.dumps(authors))
+    except RedisError as e:
+        logger.warning(f"Could not cache author list: {str(e)}")
+    return authors
+
+
+def invalidate_author_facet():
+    try:
+        get_redis().delete(AUTHORS_CACHE_KEY)
+    except RedisError as e:
+        logger.warning(f"Could not invalidate author list: {str(e)}")
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_authors_after_commit(session):
+    # Flagged by the Quote listeners; dropped only once the change is
+    # visible so a concurrent reader cannot re-cache the old list
+    if session.info.pop('quote_authors_changed', False):
+        invalidate_author_facet()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_authors_flag(session):
+    session.info.pop('quote_authors_changed', None)
@@ -0,0 +1,154 @@
+import gzip
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from flask import current_app
+from app.models import db, User, UserStats, GameScore, DailyCompletion, PromoRedemption
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while streaming an export
+EXPORT_YIELD_PER = 1000
+
+# Background export files are removed after this long
+EXPORT_RETENTION_HOURS = 24
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _user_info(user):
+    return {
+        "user_id": user.user_id,
+        "username": user.username,
+        "email": user.email,
+        "created_at": _isoformat(user.created_at),
+        "email_consent": user.email_consent,
+        "consent_date": _isoformat(user.consent_date)
+    }
+
+
+def _stats_info(user_stats):
+    if not user_stats:
+        return {}
+    return {
+        "current_streak": user_stats.current_streak,
+        "max_streak": user_stats.max_streak,
+        "current_noloss_streak": user_stats.current_noloss_streak,
+        "max_noloss_streak": user_stats.max_noloss_streak,
+        "total_games_played": user_stats.total_games_played,
+        "games_won": user_stats.games_won,
+        "cumulative_score": user_stats.cumulative_score,
+        "highest_weekly_score": user_stats.highest_weekly_score,
+        "last_played_date": _isoformat(user_stats.last_played_date)
+    }
+
+
+# (key, model, query columns, row -> dict) for each exported history section
+EXPORT_SECTIONS = (
+    ("game_history", GameScore,
+     (GameScore.game_id, GameScore.score, GameScore.mistakes,
+      GameScore.time_taken, GameScore.game_type, GameScore.challenge_date,
+      GameScore.completed, GameScore.created_at, GameScore.id),
+     lambda row: {
+         "game_id": row.game_id,
+         "score": row.score,
+         "mistakes": row.mistakes,
+         "time_taken": row.time_taken,
+         "game_type": row.game_type,
+         "challenge_date": row.challenge_date,
+         "completed": row.completed,
+         "created_at": _isoformat(row.created_at)
+     }),
+    ("daily_completions", DailyCompletion,
+     (DailyCompletion.quote_id, DailyCompletion.challenge_date,
+      DailyCompletion.completed_at, DailyCompletion.score,
+      DailyCompletion.mistakes, DailyCompletion.time_taken,
+      DailyCompletion.id),
+     lambda row: {
+         "quote_id": row.quote_id,
+         "challenge_date": _isoformat(row.challenge_date),
+         "completed_at": _isoformat(row.completed_at),
+         "score": row.score,
+         "mistakes": row.mistakes,
+         "time_taken": row.time_taken
+     }),
+    ("promo_redemptions", PromoRedemption,
+     (PromoRedemption.code, PromoRedemption.type, PromoRedemption.redeemed_at,
+      PromoRedemption.expires_at, PromoRedemption.value, PromoRedemption.id),
+     lambda row: {
+         "code": row.code,
+         "type": row.type,
+         "redeemed_at": _isoformat(row.redeemed_at),
+         "expires_at": _isoformat(row.expires_at),
+         "value": row.value
+     }))
+
+
+def iter_user_export(user):
+    """
+    Generate a user's data export as JSON text chunks. History rows are
+    read with a yield_per cursor and written one at a time, so memory use
+    does not depend on how much history the user has.
+    """
+    yield '{"user_info":' + json.dumps(_user_info(user))
+    yield ',"stats":' + json.dumps(
+        _stats_info(UserStats.query.filter_by(user_id=user.user_id).first()))
+
+    for key, model, columns, to_dict in EXPORT_SECTIONS:
+        rows = db.session.execute(
+            db.select(*columns).where(model.user_id == user.user_id).order_by(
+                columns[-1]).execution_options(yield_per=EXPORT_YIELD_PER))
+
+        yield f',"{key}":['
+        separator = ''
+        for row in rows:
+            yield separator + json.dumps(to_dict(row))
+            separator = ','
+        yield ']'
+
+    yield '}'
+
+
+def export_dir():
+    """Directory for background export files, created on first use"""
+    path = Path(current_app.root_path) / 'exports'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def write_user_export(user_id, name):
+    """
+    Write a gzip-compressed export file for a background export.
+
+    Returns:
+        Path: The finished file
+    """
+    user = User.query.get(user_id)
+    if not user:
+        raise ValueError(f"User {user_id} not found")
+
+    path = export_dir() / f"{name}.json.gz"
+    partial = path.with_suffix('.partial')
+    with gzip.open(partial, 'wt', encoding='utf-8') as f:
+        for chunk in iter_user_export(user):
+            f.write(chunk)
+    os.replace(partial, path)
+
+    logger.info(f"Wrote data export for user {user_id} to {path.name}")
+    return path
+
+
+def cleanup_user_exports(retention_hours=EXPORT_RETENTION_HOURS):
+    """Delete export files older than the retention period"""
+    cutoff = time.time() - retention_hours * 3600
+    removed = 0
+    for path in export_dir().iterdir():
+        if path.is_file() and path.stat().st_mtime < cutoff:
+            path.unlink()
+            removed += 1
+    return removed
@@ -0,0 +1,145 @@
+import base64
+import logging
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func, select, tuple_
+from app.models import db, User, GameScore
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Queries shorter than this cannot use trigrams and scan instead
+NGRAM = 3
+
+# How long the in-process index is used before it is rebuilt
+LOCAL_INDEX_TTL_SECONDS = 300
+
+
+def encode_cursor(user):
+    """Opaque keyset cursor for the position after user"""
+    raw = f"{user.created_at.isoformat()}|{user.user_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """(created_at, user_id) from a cursor, or None if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created_at, user_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), user_id
+    except (ValueError, UnicodeError):
+        return None
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class LocalUserIndex:
+    """
+    In-process trigram index over usernames and emails, for databases
+    without pg_trgm. Rows are kept newest first, matching the list order,
+    and each trigram maps to the ascending row positions containing it.
+    """
+
+    def __init__(self, ttl=LOCAL_INDEX_TTL_SECONDS):
+        self.ttl = ttl
+        self._built_at = 0
+        self._rows = []
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    def _build(self):
+        rows = db.session.query(
+            User.created_at, User.user_id, func.lower(User.username),
+            func.lower(User.email)).order_by(User.created_at.desc(),
+                                             User.user_id.desc()).all()
+        postings = {}
+        for position, (_, _, username, email) in enumerate(rows):
+            for gram in _ngrams(username or '') | _ngrams(email or ''):
+                postings.setdefault(gram, []).append(position)
+        self._rows, self._postings = rows, postings
+        self._built_at = time.monotonic()
+        logger.info(f"Built local user search index over {len(rows)} users")
+
+    def invalidate(self):
+        self._built_at = 0
+
+    def search(self, query, after=None, limit=10):
+        """
+        IDs of users whose username or email contains query, newest first.
+
+        Args:
+            query (str): Substring to find, case-insensitive
+            after (tuple, optional): (created_at, user_id) keyset position
+            limit (int): Maximum IDs returned
+        """
+        with self._lock:
+            if time.monotonic() - self._built_at > self.ttl:
+                self._build()
+            rows, postings = self._rows, self._postings
+
+        needle = query.lower()
+        grams = _ngrams(needle)
+        if grams:
+            lists = sorted((postings.get(gram, []) for gram in grams), key=len)
+            candidates = set(lists[0]).intersection(*lists[1:])
+            positions = sorted(candidates)
+        else:
+            positions = range(len(rows))
+
+        matches = []
+        for position in positions:
+            created_at, user_id, username, email = rows[position]
+            if after and (created_at, user_id) >= after:
+                continue
+            if needle in (username or '') or needle in (email or ''):
+                matches.append(user_id)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
+local_index = LocalUserIndex()
+
+
+def _uses_trigram_index():
+    return db.engine.dialect.name == 'postgresql'
+
+
+def list_users(search=None, cursor=None, per_page=10):
+    """
+    One page of users, newest first, with their game counts.
+
+    Args:
+        search (str, optional): Substring of the username or email
+        cursor (str, optional): Cursor from a previous page
+        per_page (int): Users per page
+
+    Returns:
+        tuple: (list of (User, game count), cursor for the next page or None)
+    """
+    after = decode_cursor(cursor) if cursor else None
+    games_count = select(func.count(GameScore.id)).where(
+        GameScore.user_id == User.user_id).scalar_subquery()
+    query = db.session.query(User, games_count)
+
+    if search and not _uses_trigram_index():
+        ids = local_index.search(search, after, per_page + 1)
+        query = query.filter(User.user_id.in_(ids))
+    else:
+        if search:
+            # Served by the pg_trgm GIN indexes on username and email
+            query = query.filter(
+                User.username.icontains(search, autoescape=True)
+                | User.email.icontains(search, autoescape=True))
+        if after:
+            query = query.filter(tuple_(User.created_at, User.user_id) < after)
+
+    rows = query.order_by(User.created_at.desc(),
+                          User.user_id.desc()).limit(per_page + 1).all()
+
+    next_cursor = encode_cursor(rows[per_page - 1][0]) if len(
+        rows) > per_page else None
+    return rows[:per_page], next_cursor
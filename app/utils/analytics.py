@@ -0,0 +1,201 @@
+from datetime import date, datetime, timedelta
+from sqlalchemy import case, insert, select
+from app.models import (db, User, GameScore, DailyCompletion, Quote,
+                        DailySignupFact, DailyGameFact, DailyQuoteFact,
+                        AnalyticsWatermark)
+import logging
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = 'daily_facts'
+
+# Days before the watermark rebuilt on every run, for games synced late
+LATE_DATA_DAYS = 2
+
+# Days rebuilt per transaction on the first run
+CHUNK_DAYS = 30
+
+# Ranges longer than this are charted by week instead of by day
+DAILY_CHART_MAX_DAYS = 90
+
+POPULAR_QUOTES_LIMIT = 5
+
+
+def _day_start(day):
+    return datetime.combine(day, datetime.min.time())
+
+
+def _as_date(value):
+    # SQLite returns aggregated dates as strings
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def rebuild_daily_facts(start_day, end_day):
+    """Recompute all fact tables for days in [start_day, end_day)"""
+    start, end = _day_start(start_day), _day_start(end_day)
+
+    for model in (DailySignupFact, DailyGameFact, DailyQuoteFact):
+        db.session.query(model).filter(model.day >= start_day,
+                                       model.day < end_day).delete(
+                                           synchronize_session=False)
+
+    signup_day = db.func.date(User.created_at)
+    db.session.execute(
+        insert(DailySignupFact).from_select(
+            ['day', 'signups'],
+            select(signup_day, db.func.count()).where(
+                User.created_at >= start,
+                User.created_at < end).group_by(signup_day)))
+
+    game_day = db.func.date(GameScore.created_at)
+    difficulty = db.func.coalesce(GameScore.difficulty, 'unknown')
+    game_type = db.func.coalesce(GameScore.game_type, 'regular')
+    db.session.execute(
+        insert(DailyGameFact).from_select(
+            [
+                'day', 'difficulty', 'game_type', 'games_played',
+                'games_completed', 'completed_time'
+            ],
+            select(
+                game_day, difficulty, game_type, db.func.count(),
+                db.func.sum(case((GameScore.completed == True, 1), else_=0)),
+                db.func.sum(
+                    case((GameScore.completed == True,
+                          db.func.coalesce(GameScore.time_taken, 0)),
+                         else_=0))).where(
+                             GameScore.created_at >= start,
+                             GameScore.created_at < end).group_by(
+                                 game_day, difficulty, game_type)))
+
+    completion_day = db.func.date(DailyCompletion.completed_at)
+    db.session.execute(
+        insert(DailyQuoteFact).from_select(
+            ['day', 'quote_id', 'completions'],
+            select(completion_day, DailyCompletion.quote_id,
+                   db.func.count()).where(
+                       DailyCompletion.completed_at >= start,
+                       DailyCompletion.completed_at < end).group_by(
+                           completion_day, DailyCompletion.quote_id)))
+
+
+def _first_activity_day():
+    """Earliest day with any signup, game or daily completion"""
+    firsts = [
+        db.session.query(db.func.min(column)).scalar()
+        for column in (User.created_at, GameScore.created_at,
+                       DailyCompletion.completed_at)
+    ]
+    firsts = [value for value in firsts if value]
+    return min(firsts).date() if firsts else None
+
+
+def update_daily_facts(late_days=LATE_DATA_DAYS):
+    """
+    Bring the fact tables up to yesterday, processing only days after the
+    watermark plus a few trailing days for late data. Commits per chunk.
+
+    Returns:
+        int: Number of days processed
+    """
+    end_day = datetime.utcnow().date()
+    watermark = AnalyticsWatermark.query.get(WATERMARK_NAME)
+
+    if watermark:
+        start_day = watermark.last_day + timedelta(days=1 - late_days)
+    else:
+        start_day = _first_activity_day() or end_day
+        watermark = AnalyticsWatermark(name=WATERMARK_NAME,
+                                       last_day=start_day - timedelta(days=1))
+        db.session.add(watermark)
+
+    chunk_start = start_day
+    while chunk_start < end_day:
+        chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS), end_day)
+        rebuild_daily_facts(chunk_start, chunk_end)
+        watermark.last_day = max(watermark.last_day,
+                                 chunk_end - timedelta(days=1))
+        db.session.commit()
+        logger.info(f"Rebuilt analytics facts {chunk_start} to {chunk_end}")
+        chunk_start = chunk_end
+
+    db.session.commit()
+    return max((end_day - start_day).days, 0)
+
+
+def _range_filter(model, start_day, end_day):
+    filters = [model.day < end_day]
+    if start_day:
+        filters.append(model.day >= start_day)
+    return filters
+
+
+def get_game_totals(start_day, end_day):
+    """
+    Sum game facts over [start_day, end_day); start_day None means all time.
+
+    Returns:
+        tuple: (games played, games completed, completed seconds)
+    """
+    row = db.session.query(
+        db.func.coalesce(db.func.sum(DailyGameFact.games_played), 0),
+        db.func.coalesce(db.func.sum(DailyGameFact.games_completed), 0),
+        db.func.coalesce(db.func.sum(DailyGameFact.completed_time),
+                         0)).filter(*_range_filter(DailyGameFact, start_day,
+                                                   end_day)).one()
+    return int(row[0]), int(row[1]), int(row[2])
+
+
+def get_signup_total(start_day, end_day):
+    return int(
+        db.session.query(
+            db.func.coalesce(db.func.sum(DailySignupFact.signups), 0)).filter(
+                *_range_filter(DailySignupFact, start_day, end_day)).scalar())
+
+
+def get_user_growth(start_day, end_day):
+    """Signups per day, or per week for long ranges"""
+    rows = db.session.query(DailySignupFact.day, DailySignupFact.signups).filter(
+        *_range_filter(DailySignupFact, start_day, end_day)).order_by(
+            DailySignupFact.day)
+
+    weekly = start_day is None or (end_day - start_day).days > DAILY_CHART_MAX_DAYS
+    buckets = {}
+    for day, signups in rows:
+        day = _as_date(day)
+        if weekly:
+            day -= timedelta(days=day.weekday())
+        buckets[day] = buckets.get(day, 0) + signups
+
+    return [{
+        "date": day.isoformat(),
+        "count": count
+    } for day, count in sorted(buckets.items())]
+
+
+def get_difficulty_distribution(start_day, end_day):
+    """Games played per difficulty"""
+    rows = db.session.query(
+        DailyGameFact.difficulty,
+        db.func.sum(DailyGameFact.games_played)).filter(
+            *_range_filter(DailyGameFact, start_day, end_day)).group_by(
+                DailyGameFact.difficulty).order_by(DailyGameFact.difficulty)
+    return [{
+        "difficulty": difficulty.capitalize(),
+        "count": int(count)
+    } for difficulty, count in rows]
+
+
+def get_popular_quotes(start_day, end_day, limit=POPULAR_QUOTES_LIMIT):
+    """Quotes with the most daily challenge completions"""
+    total = db.func.sum(DailyQuoteFact.completions)
+    rows = db.session.query(
+        Quote.text, Quote.author, total).join(
+            Quote, Quote.id == DailyQuoteFact.quote_id).filter(
+                *_range_filter(DailyQuoteFact, start_day, end_day)).group_by(
+                    Quote.id, Quote.text, Quote.author).order_by(
+                        total.desc()).limit(limit)
+    return [{
+        "quote": text,
+        "author": author,
+        "count": int(count)
+    } for text, author, count in rows]
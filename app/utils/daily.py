@@ -0,0 +1,57 @@
+import threading
+import time
+from app.models import db, Quote, DailyCompletion
+
+# How long a worker trusts its cached first daily date before re-reading it.
+# Other workers pick up a repopulation within this window.
+FIRST_DAILY_TTL_SECONDS = 3600
+
+_first_daily_lock = threading.Lock()
+_first_daily_cache = {"value": None, "expires_at": 0.0}
+
+
+def get_first_daily_date():
+    """Get the earliest scheduled daily date, cached per process"""
+    now = time.monotonic()
+    if _first_daily_cache["expires_at"] > now:
+        return _first_daily_cache["value"]
+
+    with _first_daily_lock:
+        if _first_daily_cache["expires_at"] > now:
+            return _first_daily_cache["value"]
+
+        first_date = db.session.query(db.func.min(Quote.daily_date)).scalar()
+
+        _first_daily_cache["value"] = first_date
+        _first_daily_cache["expires_at"] = now + FIRST_DAILY_TTL_SECONDS
+        return first_date
+
+
+def invalidate_first_daily_date():
+    """Drop the cached first daily date after daily dates are reassigned"""
+    with _first_daily_lock:
+        _first_daily_cache["value"] = None
+        _first_daily_cache["expires_at"] = 0.0
+
+
+def get_completion_summaries(user_id, order_by, limit):
+    """
+    Get a user's daily completions as response dicts, fetching only the needed columns.
+
+    Args:
+        user_id (str): User ID
+        order_by: SQLAlchemy ordering clause
+        limit (int): Maximum rows to return
+    """
+    rows = db.session.query(DailyCompletion.challenge_date,
+                            DailyCompletion.score, DailyCompletion.mistakes,
+                            DailyCompletion.time_taken).filter(
+                                DailyCompletion.user_id == user_id).order_by(
+                                    order_by).limit(limit).all()
+
+    return [{
+        "date": row.challenge_date.isoformat(),
+        "score": row.score,
+        "mistakes": row.mistakes,
+        "time_taken": row.time_taken
+    } for row in rows]
@@ -0,0 +1,107 @@
+import calendar
+import hashlib
+import re
+from datetime import date
+
+UUID_PATTERN = re.compile(
+    r'([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})'
+)
+NO_DASH_UUID_PATTERN = re.compile(r'([0-9a-fA-F]{32})')
+
+
+def extract_uuid_from_constructed_id(game_id):
+    """
+    Extract the normalized (uppercase) UUID from a game ID.
+    Handles formats like:
+    - easy-daily-2025-04-19-[UUID]
+    - medium-hardcore-[UUID]
+    - hard-[UUID]
+    - [UUID] (raw UUID)
+    - UUIDs with the dashes stripped
+
+    Returns:
+        str: Uppercase dashed UUID, or None if the ID contains no UUID
+    """
+    if not game_id:
+        return None
+
+    match = UUID_PATTERN.search(game_id)
+    if match:
+        return match.group(1).upper()
+
+    # Dashes sometimes get stripped; convert back to standard UUID format
+    no_dash_match = NO_DASH_UUID_PATTERN.search(game_id)
+    if no_dash_match:
+        uuid_str = no_dash_match.group(1).upper()
+        return f"{uuid_str[:8]}-{uuid_str[8:12]}-{uuid_str[12:16]}-{uuid_str[16:20]}-{uuid_str[20:]}"
+
+    return None
+
+
+# Maximum mistakes allowed per difficulty
+MAX_MISTAKES = {'easy': 8, 'medium': 5, 'hard': 3}
+
+
+def parse_game_id(game_id):
+    """
+    Derive the game kind from a constructed game ID.
+    Formats: difficulty-[UUID], difficulty-hardcore-[UUID],
+    easy-daily-YYYY-MM-DD-[UUID]
+
+    Returns:
+        dict: difficulty, is_daily, is_hardcore and challenge_date (date or None)
+    """
+    kind = {
+        'difficulty': 'medium',
+        'is_daily': False,
+        'is_hardcore': False,
+        'challenge_date': None
+    }
+    if not game_id:
+        return kind
+
+    parts = game_id.split('-')
+    if parts[0] in MAX_MISTAKES:
+        kind['difficulty'] = parts[0]
+
+    if len(parts) > 1 and parts[1] == 'hardcore':
+        kind['is_hardcore'] = True
+    elif 'daily' in game_id:
+        kind['is_daily'] = True
+        if len(parts) >= 5 and parts[1] == 'daily':
+            try:
+                kind['challenge_date'] = date(int(parts[2]), int(parts[3]),
+                                              int(parts[4]))
+            except ValueError:
+                pass
+
+    return kind
+
+
+# Digest sync splits each user's games into this many hash buckets
+SYNC_BUCKET_COUNT = 256
+EMPTY_SYNC_DIGEST = '0' * 16
+
+
+def sync_bucket_for(game_id):
+    """
+    Get the sync bucket for a game ID: the first byte of the SHA-1 of the
+    UTF-8 game ID, so clients can compute the same bucket locally.
+    """
+    return hashlib.sha1(game_id.encode('utf-8')).digest()[0]
+
+
+def game_sync_hash(game_id, score, completed, last_modified):
+    """
+    Hash the synced fields of one game into a 64-bit integer.
+    Input is "game_id|score|1 or 0|last modified epoch seconds" and the
+    result is the first 16 hex digits of its SHA-1. A bucket digest is the
+    XOR of its games' hashes, so it does not depend on row order.
+
+    Args:
+        last_modified (datetime): Naive UTC timestamp (GameScore.created_at)
+    """
+    epoch = calendar.timegm(
+        last_modified.utctimetuple()) if last_modified else 0
+    payload = f"{game_id}|{score or 0}|{1 if completed else 0}|{epoch}"
+    return int(hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16], 16)
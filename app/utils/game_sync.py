@@ -0,0 +1,321 @@
+import calendar
+import logging
+from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import (db, GameScore, ActiveGameState, GameSyncBucket,
+                        GameTombstone, UserSyncState, allocate_change_seqs)
+from app.utils.game_ids import (SYNC_BUCKET_COUNT, EMPTY_SYNC_DIGEST,
+                                game_sync_hash, sync_bucket_for)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Most changes returned by one cursor sync; the client pages with hasMore
+MAX_SYNC_CHANGES = 1000
+
+
+def invalidate_sync_buckets(user_id, buckets):
+    """
+    Drop cached bucket digests for writes that skip the model listeners
+    (Core inserts and query-level deletes). The caller commits.
+    """
+    buckets = set(buckets)
+    if not buckets:
+        return
+    GameSyncBucket.query.filter(GameSyncBucket.user_id == user_id,
+                                GameSyncBucket.bucket.in_(buckets)).delete(
+                                    synchronize_session=False)
+
+
+def _load_bucket_games(user_id, buckets):
+    """Get the synced fields of the user's games in the given buckets"""
+    query = db.session.query(GameScore.game_id, GameScore.score,
+                             GameScore.completed, GameScore.created_at,
+                             GameScore.sync_bucket).filter(
+                                 GameScore.user_id == user_id)
+    if len(buckets) < SYNC_BUCKET_COUNT:
+        query = query.filter(GameScore.sync_bucket.in_(buckets))
+
+    games = {bucket: [] for bucket in buckets}
+    for row in query:
+        if row.sync_bucket in games:
+            games[row.sync_bucket].append(row)
+    return games
+
+
+def _cache_digests(user_id, digests, built_seq):
+    """
+    Store rebuilt digests in their own transaction, so caching never
+    commits the request's session. A row is only replaced by a digest
+    computed from the same or a newer change sequence.
+    """
+    table = GameSyncBucket.__table__
+    rows = [{
+        'user_id': user_id,
+        'bucket': bucket,
+        'digest': digest,
+        'game_count': count,
+        'built_seq': built_seq
+    } for bucket, (digest, count) in digests.items()]
+
+    try:
+        with db.engine.begin() as connection:
+            if connection.dialect.name == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(table)
+            connection.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=['user_id', 'bucket'],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in ('digest', 'game_count', 'built_seq')
+                    },
+                    where=table.c.built_seq <= stmt.excluded.built_seq), rows)
+    except SQLAlchemyError as e:
+        # The digests are still correct for this request; the next sync
+        # rebuilds them
+        logger.warning(
+            f"Could not cache sync buckets for user {user_id}: {str(e)}")
+
+
+def _rebuild_buckets(user_id, buckets):
+    """
+    Recompute the digests of stale buckets with one indexed query and
+    cache them. Returns the digests and the rows that were read.
+    """
+    # Read before the games: any write the query misses gets a later
+    # sequence number, which marks the cached digest stale on read
+    built_seq = current_sync_cursor(user_id)
+    games = _load_bucket_games(user_id, buckets)
+
+    digests = {}
+    for bucket, rows in games.items():
+        digest = 0
+        for row in rows:
+            digest ^= game_sync_hash(row.game_id, row.score, row.completed,
+                                     row.created_at)
+        digests[bucket] = (f"{digest:016x}", len(rows))
+
+    _cache_digests(user_id, digests, built_seq)
+    return digests, games
+
+
+def _changed_buckets(user_id, built_seqs):
+    """
+    Get cached buckets holding a game changed or deleted after their
+    digest was computed. A write that committed while a digest was being
+    cached can leave a row its invalidation missed; this catches it.
+    """
+    if not built_seqs:
+        return set()
+    oldest = min(built_seqs.values())
+
+    newest = {
+        row.sync_bucket: row.change_seq
+        for row in db.session.query(
+            GameScore.sync_bucket,
+            db.func.max(GameScore.change_seq).label('change_seq')).filter(
+                GameScore.user_id == user_id, GameScore.change_seq
+                > oldest).group_by(GameScore.sync_bucket)
+    }
+    for row in db.session.query(GameTombstone.game_id,
+                                GameTombstone.change_seq).filter(
+                                    GameTombstone.user_id == user_id,
+                                    GameTombstone.change_seq > oldest):
+        bucket = sync_bucket_for(row.game_id)
+        newest[bucket] = max(newest.get(bucket, 0), row.change_seq)
+
+    return {
+        bucket
+        for bucket, change_seq in newest.items()
+        if bucket in built_seqs and change_seq > built_seqs[bucket]
+    }
+
+
+def get_bucket_digests(user_id):
+    """
+    Get every bucket digest for a user, rebuilding only the stale ones.
+
+    Returns:
+        tuple: ({bucket: (digest, game_count)}, {bucket: rows} for rebuilt buckets)
+    """
+    digests = {}
+    built_seqs = {}
+    for row in GameSyncBucket.query.filter_by(user_id=user_id):
+        digests[row.bucket] = (row.digest, row.game_count)
+        built_seqs[row.bucket] = row.built_seq
+
+    for bucket in _changed_buckets(user_id, built_seqs):
+        del digests[bucket]
+
+    stale = [
+        bucket for bucket in range(SYNC_BUCKET_COUNT) if bucket not in digests
+    ]
+    rebuilt_games = {}
+    if stale:
+        rebuilt, rebuilt_games = _rebuild_buckets(user_id, stale)
+        digests.update(rebuilt)
+
+    return digests, rebuilt_games
+
+
+def root_digest(digests):
+    """XOR of all bucket digests, equal to the XOR of every game hash"""
+    root = 0
+    for digest, _ in digests.values():
+        root ^= int(digest, 16)
+    return f"{root:016x}"
+
+
+def compare_bucket_digests(user_id, client_buckets, client_root=None):
+    """
+    Compare a client's bucket digests with the server's and expand only
+    the buckets that differ into game lists.
+
+    Args:
+        user_id (str): User ID
+        client_buckets (dict): {bucket: digest}; omitted buckets are empty.
+            None with a differing root returns mismatchedBuckets None
+        client_root (str, optional): Client root digest; when it matches
+            the server's no bucket needs comparing
+
+    Returns:
+        dict: Root digest, mismatched bucket numbers and the server's games
+            in those buckets
+    """
+    digests, rebuilt_games = get_bucket_digests(user_id)
+    root = root_digest(digests)
+
+    if client_root is not None and client_root.lower() == root:
+        mismatched = []
+    elif client_buckets is None:
+        # Root-only request that differs; the client must send its buckets
+        return {
+            'rootDigest': root,
+            'mismatchedBuckets': None,
+            'serverGames': []
+        }
+    else:
+        client_buckets = {
+            int(bucket): str(digest).lower()
+            for bucket, digest in client_buckets.items()
+        }
+        mismatched = [
+            bucket for bucket in range(SYNC_BUCKET_COUNT)
+            if client_buckets.get(bucket, EMPTY_SYNC_DIGEST) != digests[bucket][0]
+        ]
+
+    # Buckets rebuilt just now were already read; fetch the rest in one query
+    to_load = [bucket for bucket in mismatched if bucket not in rebuilt_games]
+    games = dict(rebuilt_games)
+    if to_load:
+        games.update(_load_bucket_games(user_id, to_load))
+
+    server_games = []
+    for bucket in mismatched:
+        for row in games[bucket]:
+            server_games.append({
+                'gameId': row.game_id,
+                'bucket': bucket,
+                'score': row.score or 0,
+                'completed': bool(row.completed),
+                'lastModified': calendar.timegm(row.created_at.utctimetuple())
+                if row.created_at else 0
+            })
+
+    return {
+        'rootDigest': root,
+        'mismatchedBuckets': mismatched,
+        'serverGames': server_games
+    }
+
+
+def current_sync_cursor(user_id):
+    """Get the newest change sequence number handed out for a user"""
+    state = UserSyncState.query.get(user_id)
+    return state.last_seq if state else 0
+
+
+def record_tombstones(user_id, game_ids):
+    """
+    Record deletions made with query-level deletes, which skip the model
+    listeners. The caller commits.
+    """
+    game_ids = [game_id for game_id in game_ids if game_id]
+    if not game_ids:
+        return
+    last_seq = allocate_change_seqs(db.session.connection(), user_id,
+                                    len(game_ids))
+    first_seq = last_seq - len(game_ids) + 1
+    now = datetime.utcnow()
+    db.session.execute(GameTombstone.__table__.insert(), [{
+        'user_id': user_id,
+        'game_id': game_id,
+        'change_seq': first_seq + offset,
+        'deleted_at': now
+    } for offset, game_id in enumerate(game_ids)])
+
+
+def get_changes_since(user_id, since_cursor, limit=MAX_SYNC_CHANGES):
+    """
+    Get a user's game changes after a cursor with range scans on the
+    (user_id, change_seq) indexes.
+
+    Returns:
+        dict: changed (game_id -> last modified datetime, in sequence order),
+            deleted game_ids, the new cursor and whether more changes remain
+    """
+    changes = []
+    for model, timestamp in ((GameScore, GameScore.created_at),
+                             (ActiveGameState, ActiveGameState.last_updated)):
+        changes.extend(('changed', row.change_seq, row.game_id, row.timestamp)
+                       for row in db.session.query(
+                           model.change_seq, model.game_id,
+                           timestamp.label('timestamp')).filter(
+                               model.user_id == user_id, model.change_seq
+                               > since_cursor).order_by(
+                                   model.change_seq).limit(limit + 1))
+    changes.extend(('deleted', row.change_seq, row.game_id, row.deleted_at)
+                   for row in db.session.query(
+                       GameTombstone.change_seq, GameTombstone.game_id,
+                       GameTombstone.deleted_at).filter(
+                           GameTombstone.user_id == user_id,
+                           GameTombstone.change_seq > since_cursor).order_by(
+                               GameTombstone.change_seq).limit(limit + 1))
+
+    changes.sort(key=lambda change: change[1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    changed = {}
+    deleted = set()
+    for kind, _, game_id, timestamp in changes:
+        if kind == 'changed':
+            changed[game_id] = timestamp
+        else:
+            deleted.add(game_id)
+
+    if deleted:
+        # An active game that completes leaves a tombstone while the game
+        # lives on as a GameScore, so only report ids with no row left
+        alive = {
+            row.game_id
+            for row in db.session.query(GameScore.game_id).filter(
+                GameScore.user_id == user_id, GameScore.game_id.in_(deleted))
+        }
+        alive.update(row.game_id for row in db.session.query(
+            ActiveGameState.game_id).filter(
+                ActiveGameState.user_id == user_id,
+                ActiveGameState.game_id.in_(deleted)))
+        deleted -= alive
+        for game_id in deleted:
+            changed.pop(game_id, None)
+
+    return {
+        'changed': changed,
+        'deleted': sorted(deleted),
+        'cursor': changes[-1][1] if changes else since_cursor,
+        'has_more': has_more
+    }
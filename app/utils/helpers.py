@@ -1,6 +1,40 @@
+import gzip
+import json
+from flask import request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+# Upper bound on a decompressed request body, guards against gzip bombs
+MAX_DECOMPRESSED_BODY_BYTES = 20 * 1024 * 1024
+
+
 def load_word_list():
     # Default word list for the game
     return [
         "PYTHON", "FLASK", "CODING", "PUZZLE",
         "CRYPTO", "CIPHER", "SECRET", "DECODE"
     ]
+
+
+def get_request_json():
+    """
+    Parse the request body as JSON, accepting Content-Encoding: gzip.
+
+    Returns:
+        The decoded JSON value
+    """
+    if request.headers.get('Content-Encoding', '').lower() != 'gzip':
+        return request.get_json()
+
+    try:
+        with gzip.GzipFile(fileobj=request.stream) as body:
+            raw = body.read(MAX_DECOMPRESSED_BODY_BYTES + 1)
+    except (OSError, EOFError) as e:
+        raise BadRequest(f"Invalid gzip body: {str(e)}")
+
+    if len(raw) > MAX_DECOMPRESSED_BODY_BYTES:
+        raise RequestEntityTooLarge("Decompressed body is too large")
+
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise BadRequest(f"Invalid JSON body: {str(e)}")
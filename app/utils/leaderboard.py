@@ -0,0 +1,249 @@
+from datetime import datetime, timedelta
+from sqlalchemy import case, select
+from app.models import db, GameScore, DailyScoreRollup, PeriodScoreRollup
+import logging
+
+logger = logging.getLogger(__name__)
+
+PERIOD_TYPES = ('weekly', 'monthly', 'yearly')
+
+
+def period_start_for(period_type, day):
+    """Get the first day of the weekly/monthly/yearly period containing day"""
+    if period_type == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if period_type == 'monthly':
+        return day.replace(day=1)
+    if period_type == 'yearly':
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unknown period type: {period_type}")
+
+
+def period_end_for(period_type, period_start):
+    """Get the first day after the period starting at period_start"""
+    if period_type == 'weekly':
+        return period_start + timedelta(days=7)
+    if period_type == 'monthly':
+        if period_start.month == 12:
+            return period_start.replace(year=period_start.year + 1, month=1)
+        return period_start.replace(month=period_start.month + 1)
+    if period_type == 'yearly':
+        return period_start.replace(year=period_start.year + 1)
+    raise ValueError(f"Unknown period type: {period_type}")
+
+
+def _upsert_insert(model):
+    """Dialect specific INSERT that supports ON CONFLICT"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(model.__table__)
+
+
+def _increment_rows(model, key_columns, rows):
+    """Insert rows, adding to the counters of any row that already exists"""
+    if not rows:
+        return
+    table = model.__table__
+    stmt = _upsert_insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={
+            'score': table.c.score + stmt.excluded.score,
+            'games_played': table.c.games_played + stmt.excluded.games_played,
+            'games_won': table.c.games_won + stmt.excluded.games_won
+        })
+    db.session.execute(stmt)
+
+
+def record_game_results(user_id, results, sign=1):
+    """
+    Add completed games to the daily and period rollups incrementally.
+    Runs inside the caller's transaction so the rollups commit with the games.
+
+    Args:
+        user_id (str): User ID
+        results (iterable): (created_at, score) tuples for completed games
+        sign (int): -1 subtracts the games instead, e.g. before they are
+            changed or deleted
+    """
+    if not user_id:
+        return
+
+    daily = {}
+    for created_at, score in results:
+        day = (created_at or datetime.utcnow()).date()
+        totals = daily.setdefault(day, [0, 0, 0])
+        totals[0] += sign * (score or 0)
+        totals[1] += sign
+        totals[2] += sign if (score or 0) > 0 else 0
+
+    if not daily:
+        return
+
+    periods = {}
+    for day, (score, played, won) in daily.items():
+        for period_type in PERIOD_TYPES:
+            key = (period_type, period_start_for(period_type, day))
+            totals = periods.setdefault(key, [0, 0, 0])
+            totals[0] += score
+            totals[1] += played
+            totals[2] += won
+
+    _increment_rows(DailyScoreRollup, ['user_id', 'day'], [{
+        'user_id': user_id,
+        'day': day,
+        'score': score,
+        'games_played': played,
+        'games_won': won
+    } for day, (score, played, won) in daily.items()])
+
+    _increment_rows(PeriodScoreRollup,
+                    ['period_type', 'period_start', 'user_id'], [{
+                        'period_type': period_type,
+                        'period_start': period_start,
+                        'user_id': user_id,
+                        'score': score,
+                        'games_played': played,
+                        'games_won': won
+                    } for (period_type, period_start), (score, played,
+                                                         won) in periods.items()])
+
+    if sign < 0:
+        # A user whose last game in a day or period was removed drops out
+        # of it, rather than staying ranked and counted with no games
+        DailyScoreRollup.query.filter(
+            DailyScoreRollup.user_id == user_id,
+            DailyScoreRollup.day.in_(daily),
+            DailyScoreRollup.games_played <= 0).delete(
+                synchronize_session=False)
+        PeriodScoreRollup.query.filter(
+            PeriodScoreRollup.user_id == user_id,
+            db.tuple_(PeriodScoreRollup.period_type,
+                      PeriodScoreRollup.period_start).in_(periods),
+            PeriodScoreRollup.games_played <= 0).delete(
+                synchronize_session=False)
+
+
+def remove_game_results(user_id, results):
+    """Subtract completed games from the rollups; see record_game_results"""
+    record_game_results(user_id, results, sign=-1)
+
+
+def _overwrite_from_select(model, columns, key_columns, source):
+    """
+    INSERT ... SELECT that overwrites rows already present, so a rebuild
+    cannot fail on a row an incremental upsert inserted concurrently
+    """
+    stmt = _upsert_insert(model).from_select(columns, source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={
+            column: stmt.excluded[column]
+            for column in ('score', 'games_played', 'games_won')
+        })
+    db.session.execute(stmt)
+
+
+def rebuild_daily_rollups(start_day, end_day):
+    """Recompute daily rollups for days in [start_day, end_day) from GameScore"""
+    day_expr = db.func.date(GameScore.created_at)
+
+    db.session.query(DailyScoreRollup).filter(
+        DailyScoreRollup.day >= start_day,
+        DailyScoreRollup.day < end_day).delete(synchronize_session=False)
+
+    source = select(
+        GameScore.user_id, day_expr, db.func.sum(GameScore.score),
+        db.func.count(GameScore.id),
+        db.func.sum(case((GameScore.score > 0, 1), else_=0))).where(
+            GameScore.completed == True, GameScore.user_id.isnot(None),
+            GameScore.created_at >= datetime.combine(start_day,
+                                                     datetime.min.time()),
+            GameScore.created_at < datetime.combine(
+                end_day, datetime.min.time())).group_by(
+                    GameScore.user_id, day_expr)
+
+    _overwrite_from_select(
+        DailyScoreRollup,
+        ['user_id', 'day', 'score', 'games_played', 'games_won'],
+        ['user_id', 'day'], source)
+
+
+def rebuild_period_rollup(period_type, period_start):
+    """Recompute one period's rollups from the daily rollups"""
+    period_end = period_end_for(period_type, period_start)
+
+    db.session.query(PeriodScoreRollup).filter(
+        PeriodScoreRollup.period_type == period_type,
+        PeriodScoreRollup.period_start == period_start).delete(
+            synchronize_session=False)
+
+    source = select(
+        db.literal(period_type), db.literal(period_start),
+        DailyScoreRollup.user_id, db.func.sum(DailyScoreRollup.score),
+        db.func.sum(DailyScoreRollup.games_played),
+        db.func.sum(DailyScoreRollup.games_won)).where(
+            DailyScoreRollup.day >= period_start,
+            DailyScoreRollup.day < period_end).group_by(
+                DailyScoreRollup.user_id)
+
+    _overwrite_from_select(PeriodScoreRollup, [
+        'period_type', 'period_start', 'user_id', 'score', 'games_played',
+        'games_won'
+    ], ['period_type', 'period_start', 'user_id'], source)
+
+
+def _periods_between(start_day, end_day):
+    """Yield every (period_type, period_start) overlapping [start_day, end_day)"""
+    for period_type in PERIOD_TYPES:
+        period_start = period_start_for(period_type, start_day)
+        while period_start < end_day:
+            yield period_type, period_start
+            period_start = period_end_for(period_type, period_start)
+
+
+def refresh_recent_rollups(days=2):
+    """
+    Idempotently rebuild the last few days and the periods that contain them.
+    Corrects any drift from the incremental updates (late syncs, deletes).
+    """
+    end_day = datetime.utcnow().date() + timedelta(days=1)
+    start_day = end_day - timedelta(days=days)
+
+    rebuild_daily_rollups(start_day, end_day)
+    for period_type, period_start in _periods_between(start_day, end_day):
+        rebuild_period_rollup(period_type, period_start)
+    db.session.commit()
+
+
+def backfill_rollups(chunk_days=30):
+    """
+    Rebuild all rollups from the full game history, committing per chunk
+    so the backfill never holds one huge transaction.
+
+    Returns:
+        int: Number of days processed
+    """
+    first_played = db.session.query(db.func.min(
+        GameScore.created_at)).filter(GameScore.completed == True).scalar()
+    if not first_played:
+        return 0
+
+    start_day = first_played.date()
+    end_day = datetime.utcnow().date() + timedelta(days=1)
+
+    chunk_start = start_day
+    while chunk_start < end_day:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end_day)
+        rebuild_daily_rollups(chunk_start, chunk_end)
+        db.session.commit()
+        logger.info(f"Rebuilt daily rollups {chunk_start} to {chunk_end}")
+        chunk_start = chunk_end
+
+    for period_type, period_start in _periods_between(start_day, end_day):
+        rebuild_period_rollup(period_type, period_start)
+        db.session.commit()
+
+    return (end_day - start_day).days
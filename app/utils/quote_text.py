@@ -0,0 +1,44 @@
+import hashlib
+import re
+import unicodedata
+
+# Mangled encodings seen in quote sources, applied in order
+ENCODING_REPLACEMENTS = {
+    '’': "'",  # Right single quote'
+    '—': '-',  # Em dash'
+    '“': '"',  # Left double quote''
+    '”': '"',  # Right double quote''
+    'É': 'E',  # Capital E with acute accent
+    "é": 'e',  # lower case E with acute accent
+    '‚Äô': "'",  # Smart single quote
+    '‚Äù': '"',  # Smart double quote open
+    '‚Äú': '"',  # Smart double quote close
+    '‚Äî': '—',  # Em dash
+    '‚Äì': '–',  # En dash
+    '‚Ä¢': '•',  # Bullet
+    '‚Ä¦': '…',  # Ellipsis
+    '‚Äï': '"',  # Another smart quote variant
+    '‚Äò': "'",  # Another single quote variant
+    '‚Äó': "'",  # Another single quote variant
+}
+
+_NOT_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def fix_encoding(value):
+    """Apply ENCODING_REPLACEMENTS to a string"""
+    for bad, good in ENCODING_REPLACEMENTS.items():
+        if bad in value:
+            value = value.replace(bad, good)
+    return value
+
+
+def normalize_text(text):
+    """Casefolded words of a quote, so punctuation and spacing variants match"""
+    text = unicodedata.normalize('NFKC', fix_encoding(text)).casefold()
+    return _NOT_WORD.sub(' ', text).strip()
+
+
+def text_hash(text):
+    """Hash of the normalized text, indexed for duplicate detection"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
@@ -0,0 +1,212 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from redis.exceptions import RedisError
+from app.utils.redis_client import get_redis
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ratelimit:'
+
+# Buckets kept per worker while Redis is unreachable, least recently used
+# evicted first
+MAX_LOCAL_BUCKETS = 10000
+
+# After a Redis failure, use the local buckets for this long before retrying
+REDIS_RETRY_SECONDS = 5
+
+# Policies are re-read from the security settings this often
+POLICY_CACHE_SECONDS = 60
+
+# Seconds between game creations, as the old per-worker cooldown enforced
+GAME_CREATION_COOLDOWN = 2
+
+DEFAULT_CHECK_USERNAME_PER_MINUTE = 30
+
+# Login attempts one IP may make across all accounts, as a multiple of the
+# per-account limit; IPs can be shared by many users behind NAT
+LOGIN_IP_MULTIPLIER = 10
+
+# Atomic refill-and-take on a hash of (tokens, ts). Uses the Redis clock so
+# every worker agrees on elapsed time; floats are returned as strings
+# because Lua numbers are truncated to integers in replies.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class LocalTokenBuckets:
+    """Bounded in-process token buckets, used when Redis is unavailable"""
+
+    def __init__(self, max_buckets=MAX_LOCAL_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        with self._lock:
+            now = time.monotonic()
+            tokens, ts = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - ts) * rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (cost - tokens) / rate
+
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+
+_local_buckets = LocalTokenBuckets()
+_script = None
+_redis_down_until = 0
+_policies = None
+_policies_loaded_at = 0
+
+
+def get_policies():
+    """
+    Get the rate limit policies as {name: (capacity, refill tokens per second)}.
+    Login limits come from the admin security settings.
+    """
+    global _policies, _policies_loaded_at
+    if _policies is not None and time.time(
+    ) - _policies_loaded_at < POLICY_CACHE_SECONDS:
+        return _policies
+
+    from app.routes.admin_process import load_security_settings
+    settings = load_security_settings()
+
+    login_attempts = max(1, int(settings.get('login_rate_limit_attempts', 5)))
+    login_seconds = max(1, int(settings.get('login_rate_limit_minutes', 5))) * 60
+    check_per_minute = max(
+        1,
+        int(
+            settings.get('check_username_rate_limit_per_minute',
+                         DEFAULT_CHECK_USERNAME_PER_MINUTE)))
+
+    _policies = {
+        'start': (1, 1 / GAME_CREATION_COOLDOWN),
+        'login': (login_attempts, login_attempts / login_seconds),
+        'login_ip': (login_attempts * LOGIN_IP_MULTIPLIER,
+                     login_attempts * LOGIN_IP_MULTIPLIER / login_seconds),
+        'check_username': (check_per_minute, check_per_minute / 60)
+    }
+    _policies_loaded_at = time.time()
+    return _policies
+
+
+def check_rate_limit(policy, identifier, cost=1):
+    """
+    Take tokens from the bucket for (policy, identifier).
+
+    Returns:
+        tuple: (allowed, seconds until enough tokens are available)
+    """
+    global _script, _redis_down_until
+    capacity, rate = get_policies()[policy]
+    key = f"{KEY_PREFIX}{policy}:{identifier}"
+
+    if time.time() >= _redis_down_until:
+        try:
+            if _script is None:
+                _script = get_redis().register_script(TOKEN_BUCKET_LUA)
+            allowed, retry_after = _script(keys=[key],
+                                           args=[capacity, rate, cost])
+            return bool(allowed), float(retry_after)
+        except RedisError as e:
+            logger.warning(
+                f"Rate limiter falling back to local buckets: {str(e)}")
+            _redis_down_until = time.time() + REDIS_RETRY_SECONDS
+
+    return _local_buckets.take(key, capacity, rate, cost)
+
+
+def client_identifier():
+    """Rate limit key for the caller: the JWT identity, else the client IP"""
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # View is not behind jwt_required
+        identity = None
+    return identity or request.remote_addr
+
+
+def client_ip():
+    """Rate limit key for the caller's IP, whoever they are logged in as"""
+    return request.remote_addr
+
+
+def rate_limited(policy,
+                 key=client_identifier,
+                 message='Too many requests, please try again later',
+                 message_field='error',
+                 retry_field='retry_after'):
+    """
+    Reject requests over the policy's limit with 429 and a Retry-After header.
+
+    Args:
+        policy (str): Policy name from get_policies
+        key (callable): Returns the bucket identifier; None skips the limit
+        message_field, retry_field (str): Response keys, so existing clients
+            keep the error format they already parse
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method == 'OPTIONS':
+                return view(*args, **kwargs)
+
+            identifier = key()
+            if identifier is None:
+                return view(*args, **kwargs)
+
+            allowed, retry_after = check_rate_limit(policy, identifier)
+            if allowed:
+                return view(*args, **kwargs)
+
+            logger.warning(f"Rate limit '{policy}' hit for {identifier}")
+            response = jsonify({
+                message_field: message,
+                retry_field: round(retry_after, 1)
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(max(1, round(retry_after)))
+            return response
+
+        return wrapper
+
+    return decorator
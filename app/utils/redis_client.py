@@ -0,0 +1,25 @@
+import os
+import logging
+import redis
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Same server the Celery broker uses
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://0.0.0.0:6379/0')
+
+_client = None
+
+
+def get_redis():
+    """
+    Get the process-wide Redis client. Timeouts are short so callers can
+    fall back to local state quickly when Redis is unavailable.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL,
+                                       socket_connect_timeout=1,
+                                       socket_timeout=1,
+                                       health_check_interval=30)
+    return _client
@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+import logging
+import zlib
+from flask import Response, request, stream_with_context
+
+try:
+    import msgpack
+except ImportError:  # Optional; responses fall back to NDJSON
+    msgpack = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+
+# Records encoded per yielded chunk, keeps write calls few and memory flat
+RECORDS_PER_CHUNK = 100
+
+# wbits for zlib to write a gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def wants_msgpack():
+    """Check whether the client asked for MessagePack and it is available"""
+    return msgpack is not None and request.accept_mimetypes.quality(
+        MSGPACK_MIMETYPE) > request.accept_mimetypes.quality(NDJSON_MIMETYPE)
+
+
+def stream_records(records, use_msgpack=False):
+    """
+    Stream an iterable of dicts as NDJSON or as a MessagePack object stream
+    without materializing the whole result.
+
+    Args:
+        records (iterable): Dicts to encode, consumed lazily
+        use_msgpack (bool): Encode as consecutive MessagePack maps
+
+    Returns:
+        Response: Streaming response with the matching mimetype
+    """
+    if use_msgpack:
+        packer = msgpack.Packer()
+        encode = packer.pack
+        mimetype = MSGPACK_MIMETYPE
+    else:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        encode = lambda record: (encoder.encode(record) + '\n').encode('utf-8')
+        mimetype = NDJSON_MIMETYPE
+
+    def generate():
+        chunk = []
+        count = 0
+        try:
+            for record in records:
+                chunk.append(encode(record))
+                count += 1
+                if len(chunk) >= RECORDS_PER_CHUNK:
+                    yield b''.join(chunk)
+                    chunk = []
+            if chunk:
+                yield b''.join(chunk)
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated stream
+            logger.error(f"Stream failed after {count} records: {str(e)}",
+                         exc_info=True)
+            raise
+
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def wants_gzip():
+    """Check whether a download was requested gzip-compressed (?gzip=1)"""
+    return request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+
+def iter_csv(header, rows):
+    """Encode a header and an iterable of row tuples as CSV text chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % RECORDS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_json_array(records):
+    """Encode an iterable of dicts as the text chunks of one JSON array"""
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    chunk = ['[']
+    for count, record in enumerate(records):
+        chunk.append((',' if count else '') + encoder.encode(record))
+        if len(chunk) >= RECORDS_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(']')
+    yield ''.join(chunk)
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_download(chunks, mimetype, filename, compress=False):
+    """
+    Stream text chunks as a file download, optionally gzip-compressed.
+    Bytes are sent as the chunks are produced, so nothing is buffered
+    beyond one chunk.
+
+    Args:
+        chunks (iterable): Text chunks, consumed lazily
+        mimetype (str): Mimetype of the uncompressed file
+        filename (str): Download name; '.gz' is appended when compressing
+        compress (bool): Send a .gz file instead
+
+    Returns:
+        Response: Streaming attachment response
+    """
+    encoded = (chunk.encode('utf-8') for chunk in chunks)
+    if compress:
+        encoded = _gzip_chunks(encoded)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+
+    def generate():
+        try:
+            yield from encoded
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated file
+            logger.error(f"Download of {filename} failed: {str(e)}",
+                         exc_info=True)
+            raise
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'})
@@ -0,0 +1,217 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from redis.exceptions import RedisError
+from app.utils.redis_client import get_redis
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'jwt:revoked:'
+
+# Entries revoking every token of a user share the keyspace under this prefix
+USER_PREFIX = 'user:'
+CHANNEL = 'jwt:revoked'
+
+# TTL for tokens without an exp claim (the refresh token lifetime)
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+# The bloom filter is rebuilt from Redis this often, which drops expired
+# tokens and catches any pub/sub message missed while disconnected
+REBUILD_INTERVAL_SECONDS = 600
+
+BLOOM_CAPACITY = 100000
+BLOOM_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings, no false negatives"""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.size = int(-capacity * math.log(error_rate) / (math.log(2)**2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size
+                for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+
+class TokenBlocklist:
+    """
+    Revoked JWT IDs shared through Redis. Each key lives as long as the
+    token it revokes. Every worker keeps a bloom filter of revoked IDs,
+    updated over pub/sub, so checking a token that was never revoked needs
+    no network round trip; only bloom hits are confirmed in Redis.
+
+    Checks fail closed: a bloom hit that cannot be confirmed while Redis
+    is down counts as revoked. Revocations made by this worker are also
+    kept locally until they expire, so they are enforced exactly here
+    whatever the state of Redis.
+    """
+
+    def __init__(self):
+        self._bloom = BloomFilter()
+        self._local = {}  # jti -> expiry, for revocations made here
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def _ensure_listener(self):
+        # Threads do not survive a fork, so each worker starts its own
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            threading.Thread(target=self._listen,
+                             name='jwt-blocklist-listener',
+                             daemon=True).start()
+
+    def _rebuild(self):
+        """Replace the bloom filter with the revoked IDs currently in Redis"""
+        bloom = BloomFilter()
+        for key in get_redis().scan_iter(match=KEY_PREFIX + '*', count=1000):
+            bloom.add(key.decode('utf-8')[len(KEY_PREFIX):])
+        now = time.time()
+        for jti, expires_at in list(self._local.items()):
+            if expires_at > now:
+                bloom.add(jti)
+            else:
+                self._local.pop(jti, None)
+        self._bloom = bloom
+
+    def _listen(self):
+        """Keep the bloom filter current: full rebuilds plus pub/sub updates"""
+        backoff = 1
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                self._rebuild()
+                rebuilt_at = time.time()
+                backoff = 1
+
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message['type'] == 'message':
+                        self._bloom.add(message['data'].decode('utf-8'))
+                    if time.time() - rebuilt_at > REBUILD_INTERVAL_SECONDS:
+                        self._rebuild()
+                        rebuilt_at = time.time()
+            except (RedisError, OSError) as e:
+                logger.warning(
+                    f"JWT blocklist listener lost Redis, retrying in {backoff}s: {str(e)}"
+                )
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def add(self, jti, expires_at=None):
+        """
+        Revoke a token until it would have expired anyway.
+
+        Args:
+            jti (str): JWT ID
+            expires_at (int, optional): The token's exp claim (epoch seconds)
+        """
+        self._ensure_listener()
+        now = time.time()
+        ttl = int(expires_at - now) if expires_at else DEFAULT_TTL_SECONDS
+        if ttl <= 0:
+            return
+
+        self._bloom.add(jti)
+        self._local[jti] = now + ttl
+        try:
+            redis_client = get_redis()
+            redis_client.setex(KEY_PREFIX + jti, ttl, 1)
+            redis_client.publish(CHANNEL, jti)
+        except RedisError as e:
+            logger.warning(
+                f"Could not store revoked token in Redis, only this worker "
+                f"enforces it: {str(e)}")
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user, for the refresh token lifetime"""
+        self.add(USER_PREFIX + user_id)
+
+    def is_user_revoked(self, user_id):
+        return bool(user_id) and USER_PREFIX + user_id in self
+
+    def __contains__(self, jti):
+        self._ensure_listener()
+        if jti not in self._bloom:
+            return False
+
+        expires_at = self._local.get(jti)
+        if expires_at and expires_at > time.time():
+            return True
+
+        try:
+            return bool(get_redis().exists(KEY_PREFIX + jti))
+        except RedisError as e:
+            # Fail closed: a possibly revoked token is refused until Redis
+            # can confirm it, rather than re-enabling logged-out sessions
+            logger.warning(
+                f"Could not check token revocation in Redis, refusing it: {str(e)}"
+            )
+            return True
+
+
+if __name__ == '__main__':
+    # Benchmark the check path: python -m app.utils.token_blocklist
+    import timeit
+    import uuid
+
+    blocklist = TokenBlocklist()
+    revoked = [str(uuid.uuid4()) for _ in range(10000)]
+    for jti in revoked:
+        blocklist._bloom.add(jti)
+    fresh = [str(uuid.uuid4()) for _ in range(10000)]
+
+    rounds = 20
+    seconds = timeit.timeit(lambda: [jti in blocklist._bloom for jti in fresh],
+                            number=rounds)
+    false_positives = sum(jti in blocklist._bloom for jti in fresh)
+    print(f"Not-revoked check (bloom only): "
+          f"{seconds / (rounds * len(fresh)) * 1e6:.2f} us/op, "
+          f"{false_positives / len(fresh):.2%} false positives")
+
+    seconds = timeit.timeit(lambda: [jti in blocklist for jti in fresh],
+                            number=rounds)
+    print(f"Not-revoked check (full path): "
+          f"{seconds / (rounds * len(fresh)) * 1e6:.2f} us/op")
+
+    try:
+        get_redis().ping()
+        sample = revoked[:1000]
+        for jti in sample:
+            blocklist.add(jti, time.time() + 60)
+        seconds = timeit.timeit(lambda: [jti in blocklist for jti in sample],
+                                number=1)
+        print(f"Revoked check (Redis confirm): "
+              f"{seconds / len(sample) * 1e6:.2f} us/op")
+    except RedisError as e:
+        print(f"Redis unavailable, skipped the revoked check: {str(e)}")
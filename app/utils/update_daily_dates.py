@@ -1,5 +1,6 @@
 
 from app.models import db, Quote
+from app.utils.daily import invalidate_first_daily_date
 from datetime import datetime, timedelta
 
 def update_daily_dates():
@@ -30,4 +31,5 @@ def update_daily_dates():
     
     # Commit changes
     db.session.commit()
+    invalidate_first_daily_date()
     print(f"Successfully reassigned dates for {n} quotes")
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import g, has_app_context
+from app.models import db, User
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# How long a worker trusts a cached user. Invalidation is per worker, so
+# this bounds how stale another worker's copy can be after a role change.
+USER_CACHE_TTL_SECONDS = 30
+
+MAX_CACHED_USERS = 10000
+
+CACHED_USER_FIELDS = ('user_id', 'username', 'email', 'is_admin', 'subadmin',
+                      'xp_boost_multiplier', 'xp_boost_expires',
+                      'pending_deletion')
+
+# Read-only snapshot of the User fields hot paths check
+CachedUser = namedtuple('CachedUser', CACHED_USER_FIELDS)
+
+_COLUMNS = [getattr(User, field) for field in CACHED_USER_FIELDS]
+
+# Sentinel for users looked up and not found
+_MISSING = object()
+
+
+class UserCache:
+    """Bounded TTL LRU of user snapshots, with hit/miss counters"""
+
+    def __init__(self, ttl=USER_CACHE_TTL_SECONDS, max_size=MAX_CACHED_USERS):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.request_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, value):
+        with self._lock:
+            self._entries[user_id] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_request_hit(self):
+        with self._lock:
+            self.request_hits += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._entries.pop(user_id, None):
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.request_hits + self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'request_hits': self.request_hits,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': round((self.request_hits + self.hits) /
+                                   lookups, 4) if lookups else None
+            }
+
+
+_cache = UserCache()
+
+
+def _request_memo():
+    if not has_app_context():
+        return None
+    if 'user_cache' not in g:
+        g.user_cache = {}
+    return g.user_cache
+
+
+def get_cached_user(user_id):
+    """
+    Get a read-only snapshot of a user, or None if there is no such user.
+    Checks the request memo, then the worker's TTL cache, then the database.
+    Load the User model instead when the row is going to be modified.
+    """
+    if not user_id:
+        return None
+
+    memo = _request_memo()
+    if memo is not None and user_id in memo:
+        _cache.record_request_hit()
+        value = memo[user_id]
+        return None if value is _MISSING else value
+
+    value = _cache.get(user_id)
+    if value is None:
+        row = db.session.query(*_COLUMNS).filter(
+            User.user_id == user_id).first()
+        value = CachedUser(*row) if row else _MISSING
+        _cache.set(user_id, value)
+
+    if memo is not None:
+        memo[user_id] = value
+    return None if value is _MISSING else value
+
+
+def invalidate_user(user_id):
+    """Drop a user's cached snapshot after a profile, role or password change"""
+    _cache.invalidate(user_id)
+    memo = _request_memo()
+    if memo is not None:
+        memo.pop(user_id, None)
+
+
+def user_cache_stats():
+    """Hit ratio and size counters for this worker's user cache"""
+    return _cache.stats()
@@ -15,5 +15,12 @@ class Config:
     
     MAILGUN_API_KEY = os.environ.get('MAILGUN_API_KEY')
     MAILGUN_DOMAIN = os.environ.get('MAILGUN_DOMAIN')
+    # Point at a local stub to test campaign delivery without sending
+    MAILGUN_API_BASE = os.environ.get('MAILGUN_API_BASE',
+                                      'https://api.mailgun.net/v3')
+    # Reverse proxies in front of the app (the Replit proxy in deploys).
+    # Their X-Forwarded-For entries give request.remote_addr, which the
+    # rate limits key on; set 0 when clients connect directly
+    PROXY_HOPS = int(os.environ.get('PROXY_HOPS', '1'))
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable is not set")
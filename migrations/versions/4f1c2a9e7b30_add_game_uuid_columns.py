@@ -0,0 +1,124 @@
+"""add game_uuid columns
+
+Revision ID: 4f1c2a9e7b30
+Revises: cb7294c9d4ee
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.game_ids import extract_uuid_from_constructed_id
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9e7b30'
+down_revision = 'cb7294c9d4ee'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn, table_name):
+    """Fill game_uuid in id-ordered chunks so no single statement locks the table"""
+    table = sa.table(table_name, sa.column('id', sa.Integer),
+                     sa.column('game_id', sa.String),
+                     sa.column('game_uuid', sa.String))
+    update = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        game_uuid=sa.bindparam('new_uuid'))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, table.c.game_id).where(
+                table.c.id > last_id).order_by(table.c.id).limit(
+                    BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+
+        params = [{
+            'row_id': row.id,
+            'new_uuid': extract_uuid_from_constructed_id(row.game_id)
+        } for row in rows if row.game_id]
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+
+
+def _dedupe_game_scores(conn):
+    """
+    Remove duplicate games per (user_id, game_uuid) before the unique index
+    is built, using the admin cleanup rule: keep the earliest properly
+    constructed ID, otherwise the earliest raw UUID.
+    """
+    groups = conn.execute(
+        sa.text("SELECT user_id, game_uuid FROM game_score "
+                "WHERE game_uuid IS NOT NULL AND user_id IS NOT NULL "
+                "GROUP BY user_id, game_uuid HAVING COUNT(*) > 1")).fetchall()
+
+    for user_id, game_uuid in groups:
+        games = conn.execute(
+            sa.text("SELECT id, game_id FROM game_score "
+                    "WHERE user_id = :user_id AND game_uuid = :game_uuid "
+                    "ORDER BY id"), {
+                        'user_id': user_id,
+                        'game_uuid': game_uuid
+                    }).fetchall()
+
+        constructed = [g for g in games if g.game_id.upper() != game_uuid]
+        keep = constructed[0] if constructed else games[0]
+        delete_ids = [g.id for g in games if g.id != keep.id]
+
+        conn.execute(sa.text("DELETE FROM game_score WHERE id = :id"),
+                     [{'id': game_id} for game_id in delete_ids])
+
+
+def _dedupe_active_games(conn):
+    """Keep only the most recently updated active state per (user_id, game_uuid)"""
+    groups = conn.execute(
+        sa.text("SELECT user_id, game_uuid FROM active_game_state "
+                "WHERE game_uuid IS NOT NULL "
+                "GROUP BY user_id, game_uuid HAVING COUNT(*) > 1")).fetchall()
+
+    for user_id, game_uuid in groups:
+        states = conn.execute(
+            sa.text("SELECT id FROM active_game_state "
+                    "WHERE user_id = :user_id AND game_uuid = :game_uuid "
+                    "ORDER BY last_updated DESC, id DESC"), {
+                        'user_id': user_id,
+                        'game_uuid': game_uuid
+                    }).fetchall()
+
+        conn.execute(sa.text("DELETE FROM active_game_state WHERE id = :id"),
+                     [{'id': state.id} for state in states[1:]])
+
+
+def upgrade():
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('game_uuid', sa.String(length=36), nullable=True))
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('game_uuid', sa.String(length=36), nullable=True))
+
+    conn = op.get_bind()
+    _backfill(conn, 'game_score')
+    _backfill(conn, 'active_game_state')
+    _dedupe_game_scores(conn)
+    _dedupe_active_games(conn)
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.create_index('idx_game_score_user_uuid', ['user_id', 'game_uuid'], unique=True)
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.create_index('idx_active_game_user_uuid', ['user_id', 'game_uuid'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.drop_index('idx_active_game_user_uuid')
+        batch_op.drop_column('game_uuid')
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.drop_index('idx_game_score_user_uuid')
+        batch_op.drop_column('game_uuid')
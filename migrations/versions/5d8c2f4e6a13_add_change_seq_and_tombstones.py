@@ -0,0 +1,108 @@
+"""add change_seq and tombstones
+
+Revision ID: 5d8c2f4e6a13
+Revises: 9b3e5d7a1c24
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8c2f4e6a13'
+down_revision = '9b3e5d7a1c24'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn, table_name, counters):
+    """Number existing rows per user in id order, continuing from counters"""
+    table = sa.table(table_name, sa.column('id', sa.Integer),
+                     sa.column('user_id', sa.String),
+                     sa.column('change_seq', sa.BigInteger))
+    update = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        change_seq=sa.bindparam('new_seq'))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, table.c.user_id).where(
+                table.c.id > last_id).order_by(table.c.id).limit(
+                    BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            if not row.user_id:
+                continue
+            counters[row.user_id] = counters.get(row.user_id, 0) + 1
+            params.append({'row_id': row.id, 'new_seq': counters[row.user_id]})
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.create_table('user_sync_state',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('last_seq', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('game_tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('game_id', sa.String(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('game_tombstone', schema=None) as batch_op:
+        batch_op.create_index('idx_game_tombstone_user_change_seq', ['user_id', 'change_seq'], unique=False)
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('change_seq', sa.BigInteger(), nullable=True))
+
+    conn = op.get_bind()
+    counters = {}
+    _backfill(conn, 'game_score', counters)
+    _backfill(conn, 'active_game_state', counters)
+
+    sync_state = sa.table('user_sync_state', sa.column('user_id', sa.String),
+                          sa.column('last_seq', sa.BigInteger))
+    items = list(counters.items())
+    for start in range(0, len(items), BATCH_SIZE):
+        conn.execute(sync_state.insert(), [{
+            'user_id': user_id,
+            'last_seq': last_seq
+        } for user_id, last_seq in items[start:start + BATCH_SIZE]])
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.create_index('idx_game_score_user_change_seq', ['user_id', 'change_seq'], unique=False)
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.create_index('idx_active_game_user_change_seq', ['user_id', 'change_seq'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.drop_index('idx_active_game_user_change_seq')
+        batch_op.drop_column('change_seq')
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.drop_index('idx_game_score_user_change_seq')
+        batch_op.drop_column('change_seq')
+
+    with op.batch_alter_table('game_tombstone', schema=None) as batch_op:
+        batch_op.drop_index('idx_game_tombstone_user_change_seq')
+
+    op.drop_table('game_tombstone')
+    op.drop_table('user_sync_state')
@@ -0,0 +1,135 @@
+"""add game kind columns
+
+Revision ID: 7416062cba65
+Revises: 4f1c2a9e7b30
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.game_ids import parse_game_id
+
+
+# revision identifiers, used by Alembic.
+revision = '7416062cba65'
+down_revision = '4f1c2a9e7b30'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn, table_name, has_game_type, date_as_string):
+    """Fill the game kind columns in id-ordered chunks"""
+    columns = [
+        sa.column('id', sa.Integer),
+        sa.column('game_id', sa.String),
+        sa.column('difficulty', sa.String),
+        sa.column('is_daily', sa.Boolean),
+        sa.column('is_hardcore', sa.Boolean),
+        sa.column('challenge_date',
+                  sa.String if date_as_string else sa.Date)
+    ]
+    if has_game_type:
+        columns.append(sa.column('game_type', sa.String))
+    table = sa.table(table_name, *columns)
+
+    values = {
+        'difficulty': sa.bindparam('new_difficulty'),
+        'is_daily': sa.bindparam('new_is_daily'),
+        'is_hardcore': sa.bindparam('new_is_hardcore'),
+        # Only daily IDs encode a date; keep any existing value otherwise
+        'challenge_date': sa.func.coalesce(
+            sa.bindparam('new_challenge_date',
+                         type_=sa.String if date_as_string else sa.Date),
+            table.c.challenge_date)
+    }
+    update = table.update().where(
+        table.c.id == sa.bindparam('row_id')).values(**values)
+
+    selected = [table.c.id, table.c.game_id]
+    if has_game_type:
+        selected.append(table.c.game_type)
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(*selected).where(table.c.id > last_id).order_by(
+                table.c.id).limit(BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            kind = parse_game_id(row.game_id)
+            challenge_date = kind['challenge_date']
+            if challenge_date and date_as_string:
+                challenge_date = challenge_date.isoformat()
+            params.append({
+                'row_id': row.id,
+                'new_difficulty': kind['difficulty'],
+                'new_is_daily': kind['is_daily']
+                or (has_game_type and row.game_type == 'daily'),
+                'new_is_hardcore': kind['is_hardcore'],
+                'new_challenge_date': challenge_date
+            })
+        conn.execute(update, params)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('difficulty', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('is_daily', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('is_hardcore', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('difficulty', sa.String(length=10), nullable=True))
+        batch_op.add_column(sa.Column('is_daily', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('is_hardcore', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('challenge_date', sa.Date(), nullable=True))
+
+    with op.batch_alter_table('anonymous_game_score', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_daily', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('is_hardcore', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('challenge_date', sa.Date(), nullable=True))
+
+    conn = op.get_bind()
+    _backfill(conn, 'game_score', has_game_type=True, date_as_string=True)
+    _backfill(conn, 'active_game_state', has_game_type=False, date_as_string=False)
+    _backfill(conn, 'anonymous_game_score', has_game_type=True, date_as_string=False)
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.create_index('idx_game_score_daily_user', ['user_id', 'challenge_date'], unique=False, postgresql_where=sa.text('is_daily'), sqlite_where=sa.text('is_daily'))
+        batch_op.create_index('idx_game_score_difficulty_created', ['difficulty', 'created_at'], unique=False)
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.create_index('idx_active_game_user_daily', ['user_id', 'is_daily'], unique=False)
+
+    with op.batch_alter_table('anonymous_game_score', schema=None) as batch_op:
+        batch_op.create_index('idx_anon_game_score_daily', ['challenge_date'], unique=False, postgresql_where=sa.text('is_daily'), sqlite_where=sa.text('is_daily'))
+        batch_op.create_index('idx_anon_game_score_difficulty_created', ['difficulty', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('anonymous_game_score', schema=None) as batch_op:
+        batch_op.drop_index('idx_anon_game_score_difficulty_created')
+        batch_op.drop_index('idx_anon_game_score_daily')
+        batch_op.drop_column('challenge_date')
+        batch_op.drop_column('is_hardcore')
+        batch_op.drop_column('is_daily')
+
+    with op.batch_alter_table('active_game_state', schema=None) as batch_op:
+        batch_op.drop_index('idx_active_game_user_daily')
+        batch_op.drop_column('challenge_date')
+        batch_op.drop_column('is_hardcore')
+        batch_op.drop_column('is_daily')
+        batch_op.drop_column('difficulty')
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.drop_index('idx_game_score_difficulty_created')
+        batch_op.drop_index('idx_game_score_daily_user')
+        batch_op.drop_column('is_hardcore')
+        batch_op.drop_column('is_daily')
+        batch_op.drop_column('difficulty')
@@ -0,0 +1,73 @@
+"""add game sync buckets
+
+Revision ID: 9b3e5d7a1c24
+Revises: 7416062cba65
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.game_ids import sync_bucket_for
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3e5d7a1c24'
+down_revision = '7416062cba65'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn):
+    """Fill sync_bucket in id-ordered chunks; digests are built lazily on first sync"""
+    table = sa.table('game_score', sa.column('id', sa.Integer),
+                     sa.column('game_id', sa.String),
+                     sa.column('sync_bucket', sa.SmallInteger))
+    update = table.update().where(table.c.id == sa.bindparam('row_id')).values(
+        sync_bucket=sa.bindparam('new_bucket'))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.id, table.c.game_id).where(
+                table.c.id > last_id).order_by(table.c.id).limit(
+                    BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+
+        params = [{
+            'row_id': row.id,
+            'new_bucket': sync_bucket_for(row.game_id)
+        } for row in rows if row.game_id]
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.create_table('game_sync_bucket',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('bucket', sa.SmallInteger(), nullable=False),
+    sa.Column('digest', sa.String(length=16), nullable=False),
+    sa.Column('game_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'bucket')
+    )
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_bucket', sa.SmallInteger(), nullable=True))
+
+    _backfill(op.get_bind())
+
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.create_index('idx_game_score_user_sync_bucket', ['user_id', 'sync_bucket'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.drop_index('idx_game_score_user_sync_bucket')
+        batch_op.drop_column('sync_bucket')
+
+    op.drop_table('game_sync_bucket')
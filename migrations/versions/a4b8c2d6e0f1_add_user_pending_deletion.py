@@ -0,0 +1,33 @@
+"""add user pending_deletion
+
+Revision ID: a4b8c2d6e0f1
+Revises: e6f1a2b3c4d5
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4b8c2d6e0f1'
+down_revision = 'e6f1a2b3c4d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('pending_deletion',
+                      sa.Boolean(),
+                      nullable=False,
+                      server_default=sa.false()))
+        batch_op.add_column(
+            sa.Column('deletion_requested_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('deletion_requested_at')
+        batch_op.drop_column('pending_deletion')
@@ -0,0 +1,31 @@
+"""add built_seq to game sync buckets
+
+Revision ID: a4d9e2b7c5f1
+Revises: f2c8a4e6b1d7
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d9e2b7c5f1'
+down_revision = 'f2c8a4e6b1d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing digests get 0, so any later change marks them stale
+    with op.batch_alter_table('game_sync_bucket', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('built_seq',
+                      sa.BigInteger(),
+                      nullable=False,
+                      server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('game_sync_bucket', schema=None) as batch_op:
+        batch_op.drop_column('built_seq')
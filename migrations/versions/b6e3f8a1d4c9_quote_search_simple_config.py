@@ -0,0 +1,32 @@
+"""rebuild quote search vectors with the simple text search config
+
+Revision ID: b6e3f8a1d4c9
+Revises: a4d9e2b7c5f1
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e3f8a1d4c9'
+down_revision = 'a4d9e2b7c5f1'
+branch_labels = None
+depends_on = None
+
+
+def _rebuild_vectors(config):
+    # Only Postgres stores vectors; the SQLite FTS5 index keeps stop words
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("UPDATE quote SET search_vector = "
+               f"setweight(to_tsvector('{config}', coalesce(author, '')), 'A') || "
+               f"setweight(to_tsvector('{config}', coalesce(text, '')), 'B')")
+
+
+def upgrade():
+    _rebuild_vectors('simple')
+
+
+def downgrade():
+    _rebuild_vectors('english')
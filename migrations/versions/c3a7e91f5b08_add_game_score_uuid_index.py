@@ -0,0 +1,25 @@
+"""add game_score uuid index
+
+Revision ID: c3a7e91f5b08
+Revises: 5d8c2f4e6a13
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7e91f5b08'
+down_revision = '5d8c2f4e6a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.create_index('idx_game_score_uuid', ['game_uuid'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('game_score', schema=None) as batch_op:
+        batch_op.drop_index('idx_game_score_uuid')
@@ -0,0 +1,41 @@
+"""add user list and search indexes
+
+Revision ID: c8d2e4f6a0b1
+Revises: b7c1d9e3f5a2
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d2e4f6a0b1'
+down_revision = 'b7c1d9e3f5a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('idx_user_created', ['created_at', 'user_id'],
+                              unique=False)
+
+    # Trigram indexes let ILIKE '%q%' avoid a scan; other databases use the
+    # in-process index in app/services/user_search.py
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index('idx_user_username_trgm', 'user', ['username'],
+                        postgresql_using='gin',
+                        postgresql_ops={'username': 'gin_trgm_ops'})
+        op.create_index('idx_user_email_trgm', 'user', ['email'],
+                        postgresql_using='gin',
+                        postgresql_ops={'email': 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('idx_user_email_trgm', table_name='user')
+        op.drop_index('idx_user_username_trgm', table_name='user')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_created')
@@ -0,0 +1,54 @@
+"""add quote full-text search index
+
+Revision ID: d3a7f1c9e5b2
+Revises: c8d2e4f6a0b1
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7f1c9e5b2'
+down_revision = 'c8d2e4f6a0b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    with op.batch_alter_table('quote', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('search_vector',
+                      sa.Text().with_variant(postgresql.TSVECTOR(),
+                                             'postgresql'),
+                      nullable=True))
+        batch_op.create_index('idx_quote_author', ['author'], unique=False)
+
+    if dialect == 'postgresql':
+        op.execute("UPDATE quote SET search_vector = "
+                   "setweight(to_tsvector('english', coalesce(author, '')), 'A') || "
+                   "setweight(to_tsvector('english', coalesce(text, '')), 'B')")
+        op.create_index('idx_quote_search', 'quote', ['search_vector'],
+                        postgresql_using='gin')
+    elif dialect == 'sqlite':
+        op.execute('CREATE VIRTUAL TABLE IF NOT EXISTS quote_fts '
+                   'USING fts5(text, author)')
+        op.execute('INSERT INTO quote_fts (rowid, text, author) '
+                   'SELECT id, text, author FROM quote')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('idx_quote_search', table_name='quote')
+    elif dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS quote_fts')
+
+    with op.batch_alter_table('quote', schema=None) as batch_op:
+        batch_op.drop_index('idx_quote_author')
+        batch_op.drop_column('search_vector')
@@ -0,0 +1,61 @@
+"""add user legacy_code
+
+Revision ID: e6f1a2b3c4d5
+Revises: c3a7e91f5b08
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f1a2b3c4d5'
+down_revision = 'c3a7e91f5b08'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _backfill(conn):
+    """Fill legacy_code from unsubscribe tokens in user_id-ordered chunks"""
+    table = sa.table('user', sa.column('user_id', sa.String),
+                     sa.column('unsubscribe_token', sa.String),
+                     sa.column('legacy_code', sa.String))
+    update = table.update().where(
+        table.c.user_id == sa.bindparam('row_id')).values(
+            legacy_code=sa.bindparam('new_code'))
+
+    last_id = ''
+    while True:
+        rows = conn.execute(
+            sa.select(table.c.user_id, table.c.unsubscribe_token).where(
+                table.c.user_id > last_id).order_by(table.c.user_id).limit(
+                    BATCH_SIZE)).fetchall()
+        if not rows:
+            break
+
+        params = [{
+            'row_id': row.user_id,
+            'new_code': row.unsubscribe_token[:6].upper()
+        } for row in rows if row.unsubscribe_token]
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].user_id
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('legacy_code', sa.String(length=6), nullable=True))
+
+    _backfill(op.get_bind())
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_user_legacy_code'), ['legacy_code'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_legacy_code'))
+        batch_op.drop_column('legacy_code')
@@ -0,0 +1,58 @@
+"""add quote text hash for import dedupe
+
+Revision ID: e9b4c6d2a8f3
+Revises: d3a7f1c9e5b2
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.quote_text import text_hash
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c6d2a8f3'
+down_revision = 'd3a7f1c9e5b2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def _backfill(table_name):
+    bind = op.get_bind()
+    table = sa.table(table_name, sa.column('id', sa.Integer),
+                     sa.column('text', sa.Text),
+                     sa.column('text_hash', sa.String))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c.text).where(
+                table.c.id > last_id).order_by(table.c.id).limit(
+                    BATCH_SIZE)).all()
+        if not rows:
+            break
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id')).values(
+                text_hash=sa.bindparam('digest')), [{
+                    'row_id': row.id,
+                    'digest': text_hash(row.text)
+                } for row in rows])
+        last_id = rows[-1].id
+
+
+def upgrade():
+    for table_name in ('quote', 'backdoor'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column('text_hash', sa.String(length=64), nullable=True))
+            batch_op.create_index(f'ix_{table_name}_text_hash', ['text_hash'],
+                                  unique=False)
+        _backfill(table_name)
+
+
+def downgrade():
+    for table_name in ('quote', 'backdoor'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table_name}_text_hash')
+            batch_op.drop_column('text_hash')
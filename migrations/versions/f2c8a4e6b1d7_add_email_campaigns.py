@@ -0,0 +1,55 @@
+"""add email campaign and delivery tables
+
+Revision ID: f2c8a4e6b1d7
+Revises: e9b4c6d2a8f3
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a4e6b1d7'
+down_revision = 'e9b4c6d2a8f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'email_campaign', sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('text_body', sa.Text(), nullable=False),
+        sa.Column('html_body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_recipients', sa.Integer(), nullable=False),
+        sa.Column('sent_count', sa.Integer(), nullable=False),
+        sa.Column('failed_count', sa.Integer(), nullable=False),
+        sa.Column('created_by', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['user.user_id']),
+        sa.PrimaryKeyConstraint('id'))
+    op.create_table(
+        'email_delivery', sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('unique_token', sa.String(length=100), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('message_id', sa.String(length=255), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['campaign_id'], ['email_campaign.id']),
+        sa.PrimaryKeyConstraint('id'))
+    op.create_index('idx_email_delivery_campaign_status', 'email_delivery',
+                    ['campaign_id', 'status', 'id'],
+                    unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_email_delivery_campaign_status',
+                  table_name='email_delivery')
+    op.drop_table('email_delivery')
+    op.drop_table('email_campaign')
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+
+# config.py reads the database URL at import time
+_db_dir = tempfile.mkdtemp()
+os.environ.setdefault('DATABASE_URL',
+                      f"sqlite:///{os.path.join(_db_dir, 'test.db')}")
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app  # noqa: E402
+from app.models import db, User, GameScore  # noqa: E402
+from app.routes.game import BULK_YIELD_PER  # noqa: E402
+
+GAME_COUNT = BULK_YIELD_PER * 2 + 1
+
+
+@pytest.fixture
+def client_and_token():
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(email='bulk@example.com',
+                    username='bulk',
+                    password='password123')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add_all(
+            GameScore(user_id=user.user_id,
+                      game_id=f'easy-quote-{index}-0000-{index}',
+                      score=index,
+                      completed=True,
+                      created_at=datetime(2026, 1, 1))
+            for index in range(GAME_COUNT))
+        db.session.commit()
+        token = create_access_token(identity=user.user_id)
+
+    yield app.test_client(), token
+
+    with app.app_context():
+        db.drop_all()
+
+
+def test_bulk_download_streams_every_game(client_and_token):
+    client, token = client_and_token
+    response = client.post('/api/games/bulk',
+                           json={'sinceCursor': 0},
+                           headers={'Authorization': f'Bearer {token}'})
+
+    # Reading the body runs the query after the view has returned
+    lines = response.get_data(as_text=True).splitlines()
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(lines) == GAME_COUNT
+    assert sorted(json.loads(line)['score']
+                  for line in lines) == list(range(GAME_COUNT))